@@ -0,0 +1,316 @@
+"""
+Headless batch inference against the bundled Ollama.
+
+``main.py --batch`` starts Ollama without the WebUI and runs every line of
+a JSONL file (or stdin) through it. A line is either a JSON object with a
+"prompt" (sent to /api/generate) or "messages" (sent to /api/chat), or a
+plain JSON string used as the prompt. "id" and "model" are optional; every
+other field (system, options, format, images, ...) is passed to Ollama.
+
+Each result is written as one JSON line with the input's index and id,
+the response, and latency and token statistics. Results follow the input
+order unless --unordered is given, in which case each is written as soon
+as it finishes. With --resume, prompts that already have a successful
+result in the output file are skipped.
+"""
+import argparse
+import collections
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Fields of an input line that are not passed on to Ollama
+LOCAL_FIELDS = ("id",)
+
+# Seconds between progress lines in the log
+PROGRESS_INTERVAL = 10
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py --batch",
+        description="Run prompts from a JSONL file through the bundled Ollama.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL prompts (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL results (default: stdout)")
+    parser.add_argument("-m", "--model", help="model for lines that do not name one")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=4, help="requests in flight (default: 4)"
+    )
+    parser.add_argument(
+        "--unordered", action="store_true", help="write results as they finish"
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="skip prompts already answered in --output"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=600, help="seconds per request (default: 600)"
+    )
+    parser.add_argument("--keep-alive", help="how long Ollama keeps the model loaded")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def read_jobs(stream):
+    """Yield (index, job or error message) for each non-blank input line."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            job = f"invalid JSON: {e}"
+        else:
+            if isinstance(job, str):
+                job = {"prompt": job}
+            elif not isinstance(job, dict) or not ("prompt" in job or "messages" in job):
+                job = "expected a string or an object with prompt or messages"
+        yield index, job
+        index += 1
+
+
+def load_completed(path):
+    """Indices with a successful result in an earlier output file.
+
+    The file is rewritten without failed and partially written records so
+    retried prompts do not appear twice.
+    """
+    completed = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "index" in record and not record.get("error"):
+                    completed[record["index"]] = line.rstrip("\n")
+    except FileNotFoundError:
+        return set()
+    with open(path, "w", encoding="utf-8") as f:
+        for line in completed.values():
+            f.write(line + "\n")
+    return set(completed)
+
+
+class ResultWriter:
+    """Writes result records as JSON lines, in input order unless unordered.
+
+    In order, finished results wait for the ones before them; window caps
+    how many prompts may be in flight or waiting so memory stays bounded.
+    Every record put releases its slot, even when writing it fails.
+    """
+
+    def __init__(self, stream, ordered, window):
+        self.stream = stream
+        self.ordered = ordered
+        self.slots = threading.Semaphore(window)
+        self._lock = threading.Lock()
+        self._expected = collections.deque()
+        self._finished = {}
+
+    def reserve(self, index):
+        """Block until another prompt may be started."""
+        self.slots.acquire()
+        if self.ordered:
+            with self._lock:
+                self._expected.append(index)
+
+    def put(self, record):
+        with self._lock:
+            if not self.ordered:
+                self._write(record)
+                return
+            self._finished[record["index"]] = record
+            while self._expected and self._expected[0] in self._finished:
+                self._write(self._finished.pop(self._expected.popleft()))
+
+    def _write(self, record):
+        try:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+        except (OSError, TypeError, ValueError) as e:
+            logging.error(f"Could not write the result of prompt {record['index']}: {e}")
+        finally:
+            self.slots.release()
+
+
+def build_request(job, args):
+    """Return (API path, payload) for a job."""
+    payload = {k: v for k, v in job.items() if k not in LOCAL_FIELDS}
+    payload.setdefault("model", args.model)
+    payload["stream"] = False
+    if args.keep_alive is not None:
+        payload.setdefault("keep_alive", args.keep_alive)
+    path = "/api/chat" if "messages" in job else "/api/generate"
+    return path, payload
+
+
+def run_job(session, base_url, index, job, args, retry_errors=()):
+    """Send one prompt and return its result record."""
+    record = {"index": index}
+    if isinstance(job, dict) and "id" in job:
+        record["id"] = job["id"]
+    if isinstance(job, str):
+        record["error"] = job
+        return record
+    path, payload = build_request(job, args)
+    record["model"] = payload["model"]
+    if not payload["model"]:
+        record["error"] = "no model given (use --model or a model field)"
+        return record
+
+    started = time.monotonic()
+    try:
+        # One retry covers a connection dropped while Ollama was starting
+        for attempt in (1, 2):
+            try:
+                response = session.post(base_url + path, json=payload, timeout=args.timeout)
+                break
+            except retry_errors:
+                if attempt == 2:
+                    raise
+                time.sleep(1)
+        data = response.json() if response.content else {}
+        if response.status_code != 200:
+            record["error"] = data.get("error") or f"HTTP {response.status_code}"
+            return record
+    except Exception as e:
+        record["error"] = str(e) or type(e).__name__
+        return record
+    finally:
+        record["latency_s"] = round(time.monotonic() - started, 3)
+
+    if "message" in data:
+        record["message"] = data["message"]
+        record["response"] = data["message"].get("content", "")
+    else:
+        record["response"] = data.get("response", "")
+    for field, key in (
+        ("done_reason", "done_reason"),
+        ("prompt_tokens", "prompt_eval_count"),
+        ("completion_tokens", "eval_count"),
+    ):
+        if data.get(key) is not None:
+            record[field] = data[key]
+    if data.get("load_duration"):
+        record["load_s"] = round(data["load_duration"] / 1e9, 3)
+    if data.get("eval_count") and data.get("eval_duration"):
+        record["tokens_per_s"] = round(data["eval_count"] / (data["eval_duration"] / 1e9), 2)
+    return record
+
+
+def open_session(requests_module, concurrency):
+    """A pooled session with one kept-alive connection per concurrent request."""
+    from requests.adapters import HTTPAdapter
+
+    session = requests_module.Session()
+    # Local Ollama only: never route requests through a proxy
+    session.trust_env = False
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    return session
+
+
+def summarize(records, skipped, elapsed):
+    ok = [r for r in records if not r.get("error")]
+    latencies = sorted(r["latency_s"] for r in ok)
+    tokens = sum(r.get("completion_tokens") or 0 for r in ok)
+    rates = [r["tokens_per_s"] for r in ok if r.get("tokens_per_s")]
+    summary = {
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "completion_tokens": tokens,
+        "tokens_per_s": round(tokens / elapsed, 2) if elapsed else 0,
+    }
+    if latencies:
+        summary["latency_p50_s"] = latencies[len(latencies) // 2]
+        summary["latency_p95_s"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        summary["latency_max_s"] = latencies[-1]
+    if rates:
+        summary["mean_generation_tokens_per_s"] = round(statistics.mean(rates), 2)
+    return summary
+
+
+def run_batch(args, base_url, requests_module, results_stream):
+    """Run every input line through Ollama at base_url; return a summary."""
+    completed = load_completed(args.output) if args.resume else set()
+    if completed:
+        logging.info(f"Resuming: {len(completed)} prompts already answered in {args.output}")
+    if args.output:
+        output = open(args.output, "a", encoding="utf-8")
+    else:
+        output = results_stream
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+
+    session = open_session(requests_module, args.concurrency)
+    retry_errors = (requests_module.ConnectionError, requests_module.exceptions.ChunkedEncodingError)
+    stats_lock = threading.Lock()
+    writer = ResultWriter(output, ordered=not args.unordered, window=args.concurrency * 4)
+    records = []
+    skipped = 0
+    started = time.monotonic()
+    last_progress = started
+
+    def finish(index, job):
+        nonlocal last_progress
+        # Exceptions in a pool task end up in its unread future; without a
+        # record for this line the ordered output would wait for it forever
+        record = {"index": index, "error": "interrupted"}
+        try:
+            record = run_job(session, base_url, index, job, args, retry_errors)
+        except Exception as e:
+            record = {"index": index, "error": f"internal error: {e!r}"}
+        finally:
+            if record.get("error"):
+                logging.warning(f"Prompt {index} failed: {record['error']}")
+            writer.put(record)
+        with stats_lock:
+            records.append(record)
+            now = time.monotonic()
+            if now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                errors = sum(1 for r in records if r.get("error"))
+                logging.info(
+                    f"Batch: {len(records)} done, {errors} failed, "
+                    f"{len(records) / (now - started):.2f} prompts/s"
+                )
+
+    logging.info(
+        f"Running batch from {'stdin' if args.input == '-' else args.input} "
+        f"with {args.concurrency} concurrent requests"
+    )
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    try:
+        for index, job in read_jobs(source):
+            if index in completed:
+                skipped += 1
+                continue
+            writer.reserve(index)
+            pool.submit(finish, index, job)
+        pool.shutdown(wait=True)
+    except BaseException:
+        # Interrupted: prompts not yet started are left for --resume
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        session.close()
+        if source is not sys.stdin:
+            source.close()
+        if output is not results_stream:
+            output.close()
+
+    summary = summarize(records, skipped, time.monotonic() - started)
+    logging.info("Batch summary: " + json.dumps(summary))
+    return summary
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the ``ollama`` executable used by the benchmarks.
+
+``fake_ollama.py serve`` listens on OLLAMA_HOST after FAKE_OLLAMA_DELAY
+seconds and answers the endpoints the launcher and WebUI use. Generation
+requests stream FAKE_OLLAMA_TOKENS NDJSON lines, FAKE_OLLAMA_TOKEN_INTERVAL
+seconds apart. When FAKE_OLLAMA_READY_FILE is set, the moment the port is
+bound is appended to it so the benchmarks can measure detection overhead.
+"""
+import json
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODELS = [
+    {
+        "name": "bench:latest",
+        "model": "bench:latest",
+        "modified_at": "2024-01-01T00:00:00Z",
+        "size": 1000,
+        "digest": "0" * 64,
+        "details": {"family": "llama", "parameter_size": "1B", "quantization_level": "Q4_0"},
+    }
+]
+loaded = set()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self.send_json({"models": MODELS})
+        elif self.path == "/api/ps":
+            self.send_json({"models": [m for m in MODELS if m["name"] in loaded]})
+        elif self.path == "/api/version":
+            self.send_json({"version": "0.0.0-bench"})
+        else:
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            request = {}
+        model = request.get("model", "")
+        if self.path not in ("/api/generate", "/api/chat", "/api/embed"):
+            self.send_json({"error": "not found"}, status=404)
+            return
+        if request.get("keep_alive") in (0, "0"):
+            loaded.discard(model)
+        else:
+            loaded.add(model if ":" in model else f"{model}:latest")
+        tokens = int(os.environ.get("FAKE_OLLAMA_TOKENS", "50"))
+        interval = float(os.environ.get("FAKE_OLLAMA_TOKEN_INTERVAL", "0"))
+        prompted = "prompt" in request or "messages" in request
+        if self.path == "/api/embed" or not prompted or not request.get("stream", True):
+            # Load-only requests and non-streaming calls answer in one piece
+            self.send_json({"model": model, "response": "x" * tokens, "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(tokens):
+            line = json.dumps({"model": model, "response": "tok ", "done": False}).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+            if interval:
+                time.sleep(interval)
+        line = json.dumps({"model": model, "response": "", "done": True, "eval_count": tokens})
+        line = line.encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(line), line))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    if sys.argv[1:2] != ["serve"]:
+        print("usage: ollama serve", file=sys.stderr)
+        sys.exit(2)
+    time.sleep(float(os.environ.get("FAKE_OLLAMA_DELAY", "0.5")))
+    host, _, port = os.environ.get("OLLAMA_HOST", "127.0.0.1:11434").rpartition(":")
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+    server.daemon_threads = True
+    ready_file = os.environ.get("FAKE_OLLAMA_READY_FILE")
+    if ready_file:
+        with open(ready_file, "a") as f:
+            f.write(json.dumps({"pid": os.getpid(), "port": int(port), "bound": time.time()}) + "\n")
+    print(f"fake ollama listening on {host}:{port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
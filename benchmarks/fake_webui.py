@@ -0,0 +1,34 @@
+"""
+Stand-in for ``open_webui.main`` used by the benchmarks.
+
+The benchmark copies this file to ``open_webui/main.py`` next to the
+launcher under test, so the ``--webui-child`` process imports it through
+the normal entry points. Importing it takes FAKE_WEBUI_IMPORT_DELAY
+seconds to stand in for Open WebUI's heavy import; the app itself is a
+minimal ASGI app that answers every request with a small page.
+"""
+import os
+import time
+
+time.sleep(float(os.environ.get("FAKE_WEBUI_IMPORT_DELAY", "1.0")))
+
+PAGE = b"<!doctype html><title>Open WebUI (benchmark stand-in)</title>"
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/html"), (b"content-length", str(len(PAGE)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": PAGE})
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the launcher.
+
+Each run copies the launcher modules into a temporary directory next to a
+fake ``ollama`` executable (fake_ollama.py) and a fake ``open_webui.main``
+(fake_webui.py), starts ``main.py`` exactly as a user would and measures it
+from the outside:
+
+  cold        time from spawn to the WebUI answering 200, fresh directory
+  warm        the same, relaunching in a directory that has run before
+  port_scan   port-scan phases with every preferred port already taken
+  readiness   time from a child binding its port to the launcher noticing
+  shutdown    SIGTERM to exit, and the cleanup_processes() figure it logs
+  streaming   concurrent streaming /api/generate, direct and via the pool proxy
+
+Results are printed and written as JSON to benchmarks/results/ so runs can
+be compared across commits with --compare. POSIX only.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+RESULTS_DIR = HERE / "results"
+
+BENCHMARKS = ("cold", "warm", "port_scan", "readiness", "shutdown", "streaming")
+OLLAMA_PORTS = range(11434, 11444)
+WEBUI_PORTS = range(3000, 3010)
+
+
+def make_sandbox():
+    """A temporary app directory holding the launcher and the fakes."""
+    sandbox = Path(tempfile.mkdtemp(prefix="launcher-bench-"))
+    for module in REPO.glob("*.py"):
+        shutil.copy2(module, sandbox / module.name)
+    package = sandbox / "open_webui"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    shutil.copy2(HERE / "fake_webui.py", package / "main.py")
+    ollama = sandbox / "ollama"
+    source = (HERE / "fake_ollama.py").read_text().split("\n", 1)[1]
+    ollama.write_text(f"#!{sys.executable}\n{source}")
+    ollama.chmod(0o755)
+    return sandbox
+
+
+def launcher_env(sandbox, config, **overrides):
+    """Environment for one launcher run, free of the caller's settings."""
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if not k.startswith(("LAUNCHER_", "OLLAMA_", "FAKE_"))
+    }
+    env.update(
+        LAUNCHER_OPEN_BROWSER="0",
+        FAKE_OLLAMA_DELAY=str(config["ollama_delay"]),
+        FAKE_WEBUI_IMPORT_DELAY=str(config["webui_delay"]),
+        FAKE_OLLAMA_TOKENS=str(config["tokens"]),
+        FAKE_OLLAMA_READY_FILE=str(sandbox / "ollama-ready.jsonl"),
+        PYTHONUNBUFFERED="1",
+    )
+    env.update(overrides)
+    return env
+
+
+def http_status(url, timeout=1.0):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status
+    except Exception:
+        return None
+
+
+class LauncherRun:
+    """One launcher process started in a sandbox and observed from outside."""
+
+    def __init__(self, sandbox, env):
+        self.sandbox = sandbox
+        self.env = env
+        self.process = None
+        self.ports = {}
+        self.phases = []
+
+    def start(self, timeout=60):
+        """Spawn main.py and return seconds until the WebUI answers 200."""
+        ports_file = self.sandbox / ".launcher" / "ports.json"
+        trace_file = self.sandbox / "startup-trace.json"
+        for stale in (ports_file, trace_file):
+            if stale.exists():
+                stale.unlink()
+        output = open(self.sandbox / "bench-output.txt", "ab")
+        started = time.monotonic()
+        self.process = subprocess.Popen(
+            [sys.executable, "main.py"],
+            cwd=self.sandbox,
+            env=self.env,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        output.close()
+        deadline = started + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"launcher exited early, see {self.sandbox}/launcher.log")
+            try:
+                self.ports = json.loads(ports_file.read_text())
+            except (OSError, ValueError):
+                self.ports = {}
+            if "webui" in self.ports and http_status(f"http://127.0.0.1:{self.ports['webui']}/") == 200:
+                elapsed = time.monotonic() - started
+                # The trace is written right after both services are up
+                while time.monotonic() < deadline:
+                    try:
+                        self.phases = json.loads(trace_file.read_text())["phases"]
+                        break
+                    except (OSError, ValueError, KeyError):
+                        time.sleep(0.01)
+                else:
+                    raise RuntimeError(f"no startup trace after {timeout}s, see {self.sandbox}")
+                return elapsed
+            time.sleep(0.01)
+        raise RuntimeError(f"launcher not ready after {timeout}s, see {self.sandbox}/launcher.log")
+
+    def trace(self):
+        """Phases of the startup trace read by start()."""
+        return self.phases
+
+    def stop(self, timeout=30):
+        """SIGTERM the launcher; return (seconds to exit, logged cleanup seconds)."""
+        started = time.monotonic()
+        try:
+            self.process.send_signal(signal.SIGTERM)
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        finally:
+            elapsed = time.monotonic() - started
+            # Children lead their own groups; anything left is a leak
+            self.process.kill()
+            self.process.wait()
+            for pid in self.leftover_pids():
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+        cleanup = None
+        log = self.sandbox / "launcher.log"
+        if log.exists():
+            found = re.findall(r"Shutdown of child processes took ([\d.]+)s", log.read_text())
+            if found:
+                cleanup = float(found[-1])
+        return elapsed, cleanup
+
+    def leftover_pids(self):
+        """PIDs still running in or below this sandbox (Linux /proc only).
+
+        Children may run from a subdirectory (Ollama's is .ollama), so the
+        working directory is matched by prefix.
+        """
+        pids = []
+        if not Path("/proc").is_dir():
+            return pids
+        sandbox = str(self.sandbox)
+        for entry in Path("/proc").iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                cwd = os.readlink(entry / "cwd")
+                if cwd == sandbox or cwd.startswith(sandbox + os.sep):
+                    pids.append(int(entry.name))
+            except OSError:
+                continue
+        return pids
+
+
+def phase(phases, name, process="launcher"):
+    for entry in phases:
+        if entry["name"] == name and entry["process"] == process:
+            return entry
+    return None
+
+
+def occupy_ports(ports):
+    """Listen on every port in ports (already-taken ones count as occupied)."""
+    sockets = []
+    for port in ports:
+        sock = socket.socket()
+        # Ports left in TIME_WAIT by earlier runs are free to the launcher
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("127.0.0.1", port))
+            sock.listen(1)
+            sockets.append(sock)
+        except OSError:
+            sock.close()
+    return sockets
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "min": round(min(values), 4),
+        "median": round(statistics.median(values), 4),
+        "mean": round(statistics.mean(values), 4),
+        "max": round(max(values), 4),
+        "runs": len(values),
+    }
+
+
+def bench_cold(config):
+    times = []
+    for _ in range(config["repeat"]):
+        sandbox = make_sandbox()
+        run = LauncherRun(sandbox, launcher_env(sandbox, config))
+        try:
+            times.append(run.start())
+        finally:
+            run.stop()
+            shutil.rmtree(sandbox, ignore_errors=True)
+    return {"time_to_ready_seconds": summarize(times)}
+
+
+def bench_warm(config):
+    sandbox = make_sandbox()
+    times = []
+    try:
+        for i in range(config["repeat"] + 1):
+            run = LauncherRun(sandbox, launcher_env(sandbox, config))
+            try:
+                elapsed = run.start()
+            finally:
+                run.stop()
+            if i:
+                # The first launch only warms the directory up
+                times.append(elapsed)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return {"time_to_ready_seconds": summarize(times)}
+
+
+def bench_port_scan(config):
+    results = {"Ollama": [], "WebUI": []}
+    tried = {}
+    blockers = occupy_ports(list(OLLAMA_PORTS) + list(WEBUI_PORTS))
+    sandbox = make_sandbox()
+    try:
+        for _ in range(config["repeat"]):
+            run = LauncherRun(sandbox, launcher_env(sandbox, config))
+            try:
+                run.start()
+                phases = run.trace()
+            finally:
+                run.stop()
+            for service in results:
+                entry = phase(phases, f"port scan ({service})")
+                if entry:
+                    results[service].append(entry["duration"])
+                    tried[service] = entry.get("details", {}).get("ports_tried")
+    finally:
+        for sock in blockers:
+            sock.close()
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return {
+        "ports_occupied": len(blockers),
+        "ollama_scan_seconds": summarize(results["Ollama"]),
+        "webui_scan_seconds": summarize(results["WebUI"]),
+        "ports_tried": tried,
+    }
+
+
+def bench_readiness(config):
+    ollama, webui = [], []
+    sandbox = make_sandbox()
+    ready_file = sandbox / "ollama-ready.jsonl"
+    try:
+        for _ in range(config["repeat"]):
+            run = LauncherRun(sandbox, launcher_env(sandbox, config))
+            try:
+                run.start()
+                phases = run.trace()
+            finally:
+                run.stop()
+            # Ollama: the fake records when it bound; the launcher records
+            # when its first health check succeeded
+            bound = [json.loads(line) for line in ready_file.read_text().splitlines()]
+            bound = [b for b in bound if b["port"] == run.ports.get("ollama")]
+            first_200 = phase(phases, "Ollama first-200")
+            if bound and first_200:
+                ollama.append(first_200["end"] - bound[-1]["bound"])
+            # WebUI: the child reports when uvicorn was bound
+            bind = phase(phases, "uvicorn bind", process="webui-child")
+            first_200 = phase(phases, "WebUI first-200")
+            if bind and first_200:
+                webui.append(first_200["end"] - bind["end"])
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return {
+        "ollama_detection_seconds": summarize(ollama),
+        "webui_detection_seconds": summarize(webui),
+    }
+
+
+def bench_shutdown(config):
+    exits, cleanups = [], []
+    sandbox = make_sandbox()
+    try:
+        for _ in range(config["repeat"]):
+            run = LauncherRun(sandbox, launcher_env(sandbox, config))
+            try:
+                run.start()
+                # Let the supervisor settle into its steady state
+                time.sleep(0.5)
+            finally:
+                elapsed, cleanup = run.stop()
+            exits.append(elapsed)
+            cleanups.append(cleanup)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return {
+        "sigterm_to_exit_seconds": summarize(exits),
+        "cleanup_processes_seconds": summarize(cleanups),
+    }
+
+
+def stream_generate(port, model, results):
+    """POST a streaming /api/generate and record (first byte, lines, bytes)."""
+    started = time.monotonic()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        body = json.dumps({"model": model, "prompt": "benchmark", "stream": True})
+        conn.request("POST", "/api/generate", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        first_byte = None
+        lines = size = 0
+        for line in response:
+            if first_byte is None:
+                first_byte = time.monotonic() - started
+            lines += 1
+            size += len(line)
+        results.append((first_byte, lines, size))
+    finally:
+        conn.close()
+
+
+def measure_streaming(port, config):
+    results = []
+    threads = [
+        threading.Thread(target=stream_generate, args=(port, f"bench-{i}", results))
+        for i in range(config["concurrency"])
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    lines = sum(r[1] for r in results)
+    size = sum(r[2] for r in results)
+    return {
+        "seconds": elapsed,
+        "lines_per_second": lines / elapsed,
+        "megabytes_per_second": size / elapsed / 1e6,
+        "time_to_first_byte": statistics.mean(r[0] for r in results if r[0] is not None),
+        "completed": len(results),
+    }
+
+
+def bench_streaming(config):
+    modes = {"direct": {}, "pool_proxy": {"LAUNCHER_OLLAMA_POOL": "2"}}
+    report = {"concurrency": config["concurrency"], "tokens": config["tokens"]}
+    for mode, overrides in modes.items():
+        samples = []
+        sandbox = make_sandbox()
+        run = LauncherRun(sandbox, launcher_env(sandbox, config, **overrides))
+        try:
+            run.start()
+            # One untimed round so every model is routed before measuring
+            measure_streaming(run.ports["ollama"], config)
+            for _ in range(config["repeat"]):
+                samples.append(measure_streaming(run.ports["ollama"], config))
+        finally:
+            run.stop()
+            shutil.rmtree(sandbox, ignore_errors=True)
+        report[mode] = {
+            key: summarize([s[key] for s in samples])
+            for key in ("lines_per_second", "megabytes_per_second", "time_to_first_byte")
+        }
+        report[mode]["failed_streams"] = sum(config["concurrency"] - s["completed"] for s in samples)
+    return report
+
+
+def git_revision():
+    def git(*args):
+        result = subprocess.run(["git", *args], cwd=REPO, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else ""
+
+    sha = git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return sha, dirty
+
+
+def flatten(results, prefix=""):
+    """{"a.b.median": value} for every statistic in a results tree."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and "median" in value:
+            flat[name] = value["median"]
+        elif isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+    return flat
+
+
+def compare(old_file, new_file):
+    """Print the medians of two result files side by side."""
+    old = json.loads(Path(old_file).read_text())
+    new = json.loads(Path(new_file).read_text())
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    print(f"{'metric':<58} {old['commit']:>10} {new['commit']:>10} {'change':>8}")
+    for name in sorted(set(old_flat) | set(new_flat)):
+        a, b = old_flat.get(name), new_flat.get(name)
+        change = f"{(b - a) / a:+.1%}" if a and b is not None else ""
+        a = "-" if a is None else f"{a:.4g}"
+        b = "-" if b is None else f"{b:.4g}"
+        print(f"{name:<58} {a:>10} {b:>10} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", action="append", choices=BENCHMARKS, help="run only this benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="measured runs per benchmark (default 5)")
+    parser.add_argument("--ollama-delay", type=float, default=0.5, help="seconds the fake Ollama takes to bind")
+    parser.add_argument("--webui-delay", type=float, default=1.0, help="seconds the fake WebUI import takes")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel streams in the streaming benchmark")
+    parser.add_argument("--tokens", type=int, default=2000, help="lines per streamed response")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if sys.platform == "win32":
+        sys.exit("The benchmarks need a POSIX system.")
+
+    config = {
+        "repeat": args.repeat,
+        "ollama_delay": args.ollama_delay,
+        "webui_delay": args.webui_delay,
+        "concurrency": args.concurrency,
+        "tokens": args.tokens,
+    }
+    sha, dirty = git_revision()
+    report = {
+        "commit": sha,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "results": {},
+    }
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        started = time.monotonic()
+        report["results"][name] = globals()[f"bench_{name}"](config)
+        print(json.dumps(report["results"][name], indent=2))
+        print(f"({time.monotonic() - started:.1f}s)", flush=True)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{sha}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Staged Open WebUI data directory for slow portable drives.
+
+Open WebUI does many small random writes (SQLite, uploads, vector store).
+On USB flash those are slow and wear the drive, so the launcher can run
+the WebUI against a local working copy of ``data/`` and write changed files
+back to the drive on a timer and at shutdown.
+
+Write-back is crash safe: every file is written to a temporary name,
+fsynced and renamed over the original, so each file on the drive is always
+either the old or the new version. A journal on the drive lists the files
+of the batch in progress so an interrupted sync can be cleaned up, and an
+owner file lets the next start on the same host recover changes a crashed
+session never wrote back.
+"""
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+JOURNAL_FILE = ".staging-journal.json"
+OWNER_FILE = ".staging-owner.json"
+STATE_FILE = ".staging-state.json"
+TMP_SUFFIX = ".staging-tmp"
+SQLITE_HEADER = b"SQLite format 3\x00"
+# SQLite side files are folded into their database and never copied alone
+SQLITE_SIDE_SUFFIXES = ("-wal", "-shm", "-journal")
+
+
+def _is_sqlite(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(16) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _fsync_dir(path):
+    if sys.platform == "win32":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_json_durable(path, data):
+    tmp = path.with_name(path.name + TMP_SUFFIX)
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _boot_id():
+    """Identifier of the current boot where the OS has one, else None."""
+    try:
+        return Path("/proc/sys/kernel/random/boot_id").read_text().strip()
+    except OSError:
+        return None
+
+
+def _process_alive(pid):
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            # Access denied means it exists but belongs to someone else
+            return kernel32.GetLastError() == 5
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _owner_running(owner):
+    """True when the session in an owner file is still running on this host."""
+    if owner.get("host") != socket.gethostname():
+        return False
+    pid = owner.get("pid")
+    if not isinstance(pid, int) or pid == os.getpid():
+        return False
+    if owner.get("boot") and owner.get("boot") != _boot_id():
+        return False
+    return _process_alive(pid)
+
+
+def _fold_side_files(path):
+    """Merge a database's WAL or hot journal into the database file.
+
+    Called before the file is replaced: a side file left next to the new
+    database would be replayed against pages it does not belong to.
+    """
+    if not any(path.with_name(path.name + suffix).exists() for suffix in ("-wal", "-journal")):
+        return
+    connection = sqlite3.connect(str(path))
+    try:
+        # The first read rolls back a hot journal
+        connection.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        busy, _, _ = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            raise sqlite3.OperationalError(f"{path.name} is in use; its WAL cannot be checkpointed")
+    finally:
+        connection.close()
+
+
+def default_staging_root(mode):
+    """Local directory for the working copy: RAM-backed when asked and possible."""
+    if mode == "ram" and sys.platform.startswith("linux") and os.path.isdir("/dev/shm"):
+        return Path("/dev/shm")
+    return Path(tempfile.gettempdir())
+
+
+class DataStaging:
+    """Local working copy of a portable data directory with write-back."""
+
+    def __init__(self, portable_dir, staging_root):
+        self.portable_dir = Path(portable_dir)
+        self.portable_dir.mkdir(parents=True, exist_ok=True)
+        self.session_id = uuid.uuid4().hex
+        self.local_dir = Path(staging_root) / f"openwebui-portable-data-{self._drive_id()}"
+        # Signatures of local files as last written to the drive
+        self.synced = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+
+    def _drive_id(self):
+        id_file = self.portable_dir / ".staging-id"
+        try:
+            return id_file.read_text().strip()
+        except OSError:
+            drive_id = uuid.uuid4().hex[:12]
+            id_file.write_text(drive_id)
+            return drive_id
+
+    def _scan(self, root):
+        """Map relative path -> signature for every data file under root.
+
+        A SQLite database's signature includes its WAL, since committed
+        changes can sit there without touching the database file.
+        """
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if name.endswith(TMP_SUFFIX) or name.startswith(".staging-"):
+                    continue
+                if name.endswith(SQLITE_SIDE_SUFFIXES):
+                    continue
+                path = Path(dirpath) / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                signature = [stat.st_size, stat.st_mtime_ns]
+                wal = path.with_name(name + "-wal")
+                if wal.exists():
+                    wal_stat = wal.stat()
+                    signature += [wal_stat.st_size, wal_stat.st_mtime_ns]
+                files[path.relative_to(root).as_posix()] = signature
+        return files
+
+    def stage(self):
+        """Copy the portable data directory to the local working copy.
+
+        Returns the local directory the WebUI should use as DATA_DIR.
+        Raises RuntimeError when the working copy still holds another
+        session's data: a launcher that is running, or one whose changes
+        could not be written back.
+        """
+        if not self.recover():
+            raise RuntimeError(f"the working copy at {self.local_dir} is still in use or not saved")
+        started = time.monotonic()
+        # Claim the drive before touching the working copy
+        _write_json_durable(
+            self.portable_dir / OWNER_FILE,
+            {
+                "host": socket.gethostname(),
+                "boot": _boot_id(),
+                "pid": os.getpid(),
+                "local_dir": str(self.local_dir),
+                "session": self.session_id,
+                "started": time.time(),
+            },
+        )
+        if self.local_dir.exists():
+            shutil.rmtree(self.local_dir)
+        self.local_dir.mkdir(parents=True)
+        for rel in self._scan(self.portable_dir):
+            src = self.portable_dir / rel
+            dst = self.local_dir / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if _is_sqlite(src):
+                self._copy_sqlite(src, dst)
+            else:
+                shutil.copy2(src, dst)
+        self.synced = self._scan(self.local_dir)
+        self._save_state()
+        logging.info(
+            f"Staged {len(self.synced)} data files to {self.local_dir} "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        return self.local_dir
+
+    def _save_state(self):
+        (self.local_dir / STATE_FILE).write_text(
+            json.dumps({"session": self.session_id, "synced": self.synced})
+        )
+
+    def recover(self):
+        """Finish or undo whatever an interrupted session left behind.
+
+        Returns False when the owning session is still running or its
+        changes could not be written back; its owner file and working copy
+        are then left alone.
+        """
+        journal = self.portable_dir / JOURNAL_FILE
+        if journal.exists():
+            logging.warning("Previous data write-back was interrupted; cleaning up")
+            try:
+                pending = json.loads(journal.read_text()).get("files", [])
+            except (OSError, ValueError):
+                pending = []
+            for rel in pending:
+                tmp = self.portable_dir / (rel + TMP_SUFFIX)
+                tmp.unlink(missing_ok=True)
+            journal.unlink(missing_ok=True)
+
+        owner_file = self.portable_dir / OWNER_FILE
+        if not owner_file.exists():
+            return True
+        try:
+            owner = json.loads(owner_file.read_text())
+        except (OSError, ValueError):
+            owner = {}
+        if _owner_running(owner):
+            logging.warning(
+                f"Data directory is staged by a running launcher (pid {owner['pid']}); "
+                "leaving its working copy alone"
+            )
+            return False
+        local_dir = Path(owner.get("local_dir", ""))
+        try:
+            state = json.loads((local_dir / STATE_FILE).read_text())
+        except (OSError, ValueError):
+            state = {}
+        session = owner.get("session")
+        if owner.get("host") != socket.gethostname() or not session or state.get("session") != session:
+            logging.warning(
+                f"Previous staged session on {owner.get('host', 'another host')} did not "
+                "shut down cleanly; its unsaved changes cannot be recovered here"
+            )
+            owner_file.unlink(missing_ok=True)
+            return True
+
+        # The drive has not been written by anyone else since that session
+        # (they would have replaced the owner file), so its leftovers win.
+        logging.warning(f"Recovering unsaved data changes from {local_dir}")
+        previous_local = self.local_dir
+        self.local_dir = local_dir
+        self.synced = state.get("synced", {})
+        try:
+            failed = self.sync()
+        finally:
+            self.local_dir = previous_local
+            self.synced = {}
+        if failed:
+            logging.error(f"Some data could not be recovered; the working copy is kept at {local_dir}")
+            return False
+        owner_file.unlink(missing_ok=True)
+        return True
+
+    def _copy_sqlite(self, src, dst):
+        """Copy a live SQLite database consistently using the backup API."""
+        source = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        try:
+            target = sqlite3.connect(dst)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+    def _write_file(self, rel):
+        src = self.local_dir / rel
+        dst = self.portable_dir / rel
+        tmp = dst.with_name(dst.name + TMP_SUFFIX)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if _is_sqlite(src):
+            tmp.unlink(missing_ok=True)
+            self._copy_sqlite(src, tmp)
+            with open(tmp, "rb+") as f:
+                os.fsync(f.fileno())
+            if dst.exists():
+                _fold_side_files(dst)
+            os.replace(tmp, dst)
+            # Whatever is left (-shm, an emptied WAL) holds no pages
+            for suffix in SQLITE_SIDE_SUFFIXES:
+                dst.with_name(dst.name + suffix).unlink(missing_ok=True)
+            return
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+            fout.flush()
+            os.fsync(fout.fileno())
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+
+    def sync(self):
+        """Write files changed since the last sync back to the drive.
+
+        Returns the number of files that could not be written.
+        """
+        with self._lock:
+            started = time.monotonic()
+            current = self._scan(self.local_dir)
+            changed = [rel for rel, sig in current.items() if self.synced.get(rel) != sig]
+            deleted = [rel for rel in self.synced if rel not in current]
+            if not changed and not deleted:
+                return 0
+
+            journal = self.portable_dir / JOURNAL_FILE
+            _write_json_durable(
+                journal,
+                {"session": self.session_id, "files": changed, "deleted": deleted},
+            )
+            written = failed = 0
+            for rel in changed:
+                try:
+                    self._write_file(rel)
+                    self.synced[rel] = current[rel]
+                    written += 1
+                except (OSError, sqlite3.Error) as e:
+                    failed += 1
+                    logging.warning(f"Could not write back {rel}: {e}")
+            for rel in deleted:
+                (self.portable_dir / rel).unlink(missing_ok=True)
+                self.synced.pop(rel, None)
+            _fsync_dir(self.portable_dir)
+            journal.unlink(missing_ok=True)
+            self._save_state()
+            logging.info(
+                f"Wrote back {written} changed and {len(deleted)} deleted data files "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+            return failed
+
+    def start_periodic_sync(self, interval):
+        """Write changes back every interval seconds until stop() is called."""
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync()
+                except Exception as e:
+                    logging.warning(f"Periodic data write-back failed: {e}")
+
+        self._timer = threading.Thread(target=loop, daemon=True)
+        self._timer.start()
+
+    def stop(self):
+        """Final write-back; the WebUI must no longer be running."""
+        self._stop.set()
+        if self.sync():
+            # Keep the working copy and owner file so the next start recovers it
+            logging.error(
+                f"Some data could not be written back; the working copy is kept at {self.local_dir}"
+            )
+            return
+        (self.portable_dir / OWNER_FILE).unlink(missing_ok=True)
+        shutil.rmtree(self.local_dir, ignore_errors=True)
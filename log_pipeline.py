@@ -0,0 +1,155 @@
+"""
+Log pipeline for the launcher and its child processes.
+
+Child output is read from pipes on background threads, kept in a ring
+buffer of recent lines and written to disk in batches, so a busy WebUI no
+longer turns every request into a small synchronous write to the portable
+drive. Log files rotate by size and rotated files are gzip-compressed.
+"""
+import collections
+import gzip
+import logging
+import logging.handlers
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+def gzip_rotator(source, dest):
+    """Rotate source to dest, compressing it (logging handler rotator)."""
+    with open(source, "rb") as fin, gzip.open(dest, "wb") as fout:
+        shutil.copyfileobj(fin, fout, 1024 * 1024)
+    os.remove(source)
+
+
+def gzip_namer(name):
+    """File name for a compressed rotated log (logging handler namer)."""
+    return name + ".gz"
+
+
+def rotating_file_handler(path, max_bytes, backups):
+    """RotatingFileHandler that appends and compresses rotated files."""
+    handler = logging.handlers.RotatingFileHandler(
+        path, mode="a", maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    handler.rotator = gzip_rotator
+    handler.namer = gzip_namer
+    return handler
+
+
+class RotatingLogFile:
+    """Append-only log file with batched writes and size-based rotation.
+
+    Writes are buffered in memory and flushed every flush_interval seconds,
+    or sooner when the buffer grows large. Rotated files are named
+    ``<name>.1.gz`` (newest) to ``<name>.<backups>.gz``.
+    """
+
+    def __init__(self, path, max_bytes, backups, flush_interval=2.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = open(self.path, "ab")
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def write(self, data):
+        with self._lock:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            if self._buffered >= 1024 * 1024:
+                self._wake.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                # The drive may have gone away; keep buffering rather than dying
+                pass
+
+    def flush(self):
+        with self._lock:
+            data = b"".join(self._buffer)
+            self._buffer = []
+            self._buffered = 0
+        if not data:
+            return
+        self._file.write(data)
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}.gz")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}.gz"))
+        if self.backups > 0:
+            gzip_rotator(self.path, self.path.with_name(f"{self.path.name}.1.gz"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, "ab")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+
+class ChildLog:
+    """Output of one child process: a log file plus its most recent lines."""
+
+    def __init__(self, name, path, max_bytes, backups, ring_lines=200, flush_interval=2.0):
+        self.name = name
+        self.file = RotatingLogFile(path, max_bytes, backups, flush_interval)
+        self.recent = collections.deque(maxlen=ring_lines)
+        self._pumps = []
+
+    def mark(self, text):
+        """Write a launcher note (e.g. a session or restart marker) to the log."""
+        line = f"===== {time.strftime('%Y-%m-%d %H:%M:%S')} {text} =====\n"
+        self.file.write(line.encode("utf-8"))
+
+    def attach(self, stream):
+        """Start pumping a child's stdout pipe into this log."""
+        pump = threading.Thread(target=self._pump, args=(stream,), daemon=True)
+        pump.start()
+        self._pumps = [p for p in self._pumps if p.is_alive()] + [pump]
+
+    def _pump(self, stream):
+        with stream:
+            for raw in iter(stream.readline, b""):
+                self.recent.append(raw.decode("utf-8", errors="replace").rstrip())
+                self.file.write(raw)
+
+    def tail(self, lines=20, wait=0.0):
+        """The last lines the child printed, oldest first.
+
+        wait gives the pumps of an exited child time to read what is still
+        in the pipe.
+        """
+        deadline = time.monotonic() + wait
+        for pump in self._pumps:
+            pump.join(timeout=max(0.0, deadline - time.monotonic()))
+        return list(self.recent)[-lines:]
+
+    def close(self):
+        for pump in self._pumps:
+            pump.join(timeout=2)
+        self.file.close()
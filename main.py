@@ -1,32 +1,105 @@
 import os
 import sys
 import subprocess
-import webbrowser
 import threading
 import time
 import socket
 import atexit
 import signal
 import logging
+import json
+import secrets
+from contextlib import contextmanager
 from pathlib import Path
 
-try:
-    import requests
-except ImportError:
-    print("ERROR: requests module not found. Install with: pip install requests")
-    sys.exit(1)
+# Imported on first use so the --webui-child re-exec never pays for it
+requests = None
 
 
 # Global process references for cleanup
 ollama_process = None
 webui_process = None
+webui_ready_channel = None
+
+# Models seen loaded in Ollama this session, most recent first
+loaded_models_seen = []
+_loaded_models_lock = threading.Lock()
+
+# Optional host-local blob cache and the models directory Ollama runs on
+blob_cache = None
+active_models_dir = None
+
+# Verification state of the portable model store (model_store.IntegrityIndex)
+model_integrity = None
+damaged_models_reported = set()
+
+# Local working copy of the WebUI data directory, when staging is enabled
+data_staging = None
+
+# Idle-time maintenance of the WebUI database (webui_db.DatabaseMaintenance)
+webui_db_maintenance = None
+
+# Launcher metrics (metrics.MetricsRegistry), created by launcher_main
+metrics = None
+
+# Ollama settings chosen for this host's hardware
+ollama_tuning = {}
+
+# Pre-imported WebUI child waiting to replace the active one
+# (dict with process, channel and ollama_port), see start_webui_standby()
+webui_standby = None
+
+# Output pipelines for the children, keyed by service name
+child_logs = {}
+
+# Resolved service ports and the WebUI listening socket kept by the parent
+service_ports = {"ollama": None, "webui": None}
+webui_socket = None
+
+# Shared HTTP session for health checks so probes reuse one connection
+_http_session = None
+
+# Set once cleanup_processes() has run; the signal handler, launcher_main's
+# finally and atexit all call it
+cleanup_done = False
 
 WEBUI_CHILD_FLAG = "--webui-child"
+OLLAMA_POOL_FLAG = "--ollama-pool"
+BATCH_FLAG = "--batch"
+IMPORT_FLAG = "--import-models"
+
+OLLAMA_PORT_RANGE = range(11434, 11444)
+METRICS_PORT_RANGE = range(9464, 9474)
+WEBUI_PORT_RANGE = range(3000, 3010)
+
+
+def env_flag(name, default=False):
+    """Read a boolean launcher option from the environment."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_float(name, default):
+    """Read a numeric launcher option from the environment."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logging.warning(f"Ignoring invalid value for {name}: {value!r}")
+        return default
 
 
 def get_bundled_path(filename):
     """Get path to bundled resource, handling PyInstaller frozen state."""
     if getattr(sys, "frozen", False):
+        # A persistent copy made by the runtime cache (see setup_runtime_cache)
+        runtime_dir = os.environ.get("LAUNCHER_RUNTIME_DIR")
+        if runtime_dir and (Path(runtime_dir) / filename).exists():
+            return str(Path(runtime_dir) / filename)
         # Running as compiled exe; use sys._MEIPASS when available. Some
         # static analyzers don't know about _MEIPASS; guard with getattr.
         meipass = getattr(sys, "_MEIPASS", None)
@@ -60,6 +133,13 @@ def get_app_dir():
     return Path(__file__).parent
 
 
+def get_state_dir():
+    """Directory for launcher state kept between runs (next to the data)."""
+    state_dir = get_app_dir() / ".launcher"
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
+
+
 def build_self_command(extra_args=None):
     """Return command list that relaunches this launcher with extra args."""
     cmd = [sys.executable]
@@ -71,42 +151,338 @@ def build_self_command(extra_args=None):
     return cmd
 
 
+def bind_port(port):
+    """Bind 127.0.0.1:port and return the socket, or None if it is taken."""
+    # Use an explicit IPv4 localhost to avoid IPv6 resolution issues with "localhost"
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        if sys.platform == "win32":
+            # SO_REUSEADDR on Windows lets other processes steal the port
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # Allow rebinding ports left in TIME_WAIT by a previous session
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("127.0.0.1", port))
+        # Only a listening socket keeps SO_REUSEADDR binds by others out
+        s.listen()
+        return s
+    except OSError:
+        s.close()
+        return None
+
+
 def is_port_in_use(port):
     """Check if a port is already in use."""
-    # Use an explicit IPv4 localhost to avoid IPv6 resolution issues with "localhost"
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        try:
-            s.bind(("127.0.0.1", port))
-            return False
-        except OSError:
-            return True
+    s = bind_port(port)
+    if s is None:
+        return True
+    s.close()
+    return False
 
 
-def cleanup_processes():
-    """Terminate all child processes cleanly."""
-    global ollama_process, webui_process
+def write_text_atomic(path, text):
+    """Replace path with text so readers never see a partly written file."""
+    tmp_file = path.with_suffix(".tmp")
+    tmp_file.write_text(text)
+    os.replace(tmp_file, path)
+
+
+def publish_ports():
+    """Write the resolved service ports to the launcher state directory.
+
+    Other tools (and restarted children) read ports.json instead of relying
+    on environment variables inherited from whoever started the launcher.
+    """
+    write_text_atomic(
+        get_state_dir() / "ports.json",
+        json.dumps(dict(service_ports, launcher_pid=os.getpid(), updated=time.time())),
+    )
+
+
+def clear_published_ports():
+    """Remove ports.json once the services are gone."""
+    try:
+        (get_state_dir() / "ports.json").unlink()
+    except OSError:
+        pass
+
+
+def get_child_log(name, filename):
+    """Return the log pipeline for a child, creating it on first use.
+
+    Output is batched to a size-capped, rotating log next to launcher.log
+    (LAUNCHER_LOG_MAX_MB, LAUNCHER_LOG_BACKUPS, LAUNCHER_LOG_FLUSH_INTERVAL)
+    and the last lines are kept in memory for error messages.
+    """
+    if name not in child_logs:
+        from log_pipeline import ChildLog
+
+        child_logs[name] = ChildLog(
+            name,
+            get_app_dir() / filename,
+            max_bytes=int(env_float("LAUNCHER_LOG_MAX_MB", 10) * 1024 * 1024),
+            backups=int(env_float("LAUNCHER_LOG_BACKUPS", 3)),
+            flush_interval=env_float("LAUNCHER_LOG_FLUSH_INTERVAL", 2),
+        )
+        child_logs[name].mark("launcher session started")
+    return child_logs[name]
+
+
+def recent_output(name, lines=20):
+    """Format the last lines a child printed, for error messages."""
+    log = child_logs.get(name)
+    tail = log.tail(lines, wait=0.5) if log else []
+    if not tail:
+        return ""
+    return f"\nLast output from {name}:\n" + "\n".join(f"    {line}" for line in tail)
+
 
-    if webui_process and webui_process.poll() is None:
+def close_child_logs():
+    """Flush and close the child log files once the children have exited."""
+    for log in child_logs.values():
         try:
-            webui_process.terminate()
-            webui_process.wait(timeout=5)
+            log.close()
         except Exception as e:
-            print(f"Warning: WebUI cleanup failed: {e}")
+            logging.warning(f"Could not close {log.name} log: {e}")
+    child_logs.clear()
+
+
+def child_popen_kwargs():
+    """Popen arguments that start a child in its own process group.
+
+    Ollama spawns runner subprocesses and uvicorn may spawn workers; giving
+    each child its own group lets the launcher signal the whole tree.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _create_windows_job(process):
+    """Put a child into a kill-on-close job object so its tree dies with it."""
+    import ctypes
+    from ctypes import wintypes
+
+    class BasicLimits(ctypes.Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", ctypes.c_int64),
+            ("PerJobUserTimeLimit", ctypes.c_int64),
+            ("LimitFlags", wintypes.DWORD),
+            ("MinimumWorkingSetSize", ctypes.c_size_t),
+            ("MaximumWorkingSetSize", ctypes.c_size_t),
+            ("ActiveProcessLimit", wintypes.DWORD),
+            ("Affinity", ctypes.c_size_t),
+            ("PriorityClass", wintypes.DWORD),
+            ("SchedulingClass", wintypes.DWORD),
+        ]
+
+    class ExtendedLimits(ctypes.Structure):
+        _fields_ = [
+            ("BasicLimitInformation", BasicLimits),
+            ("IoInfo", ctypes.c_uint64 * 6),
+            ("ProcessMemoryLimit", ctypes.c_size_t),
+            ("JobMemoryLimit", ctypes.c_size_t),
+            ("PeakProcessMemoryUsed", ctypes.c_size_t),
+            ("PeakJobMemoryUsed", ctypes.c_size_t),
+        ]
+
+    JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x2000
+    JOB_OBJECT_EXTENDED_LIMIT_INFORMATION = 9
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.SetInformationJobObject.argtypes = [
+        wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD
+    ]
+    kernel32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        raise ctypes.WinError(ctypes.get_last_error())
+    limits = ExtendedLimits()
+    limits.BasicLimitInformation.LimitFlags = JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if not kernel32.SetInformationJobObject(
+        job, JOB_OBJECT_EXTENDED_LIMIT_INFORMATION, ctypes.byref(limits), ctypes.sizeof(limits)
+    ) or not kernel32.AssignProcessToJobObject(job, int(process._handle)):
+        error = ctypes.WinError(ctypes.get_last_error())
+        kernel32.CloseHandle(wintypes.HANDLE(job))
+        raise error
+    return job
+
+
+# Windows job object handles keyed by child PID
+_windows_jobs = {}
+
+
+def track_process_tree(process, name):
+    """Remember a freshly spawned child so its whole tree can be stopped."""
+    if sys.platform != "win32":
+        return
+    try:
+        _windows_jobs[process.pid] = _create_windows_job(process)
+    except Exception as e:
+        logging.warning(f"Could not create a job object for {name}: {e}")
+
+
+def signal_process_tree(process, force=False):
+    """Ask a child's process tree to stop, or kill it outright when force is set."""
+    if sys.platform == "win32":
+        job = _windows_jobs.get(process.pid)
+        if force and job:
+            import ctypes
+
+            ctypes.windll.kernel32.TerminateJobObject(job, 1)
+        elif force:
+            subprocess.run(
+                ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
             try:
-                webui_process.kill()
-            except:
-                pass
+                # Children run in their own process group, which receives
+                # the console break event as a graceful stop request
+                os.kill(process.pid, signal.CTRL_BREAK_EVENT)
+            except OSError:
+                process.terminate()
+        return
 
-    if ollama_process and ollama_process.poll() is None:
-        try:
-            ollama_process.terminate()
-            ollama_process.wait(timeout=5)
-        except Exception as e:
-            print(f"Warning: Ollama cleanup failed: {e}")
+    try:
+        # start_new_session makes the child the leader of its own group
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def process_tree_alive(process):
+    """True while the child or anything left in its process group is running."""
+    if process.poll() is None:
+        return True
+    if sys.platform == "win32":
+        return False
+    try:
+        os.killpg(process.pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def terminate_process_tree(process, name, grace):
+    """Stop a child's process tree, escalating to a kill after grace seconds.
+
+    Returns a small report: how long it took and whether it was killed.
+    """
+    started = time.monotonic()
+    escalated = False
+    if process_tree_alive(process):
+        signal_process_tree(process)
+        deadline = started + grace
+        while process_tree_alive(process) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if process_tree_alive(process):
+            logging.warning(f"{name} did not stop within {grace:g}s; killing its process tree")
+            escalated = True
+            signal_process_tree(process, force=True)
+            deadline = time.monotonic() + 5
+            while process_tree_alive(process) and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+    # Sweep up anything the child left behind in its job object
+    job = _windows_jobs.pop(process.pid, None)
+    if job:
+        import ctypes
+
+        ctypes.windll.kernel32.TerminateJobObject(job, 1)
+        ctypes.windll.kernel32.CloseHandle(job)
+
+    return {
+        "name": name,
+        "seconds": time.monotonic() - started,
+        "escalated": escalated,
+        "exit_code": process.poll(),
+    }
+
+
+def cleanup_processes():
+    """Stop all child process trees in parallel and report the shutdown time.
+
+    The WebUI is given LAUNCHER_SHUTDOWN_DRAIN seconds to finish in-flight
+    streaming responses before it is killed. Ollama is signalled as soon as
+    the WebUI has exited, or when the drain window ends, so generations the
+    WebUI is still streaming are not cut off underneath it. Any tree still
+    running LAUNCHER_SHUTDOWN_TIMEOUT seconds after its signal is killed.
+    Only the first call does anything.
+    """
+    global webui_socket, cleanup_done
+
+    if cleanup_done:
+        return
+    cleanup_done = True
+
+    # Note which models are loaded before Ollama goes away
+    if ollama_process is not None and ollama_process.poll() is None:
+        record_loaded_models(service_ports["ollama"])
+    save_last_used_models()
+
+    discard_webui_standby()
+    if model_integrity is not None:
+        model_integrity.stop()
+    if webui_db_maintenance is not None:
+        webui_db_maintenance.stop()
+
+    children = [
+        (name, process)
+        for name, process in (("WebUI", webui_process), ("Ollama", ollama_process))
+        if process is not None and process_tree_alive(process)
+    ]
+    if children:
+        drain = env_float("LAUNCHER_SHUTDOWN_DRAIN", 5)
+        grace = env_float("LAUNCHER_SHUTDOWN_TIMEOUT", 5)
+        webui_stopped = threading.Event()
+        if not any(name == "WebUI" for name, _ in children):
+            webui_stopped.set()
+        reports = []
+        started = time.monotonic()
+
+        def stop(name, process):
             try:
-                ollama_process.kill()
-            except:
-                pass
+                if name == "WebUI":
+                    reports.append(terminate_process_tree(process, name, drain + grace))
+                else:
+                    webui_stopped.wait(drain)
+                    reports.append(terminate_process_tree(process, name, grace))
+            except Exception as e:
+                logging.warning(f"{name} cleanup failed: {e}")
+            finally:
+                if name == "WebUI":
+                    webui_stopped.set()
+
+        threads = [
+            threading.Thread(target=stop, args=child, daemon=True) for child in children
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        summary = ", ".join(
+            f"{r['name']} {'killed' if r['escalated'] else 'stopped'} after {r['seconds']:.2f}s"
+            for r in reports
+        )
+        logging.info(f"Shutdown of child processes took {time.monotonic() - started:.2f}s ({summary})")
+
+    close_child_logs()
+
+    # Only once the children are gone can their working copies be written back
+    finish_data_staging()
+    write_back_blob_cache()
+
+    # Release the WebUI port only once no child can be serving it any more
+    if webui_socket is not None:
+        webui_socket.close()
+        webui_socket = None
 
 
 def get_ollama_binary():
@@ -146,6 +522,13 @@ def get_ollama_binary():
     return get_bundled_path("ollama")
 
 
+def run_ollama_pool_mode():
+    """Run the Ollama pool and its proxy when invoked as the Ollama child."""
+    from ollama_pool import run_pool
+
+    run_pool()
+
+
 def run_webui_child_mode():
     """Run Open WebUI inside the current process when invoked as a child."""
     try:
@@ -156,44 +539,331 @@ def run_webui_child_mode():
     run_webui_server()
 
 
-def run_ollama():
-    """Start Ollama server with portable data directory."""
-    global ollama_process
+class StartupTimeline:
+    """Timestamps for each startup phase, written out as JSON.
 
-    # Find available port starting from 11434
-    ollama_port = 11434
-    for port_attempt in range(11434, 11444):
-        if not is_port_in_use(port_attempt):
-            ollama_port = port_attempt
-            break
-    else:
+    Phases use wall-clock time so entries reported by child processes line
+    up with the launcher's own. Besides the plain JSON file an optional
+    Chrome trace (chrome://tracing, Perfetto) can be exported.
+    """
+
+    def __init__(self):
+        self.origin = time.time()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end, process="launcher", **details):
+        """Record a finished phase."""
+        entry = {"name": name, "process": process, "start": start, "end": end}
+        if details:
+            entry["details"] = details
+        with self._lock:
+            self.phases.append(entry)
+
+    @contextmanager
+    def phase(self, name, **details):
+        """Record the duration of the enclosed block as a phase."""
+        start = time.time()
+        try:
+            yield details
+        finally:
+            self.add(name, start, time.time(), **details)
+
+    def extend(self, phases, process):
+        """Merge phases reported by a child process."""
+        for entry in phases or []:
+            try:
+                self.add(
+                    str(entry["name"]),
+                    float(entry["start"]),
+                    float(entry["end"]),
+                    process=process,
+                    **entry.get("details", {}),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def to_json(self):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p["start"])
+        return {
+            "origin": self.origin,
+            "phases": [
+                dict(
+                    p,
+                    offset=round(p["start"] - self.origin, 6),
+                    duration=round(p["end"] - p["start"], 6),
+                )
+                for p in phases
+            ],
+        }
+
+    def to_chrome_trace(self):
+        """Return the phases in Chrome trace event format."""
+        process_ids = {}
+        events = []
+        for p in self.to_json()["phases"]:
+            pid = process_ids.setdefault(p["process"], len(process_ids) + 1)
+            events.append(
+                {
+                    "name": p["name"],
+                    "ph": "X",
+                    "ts": int(p["offset"] * 1e6),
+                    "dur": int(p["duration"] * 1e6),
+                    "pid": pid,
+                    "tid": pid,
+                    "args": p.get("details", {}),
+                }
+            )
+        for name, pid in process_ids.items():
+            events.append(
+                {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory, chrome=False):
+        """Write startup-trace.json (and optionally a Chrome trace) to directory."""
+        trace_file = Path(directory) / "startup-trace.json"
+        write_text_atomic(trace_file, json.dumps(self.to_json(), indent=2))
+        if chrome:
+            chrome_file = Path(directory) / "startup-trace.chrome.json"
+            write_text_atomic(chrome_file, json.dumps(self.to_chrome_trace()))
+        return trace_file
+
+
+startup_timeline = StartupTimeline()
+
+
+def load_requests():
+    """Import requests, exiting with a helpful message when it is missing."""
+    global requests
+    if requests is None:
+        try:
+            import requests as requests_module
+        except ImportError:
+            print("ERROR: requests module not found. Install with: pip install requests")
+            sys.exit(1)
+        requests = requests_module
+    return requests
+
+
+def get_http_session():
+    """Return the shared requests session used for local health checks."""
+    global _http_session
+    load_requests()
+    if _http_session is None:
+        _http_session = requests.Session()
+        # Local services only: never route health checks through a proxy
+        _http_session.trust_env = False
+    return _http_session
+
+
+def probe_tcp(port, timeout=0.05):
+    """Return True when something accepts connections on 127.0.0.1:port."""
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_http(url, ok_statuses=(200,), timeout=1):
+    """Return True when url answers with one of ok_statuses."""
+    try:
+        response = get_http_session().get(url, timeout=timeout, allow_redirects=False)
+        return response.status_code in ok_statuses
+    except requests.RequestException:
+        return False
+
+
+class ReadyChannel:
+    """Loopback socket a child process uses to report that it is serving.
+
+    The port and a one-off token are handed to the child through the
+    environment; the child connects once its server has bound its port and
+    sends a single JSON line. Anything without the right token is ignored.
+    A standby child connects earlier and keeps its connection open, and
+    send() delivers the command that makes it serve.
+    """
+
+    def __init__(self):
+        self.token = secrets.token_hex(16)
+        self.event = threading.Event()
+        self.standby = threading.Event()
+        self.message = None
+        self._control = None
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(4)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def env(self):
+        """Environment entries that let the child find this channel."""
+        return {
+            "LAUNCHER_READY_PORT": str(self.port),
+            "LAUNCHER_READY_TOKEN": self.token,
+        }
+
+    def _accept_loop(self):
+        while not self.event.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.settimeout(5)
+            try:
+                line = conn.makefile("rb").readline(1 << 20)
+                message = json.loads(line)
+            except (OSError, ValueError):
+                conn.close()
+                continue
+            if not isinstance(message, dict) or message.get("token") != self.token:
+                conn.close()
+                continue
+            if message.get("event") == "standby":
+                # Kept open: the serve command goes back over this connection
+                conn.settimeout(None)
+                self._control = conn
+                self.standby.set()
+                continue
+            conn.close()
+            self.message = message
+            startup_timeline.extend(message.get("phases"), process="webui-child")
+            self.event.set()
+        self.close()
+
+    def send(self, command):
+        """Send a command to a standby child; returns whether it was delivered."""
+        if self._control is None:
+            return False
+        try:
+            self._control.sendall(
+                json.dumps(dict(command, token=self.token)).encode("utf-8") + b"\n"
+            )
+            return True
+        except OSError:
+            return False
+
+    def close(self):
+        for sock in (self._sock, self._control):
+            if sock is None:
+                continue
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+def wait_for_service(
+    port, health_url, ok_statuses, process, timeout, ready_event=None, prebound=False
+):
+    """Wait until a local service is healthy.
+
+    Returns "ready", "exited" or "timeout". A cheap TCP connect probe with
+    exponential backoff (starting at a few milliseconds) detects the bound
+    port; only then is the HTTP health check issued over the shared session.
+    An explicit ready_event from the child short-circuits the TCP probe.
+    When the launcher bound the port itself (prebound) connects always
+    succeed, so the HTTP check is issued directly; it is answered as soon
+    as the child starts accepting on the inherited socket.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return "exited"
+
+        signalled = ready_event is not None and ready_event.is_set()
+        reachable = signalled or prebound or probe_tcp(port)
+        if reachable and probe_http(health_url, ok_statuses):
+            return "ready"
+
+        if ready_event is not None and not signalled:
+            ready_event.wait(delay)
+        else:
+            time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+    return "timeout"
+
+
+def reserve_port(port_range, service_name):
+    """Bind the first free port in port_range and return the bound socket.
+
+    The socket stays bound until the port is handed to the child, so no
+    other process can take it in between. When the whole range is taken an
+    OS-assigned port is used instead (LAUNCHER_PORT_FALLBACK=0 disables).
+    """
+    with startup_timeline.phase(f"port scan ({service_name})") as details:
+        sock = None
+        for tried, port_attempt in enumerate(port_range, start=1):
+            sock = bind_port(port_attempt)
+            if sock is not None:
+                break
+        if sock is None and env_flag("LAUNCHER_PORT_FALLBACK", True):
+            sock = bind_port(0)
+        details["ports_tried"] = tried
+
+    if sock is None:
         raise RuntimeError(
-            "Ports 11434-11443 are all in use. Please close other applications and try again."
+            f"Ports {port_range.start}-{port_range.stop - 1} are all in use. "
+            "Please close other applications and try again."
+        )
+
+    port = sock.getsockname()[1]
+    if port != port_range.start:
+        print(
+            f"Port {port_range.start} in use, using alternate port {port} for {service_name}"
         )
+    return sock
+
+
+def start_ollama(port_socket):
+    """Spawn the Ollama server on the reserved port without waiting for it.
 
-    if ollama_port != 11434:
-        print(f"Port 11434 in use, using alternate port {ollama_port}")
+    Ollama can only bind by address, so the reservation is released right
+    before the process is spawned. With LAUNCHER_OLLAMA_POOL=N (N > 1),
+    LAUNCHER_OLLAMA_ON_DEMAND, LAUNCHER_OLLAMA_IDLE_TIMEOUT or
+    LAUNCHER_OLLAMA_CACHE a pool child is spawned instead: it runs the
+    Ollama servers behind a proxy that serves the reserved socket itself
+    (see ollama_pool.py).
+    """
+    global ollama_process
+
+    ollama_port = port_socket.getsockname()[1]
 
     # Setup portable directories on USB drive
     app_dir = get_app_dir()
     ollama_dir = app_dir / ".ollama"
     models_dir = ollama_dir / "models"
     cache_dir = ollama_dir / "cache"
-    ollama_dir.mkdir(parents=True, exist_ok=True)
-    models_dir.mkdir(parents=True, exist_ok=True)
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    with startup_timeline.phase("create directories (Ollama)"):
+        ollama_dir.mkdir(parents=True, exist_ok=True)
+        models_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    start_model_integrity_check(models_dir)
 
     # Configure Ollama to use portable directories
     env = os.environ.copy()
     # Keep all Ollama state on the portable drive rather than the host machine
     env["OLLAMA_HOME"] = str(ollama_dir)
-    env["OLLAMA_MODELS"] = str(models_dir)
+    env["OLLAMA_MODELS"] = str(select_models_dir(models_dir))
     env["OLLAMA_CACHE"] = str(cache_dir)
     env["OLLAMA_HOST"] = f"127.0.0.1:{ollama_port}"
     # Disable debug for production (set to "1" to enable GPU/CPU logs)
     env["OLLAMA_DEBUG"] = "0"
-
-    ollama_binary = get_ollama_binary()
+    # Size concurrency and memory use to the host the drive is plugged into
+    if env_flag("LAUNCHER_OLLAMA_TUNING", True):
+        from ollama_tuning import tuning_env
+
+        with startup_timeline.phase("detect hardware") as details:
+            tuning, _, details["profile"] = tuning_env(app_dir, env)
+        ollama_tuning.clear()
+        ollama_tuning.update(tuning)
+        env.update(tuning)
+
+    with startup_timeline.phase("resolve Ollama binary"):
+        ollama_binary = get_ollama_binary()
     if not Path(ollama_binary).exists():
         raise FileNotFoundError(
             f"Ollama binary not found at: {ollama_binary}\n"
@@ -205,7 +875,8 @@ def run_ollama():
     # before attempting to launch Ollama.
     try:
         if sys.platform != "win32":
-            Path(ollama_binary).chmod(0o755)
+            with startup_timeline.phase("chmod Ollama binary"):
+                Path(ollama_binary).chmod(0o755)
     except Exception as e:
         # Chmod failure is non-fatal; the subsequent subprocess call may still
         # succeed (or fail) depending on filesystem semantics — warn instead
@@ -213,85 +884,529 @@ def run_ollama():
         print(f"Warning: Failed to set executable permissions on {ollama_binary}: {e}")
 
     print(f"Starting Ollama from: {ollama_binary}")
-    print(f"Models directory: {models_dir}")
+    print(f"Models directory: {env['OLLAMA_MODELS']}")
+
+    command = [ollama_binary, "serve"]
+    pass_fds = ()
+    pool_size = max(1, int(env_float("LAUNCHER_OLLAMA_POOL", 1)))
+    on_demand = env_flag("LAUNCHER_OLLAMA_ON_DEMAND")
+    # On demand, an unused Ollama is stopped again after 15 minutes by default
+    idle_timeout = env_float("LAUNCHER_OLLAMA_IDLE_TIMEOUT", 900 if on_demand else 0)
+    response_cache = env_flag("LAUNCHER_OLLAMA_CACHE")
+    if pool_size > 1 or on_demand or idle_timeout > 0 or response_cache:
+        command = build_self_command([OLLAMA_POOL_FLAG])
+        env["LAUNCHER_OLLAMA_POOL"] = str(pool_size)
+        env["LAUNCHER_OLLAMA_BINARY"] = str(ollama_binary)
+        env["LAUNCHER_OLLAMA_ON_DEMAND"] = "1" if on_demand else "0"
+        env["LAUNCHER_OLLAMA_IDLE_TIMEOUT"] = str(idle_timeout)
+        if response_cache:
+            # Kept with the WebUI's data (its staged copy when staging is on)
+            data_dir = app_dir / "data"
+            data_dir.mkdir(parents=True, exist_ok=True)
+            env["LAUNCHER_OLLAMA_CACHE"] = "1"
+            env["LAUNCHER_OLLAMA_CACHE_DIR"] = str(prepare_data_dir(data_dir))
+        if sys.platform != "win32":
+            port_socket.set_inheritable(True)
+            pass_fds = (port_socket.fileno(),)
+            env["LAUNCHER_OLLAMA_FD"] = str(port_socket.fileno())
+        if pool_size > 1:
+            print(f"Starting a pool of {pool_size} Ollama servers behind a local proxy")
+        if on_demand:
+            print("Ollama will start on the first request that needs it")
 
     try:
-        ollama_process = subprocess.Popen(
-            [ollama_binary, "serve"],
-            cwd=str(ollama_dir),
-            env=env,
-        )
+        with startup_timeline.phase("spawn Ollama"):
+            if not pass_fds:
+                port_socket.close()
+            ollama_process = subprocess.Popen(
+                command,
+                cwd=str(ollama_dir),
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                pass_fds=pass_fds,
+                **child_popen_kwargs(),
+            )
     except Exception as e:
         raise RuntimeError(f"Failed to start Ollama process: {e}")
+    finally:
+        # The pool child has its own copy of the socket now
+        port_socket.close()
+    track_process_tree(ollama_process, "Ollama")
+    get_child_log("Ollama", "ollama.log").attach(ollama_process.stdout)
+
+    service_ports["ollama"] = ollama_port
+    publish_ports()
+    return ollama_process
+
 
-    # Wait for Ollama API to be ready
+def wait_for_ollama(ollama_port):
+    """Block until the Ollama API answers or the process dies."""
     print("Waiting for Ollama API to start...")
     ollama_url = f"http://127.0.0.1:{ollama_port}"
-    for attempt in range(60):
-        try:
-            response = requests.get(f"{ollama_url}/api/tags", timeout=1)
-            if response.status_code == 200:
-                print(f"Ollama API is ready at {ollama_url}!")
-                # Store port for WebUI to use
-                env["OLLAMA_PORT"] = str(ollama_port)
-                # Make sure the running process also knows the port so the WebUI
-                # launcher (spawned separately) can pick it up from the environment.
-                os.environ["OLLAMA_PORT"] = str(ollama_port)
-                return ollama_process
-        except (requests.RequestException, ConnectionError):
-            pass
-
-        # Check if process crashed
-        if ollama_process.poll() is not None:
-            exit_code = ollama_process.returncode
-            raise RuntimeError(
-                f"Ollama process crashed during startup (exit code {exit_code}). "
-                "Check console output above for error details. "
-                "Common issues: GPU driver problems, insufficient permissions, or corrupted binary."
-            )
+    timeout = env_float("LAUNCHER_OLLAMA_TIMEOUT", 60)
+    with startup_timeline.phase("Ollama first-200") as details:
+        status = wait_for_service(
+            ollama_port, f"{ollama_url}/api/tags", (200,), ollama_process, timeout
+        )
+        details["status"] = status
 
-        time.sleep(1)
+    if status == "ready":
+        print(f"Ollama API is ready at {ollama_url}!")
+        start_model_warmup(ollama_port)
+        return ollama_process
+
+    if status == "exited":
+        exit_code = ollama_process.returncode
+        raise RuntimeError(
+            f"Ollama process crashed during startup (exit code {exit_code}). "
+            "Check ollama.log for error details. "
+            "Common issues: GPU driver problems, insufficient permissions, or corrupted binary."
+            + damaged_models_hint()
+            + recent_output("Ollama")
+        )
 
     raise RuntimeError(
-        f"Ollama failed to start within 60 seconds at {ollama_url}.\n"
+        f"Ollama failed to start within {timeout:g} seconds at {ollama_url}.\n"
         f"Check if port {ollama_port} is blocked by firewall or antivirus."
     )
 
 
-def run_webui():
-    """Start Open WebUI server with portable data directory."""
-    global webui_process
+def select_models_dir(models_dir):
+    """Pick the OLLAMA_MODELS directory, preferring the host blob cache.
 
-    # Find available port starting from 3000
-    webui_port = 3000
-    for port_attempt in range(3000, 3010):
-        if not is_port_in_use(port_attempt):
-            webui_port = port_attempt
-            break
+    With LAUNCHER_BLOB_CACHE=1 model blobs are mirrored to a host-local
+    cache (LAUNCHER_BLOB_CACHE_DIR, bounded by LAUNCHER_BLOB_CACHE_MAX_GB)
+    and Ollama is pointed at it once every blob is cached and verified.
+    LAUNCHER_BLOB_CACHE_VERIFY=full re-hashes cached blobs before use.
+    """
+    global blob_cache, active_models_dir
+
+    if not env_flag("LAUNCHER_BLOB_CACHE"):
+        active_models_dir = models_dir
+        return models_dir
+
+    import model_store
+
+    try:
+        if blob_cache is None:
+            cache_root = os.environ.get("LAUNCHER_BLOB_CACHE_DIR") or model_store.default_cache_root()
+            max_bytes = int(env_float("LAUNCHER_BLOB_CACHE_MAX_GB", 50) * 1e9)
+            blob_cache = model_store.BlobCache(cache_root, max_bytes)
+        elif active_models_dir not in (None, models_dir):
+            # Ollama is being restarted on a cached view: keep what it pulled
+            blob_cache.write_back(active_models_dir, models_dir)
+        full_check = os.environ.get("LAUNCHER_BLOB_CACHE_VERIFY", "").lower() == "full"
+        active_models_dir = Path(blob_cache.prepare(models_dir, full_check=full_check))
+    except Exception as e:
+        logging.warning(f"Blob cache unavailable ({e}); using the portable drive")
+        active_models_dir = models_dir
+    return active_models_dir
+
+
+def start_blob_cache_mirror(models_dir):
+    """Fill the host blob cache in the background for the next session."""
+    if blob_cache is None:
+        return
+
+    def mirror():
+        try:
+            blob_cache.mirror(models_dir)
+        except Exception as e:
+            logging.warning(f"Blob cache mirroring failed: {e}")
+
+    threading.Thread(target=mirror, daemon=True).start()
+
+
+def write_back_blob_cache():
+    """Copy anything Ollama changed in a cached view back to the drive."""
+    global blob_cache, active_models_dir
+
+    if blob_cache is None:
+        return
+    blob_cache.stop_event.set()
+    models_dir = get_app_dir() / ".ollama" / "models"
+    try:
+        if active_models_dir is not None and active_models_dir != models_dir:
+            blob_cache.write_back(active_models_dir, models_dir)
+    except Exception as e:
+        logging.error(f"Writing models back to the portable drive failed: {e}")
+    finally:
+        blob_cache = None
+        active_models_dir = None
+
+
+def start_model_integrity_check(models_dir):
+    """Check the model store for damaged blobs before Ollama uses it.
+
+    A quick check compares sizes and mtimes with integrity.json and the
+    manifests; blobs that are new or changed since they were last hashed
+    are then verified by LAUNCHER_VERIFY_WORKERS background processes.
+    LAUNCHER_VERIFY_MODELS=quick skips the hashing and =0 both checks.
+    """
+    global model_integrity
+
+    if model_integrity is not None:
+        return
+    mode = os.environ.get("LAUNCHER_VERIFY_MODELS", "1").strip().lower()
+    if mode in ("0", "off", "false", "no"):
+        return
+
+    from model_store import IntegrityIndex
+
+    integrity = IntegrityIndex(models_dir)
+    with startup_timeline.phase("check model store") as details:
+        try:
+            pending = integrity.quick_check()
+        except Exception as e:
+            logging.warning(f"Model store check failed: {e}")
+            return
+        details["blobs_to_verify"] = len(pending)
+    model_integrity = integrity
+    report_damaged_models()
+    if mode == "quick" or not pending:
+        return
+
+    workers = max(1, int(env_float("LAUNCHER_VERIFY_WORKERS", min(4, os.cpu_count() or 1))))
+
+    def verify():
+        started = time.monotonic()
+        logging.info(f"Verifying {len(pending)} new or changed model blob(s) in the background")
+        try:
+            count = integrity.verify(pending, workers, on_failure=lambda _: report_damaged_models())
+        except Exception as e:
+            logging.warning(f"Model verification failed: {e}")
+            return
+        if count:
+            logging.info(f"Verified {count} model blob(s) in {time.monotonic() - started:.0f}s")
+
+    threading.Thread(target=verify, daemon=True).start()
+
+
+def damaged_models():
+    """Model name -> problems for installed models with damaged blobs."""
+    if model_integrity is None:
+        return {}
+    return model_integrity.damaged_models()
+
+
+def report_damaged_models():
+    """Warn once about each model found to have damaged blobs."""
+    damaged = damaged_models()
+    if metrics is not None:
+        metrics.set(
+            "launcher_damaged_models",
+            "Installed models with missing or corrupt blobs.",
+            len(damaged),
+        )
+    for name, problems in damaged.items():
+        if name in damaged_models_reported:
+            continue
+        damaged_models_reported.add(name)
+        logging.warning(
+            f"Model {name} is damaged ({'; '.join(problems)}) and will fail to load. "
+            f"Remove it with 'ollama rm {name}' and pull or import it again."
+        )
+
+
+def damaged_models_hint():
+    """A line naming damaged models, for Ollama crash messages."""
+    damaged = damaged_models()
+    if not damaged:
+        return ""
+    return f"\nModels with damaged files (a likely cause): {', '.join(sorted(damaged))}"
+
+
+LAST_MODELS_FILE = "last-models.json"
+
+
+def get_last_used_models():
+    """Models that were loaded during the previous session, most recent first."""
+    try:
+        models = json.loads((get_state_dir() / LAST_MODELS_FILE).read_text())
+        return [m for m in models if isinstance(m, str)]
+    except (OSError, ValueError):
+        return []
+
+
+def record_loaded_models(ollama_port):
+    """Remember which models Ollama currently has loaded."""
+    try:
+        response = get_http_session().get(
+            f"http://127.0.0.1:{ollama_port}/api/ps", timeout=2
+        )
+        loaded = [m["name"] for m in response.json().get("models", []) if "name" in m]
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        return
+    with _loaded_models_lock:
+        for name in reversed(loaded):
+            if name in loaded_models_seen:
+                loaded_models_seen.remove(name)
+            loaded_models_seen.insert(0, name)
+
+
+def save_last_used_models():
+    """Persist this session's models so the next start can preload them."""
+    with _loaded_models_lock:
+        if not loaded_models_seen:
+            return
+        models = list(loaded_models_seen)
+    # Keep models from earlier sessions after this session's ones
+    models += [m for m in get_last_used_models() if m not in models]
+    try:
+        (get_state_dir() / LAST_MODELS_FILE).write_text(json.dumps(models[:20]))
+    except OSError as e:
+        logging.warning(f"Could not save last used models: {e}")
+
+
+def get_preload_models():
+    """Models to warm up, from LAUNCHER_PRELOAD_MODELS or the last session.
+
+    LAUNCHER_PRELOAD_MODELS is a comma-separated list of model names,
+    "last" (the default) for the models used last session or "none" to
+    disable warm-up. LAUNCHER_PRELOAD_LIMIT caps how many are loaded.
+    """
+    setting = os.environ.get("LAUNCHER_PRELOAD_MODELS", "last").strip()
+    if setting.lower() in ("", "none", "0", "off"):
+        return []
+    if setting.lower() == "last":
+        models = get_last_used_models()
     else:
-        raise RuntimeError(
-            "Ports 3000-3009 are all in use. Please close other applications and try again."
+        models = [m.strip() for m in setting.split(",") if m.strip()]
+    limit = int(env_float("LAUNCHER_PRELOAD_LIMIT", 2))
+    # Preloading more than Ollama keeps loaded would only evict the first ones
+    max_loaded = ollama_tuning.get(
+        "OLLAMA_MAX_LOADED_MODELS", os.environ.get("OLLAMA_MAX_LOADED_MODELS")
+    )
+    if max_loaded and max_loaded.isdigit() and int(max_loaded) > 0:
+        limit = min(limit, int(max_loaded))
+    return models[:limit]
+
+
+def load_model(ollama_url, model, keep_alive):
+    """Ask Ollama to load a model into memory without generating anything."""
+    session = get_http_session()
+    response = session.post(
+        f"{ollama_url}/api/generate",
+        json={"model": model, "keep_alive": keep_alive},
+        timeout=600,
+    )
+    if response.status_code == 400:
+        # Embedding models cannot generate; an empty embed loads them instead
+        response = session.post(
+            f"{ollama_url}/api/embed",
+            json={"model": model, "input": "", "keep_alive": keep_alive},
+            timeout=600,
         )
+    response.raise_for_status()
+    return response.json().get("load_duration", 0) / 1e9
+
+
+def warm_up_models(ollama_port):
+    """Load the preload models concurrently and log how long each took."""
+    models = get_preload_models()
+    if not models:
+        return
+    ollama_url = f"http://127.0.0.1:{ollama_port}"
+    keep_alive = os.environ.get("LAUNCHER_PRELOAD_KEEP_ALIVE", "30m")
+
+    try:
+        tags = get_http_session().get(f"{ollama_url}/api/tags", timeout=5).json()
+        installed = {m["name"] for m in tags.get("models", [])}
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        installed = set()
+    missing = [m for m in models if installed and m not in installed]
+    for model in missing:
+        logging.info(f"Skipping warm-up of {model}: not installed")
+    damaged = damaged_models()
+    for model in models:
+        if model not in missing and (model if ":" in model else f"{model}:latest") in damaged:
+            missing.append(model)
+            logging.info(f"Skipping warm-up of {model}: its files are damaged")
+    models = [m for m in models if m not in missing]
+    if not models:
+        return
+
+    logging.info(f"Warming up models: {', '.join(models)} (keep_alive={keep_alive})")
+
+    def warm(model):
+        started = time.monotonic()
+        try:
+            with startup_timeline.phase(f"warm-up {model}"):
+                load_seconds = load_model(ollama_url, model, keep_alive)
+            logging.info(
+                f"Model {model} ready in {time.monotonic() - started:.1f}s "
+                f"(Ollama load time {load_seconds:.1f}s)"
+            )
+        except Exception as e:
+            logging.warning(f"Warm-up of {model} failed: {e}")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        list(pool.map(warm, models))
+
+
+def start_model_warmup(ollama_port):
+    """Warm up models in the background so startup is not delayed."""
+    if env_flag("LAUNCHER_OLLAMA_ON_DEMAND"):
+        # Preloading would start Ollama right away and defeat the point
+        return
+    threading.Thread(target=warm_up_models, args=(ollama_port,), daemon=True).start()
+
+
+def run_ollama():
+    """Start Ollama server with portable data directory."""
+    # Find available port starting from 11434
+    start_ollama(reserve_port(OLLAMA_PORT_RANGE, "Ollama"))
+    return wait_for_ollama(service_ports["ollama"])
+
+
+def prepare_data_dir(data_dir):
+    """Return the DATA_DIR for the WebUI, staging it locally when enabled.
 
-    if webui_port != 3000:
-        print(f"Port 3000 in use, using alternate port {webui_port}")
+    LAUNCHER_DATA_STAGING=local (or 1) copies data/ to the host's temp
+    directory and =ram to a RAM-backed one where available; changes are
+    written back every LAUNCHER_DATA_SYNC_INTERVAL seconds and on exit.
+    LAUNCHER_DATA_STAGING_DIR overrides the location of the working copy.
+    """
+    global data_staging
+
+    if data_staging is not None:
+        return data_staging.local_dir
+    mode = os.environ.get("LAUNCHER_DATA_STAGING", "").strip().lower()
+    staging_enabled = mode not in ("", "0", "off", "false", "no")
+    if not staging_enabled and not (data_dir / ".staging-owner.json").exists():
+        return data_dir
+
+    import data_staging as staging
+
+    root = os.environ.get("LAUNCHER_DATA_STAGING_DIR") or staging.default_staging_root(mode)
+    if not staging_enabled:
+        # A staged session crashed earlier: save its changes before the
+        # WebUI starts writing to the drive directly
+        try:
+            staging.DataStaging(data_dir, root).recover()
+        except Exception as e:
+            logging.warning(f"Could not recover staged data: {e}")
+        return data_dir
+    try:
+        with startup_timeline.phase("stage data directory"):
+            data_staging = staging.DataStaging(data_dir, root)
+            local_dir = data_staging.stage()
+    except Exception as e:
+        logging.warning(f"Data staging failed ({e}); using the portable data directory")
+        data_staging = None
+        return data_dir
+    data_staging.start_periodic_sync(env_float("LAUNCHER_DATA_SYNC_INTERVAL", 300))
+    return local_dir
+
+
+def finish_data_staging():
+    """Write the staged data back to the drive once the WebUI has stopped."""
+    global data_staging
+    if data_staging is None:
+        return
+    try:
+        data_staging.stop()
+    except Exception as e:
+        logging.error(f"Final data write-back failed: {e}")
+    data_staging = None
+
+
+def prepare_webui_database(data_dir):
+    """Check and tune the WebUI database once, before the first WebUI starts.
+
+    A quick integrity check runs first; the database is then switched to
+    WAL with incremental auto-vacuum, and maintenance (ANALYZE/optimize,
+    incremental vacuum, checkpoint) is scheduled every
+    LAUNCHER_SQLITE_MAINTENANCE_INTERVAL seconds while the database is
+    idle. LAUNCHER_SQLITE_TUNING=0 leaves the database as it is.
+    """
+    global webui_db_maintenance
+
+    import webui_db
+
+    if webui_db_maintenance is not None or not webui_db.enabled():
+        return
+    with startup_timeline.phase("check WebUI database"):
+        try:
+            webui_db.prepare_database(
+                data_dir, env_float("LAUNCHER_SQLITE_VACUUM_MAX_MB", 256) * 1024 * 1024
+            )
+        except Exception as e:
+            logging.warning(f"WebUI database check failed: {e}")
+    webui_db_maintenance = webui_db.DatabaseMaintenance(
+        data_dir, env_float("LAUNCHER_SQLITE_MAINTENANCE_INTERVAL", 1800)
+    )
+    webui_db_maintenance.start()
+
+
+def start_webui(port_socket, ollama_port):
+    """Spawn the Open WebUI child on the reserved port without waiting for it.
+
+    On POSIX systems the already-listening socket is inherited by the child
+    and served by uvicorn directly, so the port is never released. Windows
+    cannot inherit sockets through Popen; there the reservation is released
+    right before the child is spawned and it binds the port by number.
+    """
+    global webui_process, webui_ready_channel
+
+    webui_port = port_socket.getsockname()[1]
+
+    # Let the child tell us the moment uvicorn has bound its port
+    if webui_ready_channel is not None:
+        webui_ready_channel.close()
+    webui_ready_channel = ReadyChannel()
+    webui_process = spawn_webui(webui_port, port_socket, ollama_port, webui_ready_channel)
+
+    service_ports["webui"] = webui_port
+    publish_ports()
+    return webui_process
+
+
+def spawn_webui(webui_port, port_socket, ollama_port, channel, standby=False):
+    """Spawn a WebUI child reporting to channel and return its process.
+
+    port_socket is None for a standby on Windows, which binds webui_port
+    by number once the active child has exited.
+    """
+    global webui_socket
 
     # Setup portable data directory on USB drive
     app_dir = get_app_dir()
     data_dir = app_dir / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
+    with startup_timeline.phase("create directories (WebUI)"):
+        data_dir.mkdir(parents=True, exist_ok=True)
 
     # Configure Open WebUI
     env = os.environ.copy()
-    env["DATA_DIR"] = str(data_dir)
-    # Use dynamic Ollama port from environment or default
-    ollama_port = os.environ.get("OLLAMA_PORT", "11434")
+    env["DATA_DIR"] = str(prepare_data_dir(data_dir))
+    prepare_webui_database(Path(env["DATA_DIR"]))
     env["OLLAMA_API_BASE"] = f"http://127.0.0.1:{ollama_port}"
     env["OPENWEBUI_PORT"] = str(webui_port)
     env["OPENWEBUI_HOST"] = "127.0.0.1"
+    env["LAUNCHER_STATE_DIR"] = str(get_state_dir())
+    env.update(channel.env())
+    # Tells this child to wait for a serve command (not the user option)
+    env["LAUNCHER_STANDBY_CHILD"] = "1" if standby else "0"
+
+    pass_fds = ()
+    if port_socket is None:
+        pass
+    elif sys.platform == "win32":
+        port_socket.close()
+        webui_socket = None
+    else:
+        port_socket.listen(2048)
+        port_socket.set_inheritable(True)
+        pass_fds = (port_socket.fileno(),)
+        env["LAUNCHER_WEBUI_FD"] = str(port_socket.fileno())
+        # Keep our copy so a restarted child can serve the same socket
+        webui_socket = port_socket
 
-    print(f"Data directory: {data_dir}")
-    print("Starting Open WebUI...")
+    print(f"Data directory: {env['DATA_DIR']}")
+    print("Starting a standby Open WebUI..." if standby else "Starting Open WebUI...")
 
     # Ensure bundled launcher exists before spawning child process
     webui_script = get_bundled_path("webui_launcher.py")
@@ -308,60 +1423,397 @@ def run_webui():
         f"WebUI environment: DATA_DIR={env['DATA_DIR']}, OLLAMA_API_BASE={env['OLLAMA_API_BASE']}"
     )
 
-    # Create a separate log file for WebUI child process
-    webui_log_file = app_dir / "webui.log"
+    # WebUI output goes through its own log pipeline into webui.log
+    webui_log = get_child_log("WebUI", "webui.log")
+    if standby:
+        webui_log.mark("standby WebUI starting")
 
     try:
-        # Redirect stdout/stderr to webui log file
-        with open(webui_log_file, "w") as log_f:
-            webui_process = subprocess.Popen(
+        with startup_timeline.phase("spawn WebUI standby" if standby else "spawn WebUI"):
+            process = subprocess.Popen(
                 webui_cmd,
                 env=env,
-                stdout=log_f,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
+                pass_fds=pass_fds,
+                **child_popen_kwargs(),
             )
+        track_process_tree(process, "WebUI")
+        webui_log.attach(process.stdout)
         logging.info(
-            f"WebUI process started (PID: {webui_process.pid}), output logging to: {webui_log_file}"
+            f"WebUI {'standby ' if standby else ''}process started (PID: {process.pid}), "
+            f"output logging to: {webui_log.file.path}"
         )
     except Exception as e:
         raise RuntimeError(f"Failed to start WebUI process: {e}")
+    return process
+
 
-    # Wait for WebUI to be ready
+def wait_for_webui(webui_port):
+    """Block until the WebUI answers HTTP requests or the process dies."""
     logging.info(f"Waiting for WebUI to start on port {webui_port}...")
     webui_url = f"http://127.0.0.1:{webui_port}"
-    for attempt in range(30):
+    timeout = env_float("LAUNCHER_WEBUI_TIMEOUT", 30)
+    ready_event = webui_ready_channel.event if webui_ready_channel else None
+    with startup_timeline.phase("WebUI first-200") as details:
+        status = wait_for_service(
+            webui_port,
+            webui_url,
+            (200, 404, 302),  # Any response means it's running
+            webui_process,
+            timeout,
+            ready_event=ready_event,
+            prebound=webui_socket is not None,
+        )
+        details["status"] = status
+
+    if status == "ready":
+        print(f"WebUI is ready at {webui_url}!")
+        return webui_process
+
+    if status == "exited":
+        exit_code = webui_process.returncode
+        error_msg = (
+            f"WebUI process exited early during startup (exit code {exit_code}).\n"
+            f"Check webui.log for details.\n"
+            f"Common issues: missing dependencies, database errors, import failures, or Ollama connection problems."
+            + recent_output("WebUI")
+        )
+        raise RuntimeError(error_msg)
+
+    raise RuntimeError(
+        f"WebUI failed to start within {timeout:g} seconds at {webui_url}.\n"
+        f"Check if port {webui_port} is blocked or if there are dependency issues."
+    )
+
+
+def run_webui():
+    """Start Open WebUI server with portable data directory."""
+    # Find available port starting from 3000
+    start_webui(reserve_port(WEBUI_PORT_RANGE, "WebUI"), service_ports["ollama"])
+    return wait_for_webui(service_ports["webui"])
+
+
+def run_services_concurrently():
+    """Start Ollama and the WebUI side by side and wait for both.
+
+    Both ports are reserved before anything is spawned so the WebUI child can
+    be pointed at Ollama straight away; Open WebUI only talks to Ollama once a
+    user makes a request, so it does not need Ollama to be up while importing.
+    Readiness is tracked per service and every failure is reported at once.
+    """
+    ollama_sock = reserve_port(OLLAMA_PORT_RANGE, "Ollama")
+    webui_sock = reserve_port(WEBUI_PORT_RANGE, "WebUI")
+    ollama_port = ollama_sock.getsockname()[1]
+    webui_port = webui_sock.getsockname()[1]
+
+    started = time.monotonic()
+    start_ollama(ollama_sock)
+    start_webui(webui_sock, ollama_port)
+
+    ready_after = {}
+    errors = {}
+
+    def wait(name, waiter, port):
         try:
-            response = requests.get(webui_url, timeout=1)
-            if response.status_code in (
-                200,
-                404,
-                302,
-            ):  # Any response means it's running
-                print(f"WebUI is ready at {webui_url}!")
-                return webui_process
-        except (requests.RequestException, ConnectionError):
-            pass
-
-        # Check if process crashed
-        if webui_process.poll() is not None:
-            exit_code = webui_process.returncode
-            error_msg = (
-                f"WebUI process exited early during startup (exit code {exit_code}).\n"
-                f"Check the log output above for details.\n"
-                f"Common issues: missing dependencies, database errors, import failures, or Ollama connection problems."
+            waiter(port)
+            ready_after[name] = time.monotonic() - started
+        except Exception as e:
+            errors[name] = e
+
+    waiters = [
+        threading.Thread(
+            target=wait, args=("Ollama", wait_for_ollama, ollama_port), daemon=True
+        ),
+        threading.Thread(
+            target=wait, args=("WebUI", wait_for_webui, webui_port), daemon=True
+        ),
+    ]
+    for t in waiters:
+        t.start()
+    for t in waiters:
+        t.join()
+
+    if errors:
+        details = "\n".join(f"- {name}: {err}" for name, err in errors.items())
+        raise RuntimeError(f"Startup failed for {', '.join(errors)}:\n{details}")
+
+    # Sequential startup pays both readiness times back to back; estimate the
+    # saving from the per-service readiness times we just measured.
+    elapsed = max(ready_after.values())
+    sequential_estimate = sum(ready_after.values())
+    logging.info(
+        f"Concurrent startup ready in {elapsed:.2f}s "
+        f"(Ollama {ready_after['Ollama']:.2f}s, WebUI {ready_after['WebUI']:.2f}s); "
+        f"saved ~{sequential_estimate - elapsed:.2f}s time-to-browser versus sequential startup"
+    )
+    return ollama_process, webui_process
+
+
+class RestartPolicy:
+    """Exponential restart backoff with a crash-loop limit for one service.
+
+    Configured with LAUNCHER_RESTART_BACKOFF (initial delay in seconds),
+    LAUNCHER_MAX_RESTARTS and LAUNCHER_RESTART_WINDOW: more than
+    LAUNCHER_MAX_RESTARTS restarts within LAUNCHER_RESTART_WINDOW seconds
+    counts as a crash loop and the launcher gives up.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.base_delay = env_float("LAUNCHER_RESTART_BACKOFF", 1)
+        self.max_delay = 60
+        self.max_restarts = int(env_float("LAUNCHER_MAX_RESTARTS", 5))
+        self.window = env_float("LAUNCHER_RESTART_WINDOW", 300)
+        self.restarts = []
+        self.total_restarts = 0
+        self.total_downtime = 0.0
+
+    def next_delay(self):
+        """Return the delay before the next restart, or raise on a crash loop."""
+        now = time.monotonic()
+        self.restarts = [t for t in self.restarts if now - t < self.window]
+        if len(self.restarts) >= self.max_restarts:
+            raise RuntimeError(
+                f"{self.name} crashed {len(self.restarts)} times within "
+                f"{self.window:g} seconds; giving up."
             )
-            raise RuntimeError(error_msg)
+        delay = min(self.base_delay * (2 ** len(self.restarts)), self.max_delay)
+        self.restarts.append(now)
+        self.total_restarts += 1
+        return delay
+
+
+def reserve_same_port(port, port_range, service_name):
+    """Reserve port again if it is still free, otherwise pick a new one."""
+    sock = bind_port(port) if port else None
+    if sock is None:
+        sock = reserve_port(port_range, service_name)
+        logging.warning(
+            f"{service_name} port {port} is no longer available; "
+            f"moving to port {sock.getsockname()[1]}"
+        )
+    return sock
 
-        time.sleep(1)
 
-    raise RuntimeError(
-        f"WebUI failed to start within 30 seconds at {webui_url}.\n"
-        f"Check if port {webui_port} is blocked or if there are dependency issues."
+def restart_ollama():
+    """Restart Ollama, on the same port when it is still free."""
+    if ollama_process is not None:
+        terminate_process_tree(ollama_process, "Ollama", env_float("LAUNCHER_SHUTDOWN_TIMEOUT", 5))
+    old_port = service_ports["ollama"]
+    start_ollama(reserve_same_port(old_port, OLLAMA_PORT_RANGE, "Ollama"))
+    wait_for_ollama(service_ports["ollama"])
+    return service_ports["ollama"] != old_port
+
+
+def start_webui_standby():
+    """Spawn a WebUI child that imports Open WebUI and then waits.
+
+    Enabled with LAUNCHER_WEBUI_STANDBY=1. The standby has the app imported
+    but serves nothing until promote_webui_standby() tells it to, so a
+    restart does not pay for the import again.
+    """
+    global webui_standby
+
+    if not env_flag("LAUNCHER_WEBUI_STANDBY") or webui_standby is not None:
+        return
+    channel = ReadyChannel()
+    try:
+        process = spawn_webui(
+            service_ports["webui"], webui_socket, service_ports["ollama"], channel, standby=True
+        )
+    except (RuntimeError, OSError) as e:
+        channel.close()
+        logging.warning(f"Could not start a standby WebUI: {e}")
+        return
+    webui_standby = {
+        "process": process,
+        "channel": channel,
+        "ollama_port": service_ports["ollama"],
+    }
+
+
+def discard_webui_standby():
+    """Stop the standby WebUI, if there is one."""
+    global webui_standby
+
+    standby, webui_standby = webui_standby, None
+    if standby is None:
+        return
+    # Closing the control connection alone makes the standby exit
+    standby["channel"].close()
+    terminate_process_tree(standby["process"], "WebUI standby", 2)
+
+
+def promote_webui_standby():
+    """Make the standby the active WebUI; returns False if it cannot be used.
+
+    A standby started for another Ollama port has a stale OLLAMA_API_BASE
+    and is discarded. One that is still importing is waited for, since
+    that is never slower than starting a new child.
+    """
+    global webui_standby, webui_process, webui_ready_channel
+
+    standby = webui_standby
+    if standby is None:
+        return False
+    usable = (
+        standby["process"].poll() is None
+        and standby["ollama_port"] == service_ports["ollama"]
+        and standby["channel"].standby.wait(env_float("LAUNCHER_WEBUI_TIMEOUT", 30))
     )
+    if usable and webui_socket is None:
+        # Without an inherited socket the standby binds the port itself
+        probe = bind_port(service_ports["webui"])
+        usable = probe is not None
+        if probe is not None:
+            probe.close()
+    if not usable or not standby["channel"].send({"command": "serve"}):
+        logging.warning("Standby WebUI is not usable; starting a new WebUI instead")
+        discard_webui_standby()
+        return False
+
+    webui_standby = None
+    if webui_ready_channel is not None:
+        webui_ready_channel.close()
+    webui_process, webui_ready_channel = standby["process"], standby["channel"]
+    logging.info(f"Standby WebUI (PID: {webui_process.pid}) is taking over")
+    return True
+
+
+def restart_webui():
+    """Restart the WebUI, serving the socket the launcher still holds.
+
+    A standby WebUI takes over when there is one, and a new standby is
+    started once the WebUI is back.
+    """
+    if webui_process is not None:
+        terminate_process_tree(webui_process, "WebUI", env_float("LAUNCHER_SHUTDOWN_TIMEOUT", 5))
+    if not promote_webui_standby():
+        if webui_socket is not None:
+            port_socket = webui_socket
+        else:
+            port_socket = reserve_same_port(service_ports["webui"], WEBUI_PORT_RANGE, "WebUI")
+        start_webui(port_socket, service_ports["ollama"])
+    wait_for_webui(service_ports["webui"])
+    start_webui_standby()
+
+
+def supervise_services():
+    """Watch both children until the launcher is asked to stop.
+
+    Every LAUNCHER_HEALTH_INTERVAL seconds both processes are polled and
+    their HTTP endpoints health-checked. A child that exited, or failed
+    LAUNCHER_HEALTH_FAILURES health checks in a row, is restarted with
+    exponential backoff. When Ollama has to move to another port the WebUI
+    is restarted too so it picks up the new OLLAMA_API_BASE.
+    """
+    interval = env_float("LAUNCHER_HEALTH_INTERVAL", 5)
+    max_failures = int(env_float("LAUNCHER_HEALTH_FAILURES", 3))
+    policies = {"Ollama": RestartPolicy("Ollama"), "WebUI": RestartPolicy("WebUI")}
+    failures = {"Ollama": 0, "WebUI": 0}
+
+    def health(name):
+        if name == "Ollama":
+            process = ollama_process
+            url = f"http://127.0.0.1:{service_ports['ollama']}/api/tags"
+            ok_statuses = (200,)
+        else:
+            process = webui_process
+            url = f"http://127.0.0.1:{service_ports['webui']}"
+            ok_statuses = (200, 404, 302)
+        if process.poll() is not None:
+            metrics.set(
+                "launcher_service_up",
+                "Whether the service passed its last health check.",
+                0,
+                service=name,
+            )
+            return f"exited with code {process.returncode}"
+        check_start = time.monotonic()
+        healthy = probe_http(url, ok_statuses, timeout=interval)
+        metrics.observe(
+            "launcher_health_check_seconds",
+            "Latency of the supervisor's HTTP health checks.",
+            time.monotonic() - check_start,
+            service=name,
+        )
+        metrics.set(
+            "launcher_service_up",
+            "Whether the service passed its last health check.",
+            1 if healthy else 0,
+            service=name,
+        )
+        if healthy:
+            failures[name] = 0
+            return None
+        metrics.inc(
+            "launcher_health_check_failures_total", "Failed health checks.", service=name
+        )
+        failures[name] += 1
+        if failures[name] >= max_failures:
+            return f"failed {failures[name]} health checks in a row"
+        return None
+
+    def restart(name, reason):
+        policy = policies[name]
+        down_since = time.monotonic()
+        hint = damaged_models_hint() if name == "Ollama" else ""
+        logging.warning(f"{name} {reason}; restarting{hint}{recent_output(name, 10)}")
+        if name in child_logs:
+            child_logs[name].mark(f"{name} {reason}; restarting")
+        while True:
+            delay = policy.next_delay()
+            logging.info(
+                f"Restarting {name} in {delay:g}s "
+                f"(restart {policy.total_restarts}, {len(policy.restarts)} in window)"
+            )
+            time.sleep(delay)
+            try:
+                if name == "Ollama":
+                    moved = restart_ollama()
+                    if moved:
+                        logging.info("Ollama changed port; restarting WebUI to follow it")
+                        restart_webui()
+                else:
+                    restart_webui()
+                break
+            except (RuntimeError, OSError) as e:
+                # A vanished binary or a failed Popen is retried like a crash;
+                # the restart policy gives up on a crash loop
+                logging.error(f"{name} restart failed: {e}")
+        downtime = time.monotonic() - down_since
+        policy.total_downtime += downtime
+        metrics.inc("launcher_restarts_total", "Restarts of a crashed or hung service.", service=name)
+        metrics.inc(
+            "launcher_downtime_seconds_total",
+            "Time services spent down while being restarted.",
+            downtime,
+            service=name,
+        )
+        failures[name] = 0
+        logging.info(
+            f"{name} recovered after {downtime:.1f}s downtime "
+            f"({policy.total_restarts} restarts, {policy.total_downtime:.1f}s total downtime)"
+        )
+
+    last_model_check = 0
+    while True:
+        time.sleep(interval)
+        for name in ("Ollama", "WebUI"):
+            reason = health(name)
+            if reason:
+                restart(name, reason)
+        # Models can be unloaded again before shutdown, so sample regularly
+        if time.monotonic() - last_model_check >= 30:
+            last_model_check = time.monotonic()
+            record_loaded_models(service_ports["ollama"])
 
 
 def open_browser_delayed(port=3000):
     """Open browser after ensuring WebUI is fully ready."""
+    import webbrowser
+
     time.sleep(3)
     webui_url = f"http://localhost:{port}"
     print(f"Opening browser to {webui_url}...")
@@ -376,7 +1828,12 @@ def signal_handler(signum, frame):
 
 
 def setup_logging():
-    """Setup logging to file in app directory for debugging."""
+    """Setup logging to file in app directory for debugging.
+
+    launcher.log is appended to and rotated by size like the child logs.
+    """
+    from log_pipeline import rotating_file_handler
+
     app_dir = get_app_dir()
     log_file = app_dir / "launcher.log"
 
@@ -385,7 +1842,11 @@ def setup_logging():
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
         handlers=[
-            logging.FileHandler(log_file, mode="w"),
+            rotating_file_handler(
+                log_file,
+                max_bytes=int(env_float("LAUNCHER_LOG_MAX_MB", 10) * 1024 * 1024),
+                backups=int(env_float("LAUNCHER_LOG_BACKUPS", 3)),
+            ),
             logging.StreamHandler(sys.stdout),
         ],
     )
@@ -393,11 +1854,93 @@ def setup_logging():
     return log_file
 
 
+def start_metrics():
+    """Serve launcher metrics in Prometheus format while the services run.
+
+    Resource use of the process trees is sampled every
+    LAUNCHER_METRICS_INTERVAL seconds. The endpoint is only started with
+    LAUNCHER_METRICS=1, on the first free port from 9464.
+    """
+    from metrics import ProcessSampler, start_metrics_server
+
+    for phase in startup_timeline.to_json()["phases"]:
+        metrics.set(
+            "launcher_startup_phase_seconds",
+            "Duration of each startup phase of this session.",
+            phase["duration"],
+            phase=phase["name"],
+            process=phase["process"],
+        )
+    if not env_flag("LAUNCHER_METRICS"):
+        return
+
+    ProcessSampler(
+        metrics,
+        lambda: {
+            "Ollama": ollama_process,
+            "WebUI": webui_process,
+            "WebUI standby": webui_standby and webui_standby["process"],
+        },
+        env_float("LAUNCHER_METRICS_INTERVAL", 15),
+    ).start()
+    sock = reserve_port(METRICS_PORT_RANGE, "metrics")
+    start_metrics_server(metrics, sock)
+    service_ports["metrics"] = sock.getsockname()[1]
+    publish_ports()
+    logging.info(f"Metrics at: http://localhost:{service_ports['metrics']}/metrics")
+
+
+def setup_runtime_cache():
+    """Run bundled files from a persistent copy in onefile builds.
+
+    LAUNCHER_RUNTIME_CACHE=host keeps the copy in the user's cache
+    directory and =app next to the app (see runtime_cache.py). Children
+    re-executed from a onefile build reuse the parent's unpacked bundle
+    rather than unpacking it again.
+    """
+    import runtime_cache
+
+    if not runtime_cache.is_onefile():
+        return
+    # PyInstaller 6.9+ shares the parent's extraction with children of the
+    # same executable unless this is set
+    os.environ.pop("PYINSTALLER_RESET_ENVIRONMENT", None)
+    mode = os.environ.get("LAUNCHER_RUNTIME_CACHE", "").strip().lower()
+    if mode in ("", "0", "off", "false", "no"):
+        return
+    with startup_timeline.phase("runtime cache"):
+        try:
+            runtime_dir = runtime_cache.prepare(
+                "app" if mode == "app" else "host",
+                get_app_dir(),
+                keep=int(env_float("LAUNCHER_RUNTIME_CACHE_KEEP", 2)),
+            )
+        except Exception as e:
+            logging.warning(f"Runtime cache unavailable, running from the bundle: {e}")
+            return
+    os.environ["LAUNCHER_RUNTIME_DIR"] = str(runtime_dir)
+
+
+def write_startup_trace(log_file):
+    """Write the startup timeline next to launcher.log.
+
+    Set LAUNCHER_CHROME_TRACE=1 to also export startup-trace.chrome.json.
+    """
+    try:
+        trace_file = startup_timeline.write(
+            Path(log_file).parent, chrome=env_flag("LAUNCHER_CHROME_TRACE")
+        )
+        logging.info(f"Startup trace written to: {trace_file}")
+    except Exception as e:
+        logging.warning(f"Failed to write startup trace: {e}")
+
+
 def launcher_main():
     """Primary entry point for the portable launcher."""
     try:
         # Setup logging first
-        log_file = setup_logging()
+        with startup_timeline.phase("logging setup"):
+            log_file = setup_logging()
         logging.info("=" * 50)
         logging.info("Open WebUI + Ollama Portable Launcher")
         logging.info("=" * 50)
@@ -406,6 +1949,14 @@ def launcher_main():
         print(f"Failed to setup logging: {e}")
         sys.exit(1)
 
+    load_requests()
+    setup_runtime_cache()
+
+    global metrics
+    from metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+
     # Register cleanup handlers
     atexit.register(cleanup_processes)
     signal.signal(signal.SIGINT, signal_handler)
@@ -413,43 +1964,148 @@ def launcher_main():
 
     try:
 
-        # Start services
-        logging.info("Starting Ollama...")
-        ollama_p = run_ollama()
+        # Start services. Concurrent startup is the default; set
+        # LAUNCHER_SEQUENTIAL_STARTUP=1 to wait for Ollama before the WebUI.
+        if env_flag("LAUNCHER_SEQUENTIAL_STARTUP"):
+            logging.info("Starting Ollama...")
+            ollama_p = run_ollama()
 
-        logging.info("Starting WebUI...")
-        webui_p = run_webui()
+            logging.info("Starting WebUI...")
+            webui_p = run_webui()
+        else:
+            logging.info("Starting Ollama and WebUI concurrently...")
+            ollama_p, webui_p = run_services_concurrently()
+        write_startup_trace(log_file)
 
-        # Get WebUI port from environment
-        webui_port = int(os.environ.get("OPENWEBUI_PORT", "3000"))
+        webui_port = service_ports["webui"]
 
-        # Open browser in background
-        threading.Thread(
-            target=open_browser_delayed, args=(webui_port,), daemon=True
-        ).start()
+        # Open browser in background (LAUNCHER_OPEN_BROWSER=0 disables)
+        if env_flag("LAUNCHER_OPEN_BROWSER", True):
+            threading.Thread(
+                target=open_browser_delayed, args=(webui_port,), daemon=True
+            ).start()
 
         logging.info("\nServices running!")
         logging.info(f"Access WebUI at: http://localhost:{webui_port}")
-        ollama_port = os.environ.get("OLLAMA_PORT", "11434")
-        logging.info(f"Ollama API at: http://localhost:{ollama_port}")
+        logging.info(f"Ollama API at: http://localhost:{service_ports['ollama']}")
         logging.info("Press Ctrl+C to stop\n")
         logging.info(f"Log file available at: {log_file}")
 
-        # Wait for WebUI process (main process)
-        webui_p.wait()
+        start_metrics()
+        start_webui_standby()
+
+        start_blob_cache_mirror(get_app_dir() / ".ollama" / "models")
+
+        # Keep both services alive until we are asked to stop
+        supervise_services()
 
     except KeyboardInterrupt:
         logging.info("\nInterrupted by user")
     except Exception as e:
         logging.error(f"\nERROR: {e}", exc_info=True)
+        write_startup_trace(log_file)
         sys.exit(1)
     finally:
         cleanup_processes()
+        clear_published_ports()
         logging.info("Shutdown complete.")
 
 
+def running_launcher_ollama():
+    """Port of the Ollama a running launcher published, if it answers."""
+    try:
+        port = json.loads((get_state_dir() / "ports.json").read_text())["ollama"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if probe_http(f"http://127.0.0.1:{port}/api/tags"):
+        return port
+    return None
+
+
+def run_batch_mode():
+    """Run prompts from a JSONL file through Ollama without the WebUI.
+
+    Invoked as main.py --batch; see batch_inference.py for the arguments.
+    When a launcher is already running in this folder its Ollama is used,
+    otherwise Ollama is started as in the full launcher and stopped again
+    once the batch is done.
+    """
+    import batch_inference
+
+    args = batch_inference.parse_args(sys.argv[sys.argv.index(BATCH_FLAG) + 1 :])
+
+    # Results may go to stdout, so everything else goes to stderr
+    results_stream = sys.stdout
+    sys.stdout = sys.stderr
+    setup_logging()
+    load_requests()
+    setup_runtime_cache()
+    # The batch loads the models it needs; nothing to preload
+    os.environ.setdefault("LAUNCHER_PRELOAD_MODELS", "none")
+
+    atexit.register(cleanup_processes)
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    port = running_launcher_ollama()
+    started_ollama = port is None
+    summary = None
+    try:
+        if started_ollama:
+            logging.info("Starting Ollama for batch inference...")
+            run_ollama()
+            port = service_ports["ollama"]
+        else:
+            logging.info(f"Using the running launcher's Ollama on port {port}")
+        summary = batch_inference.run_batch(
+            args, f"http://127.0.0.1:{port}", requests, results_stream
+        )
+    except KeyboardInterrupt:
+        logging.info("\nInterrupted by user")
+    except Exception as e:
+        logging.error(f"\nERROR: {e}", exc_info=True)
+    finally:
+        cleanup_processes()
+        if started_ollama:
+            clear_published_ports()
+    sys.exit(0 if summary is not None and not summary["errors"] else 1)
+
+
+def run_import_mode():
+    """Import GGUF files or blobs into the portable model store and exit.
+
+    Invoked as main.py --import-models; see model_import.py for the
+    arguments. A running Ollama picks the new models up without a restart.
+    """
+    import model_import
+
+    args = model_import.parse_args(sys.argv[sys.argv.index(IMPORT_FLAG) + 1 :])
+    setup_logging()
+    try:
+        failures = model_import.run_import(args, get_app_dir() / ".ollama" / "models")
+    except KeyboardInterrupt:
+        logging.info("\nInterrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logging.error(f"\nERROR: {e}")
+        sys.exit(1)
+    sys.exit(1 if failures else 0)
+
+
 if __name__ == "__main__":
-    if WEBUI_CHILD_FLAG in sys.argv:
+    if getattr(sys, "frozen", False):
+        # Multi-worker uvicorn starts its workers through multiprocessing,
+        # which re-runs this executable with its own arguments
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    if OLLAMA_POOL_FLAG in sys.argv:
+        run_ollama_pool_mode()
+    elif BATCH_FLAG in sys.argv:
+        run_batch_mode()
+    elif IMPORT_FLAG in sys.argv:
+        run_import_mode()
+    elif WEBUI_CHILD_FLAG in sys.argv:
         sys.argv.remove(WEBUI_CHILD_FLAG)
         try:
             run_webui_child_mode()
@@ -0,0 +1,321 @@
+"""
+Local metrics endpoint in Prometheus text format.
+
+The launcher samples CPU time, resident memory, open files and I/O of the
+Ollama and WebUI process trees on a timer and records health-check
+latency, restarts and startup phase durations. A small HTTP server on
+127.0.0.1 serves them at /metrics so long sessions can be charted without
+attaching a profiler. psutil is used when installed; without it process
+sampling reads /proc and is only available on Linux.
+"""
+import logging
+import os
+import sys
+import threading
+
+# Health-check latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Series written per process tree by ProcessSampler
+PROCESS_SERIES = (
+    "launcher_process_cpu_seconds_total",
+    "launcher_process_resident_memory_bytes",
+    "launcher_process_open_files",
+    "launcher_process_read_bytes_total",
+    "launcher_process_written_bytes_total",
+    "launcher_process_count",
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels)) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms rendered for Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> (type, help text, {label tuple: value})
+        self._metrics = {}
+
+    def _series(self, name, kind, help_text):
+        if name not in self._metrics:
+            self._metrics[name] = (kind, help_text, {})
+        return self._metrics[name][2]
+
+    def set(self, name, help_text, value, **labels):
+        """Set a gauge."""
+        with self._lock:
+            self._series(name, "gauge", help_text)[tuple(labels.items())] = value
+
+    def inc(self, name, help_text, amount=1, **labels):
+        """Increase a counter."""
+        key = tuple(labels.items())
+        with self._lock:
+            series = self._series(name, "counter", help_text)
+            series[key] = series.get(key, 0) + amount
+
+    def set_counter(self, name, help_text, value, **labels):
+        """Set a counter sampled from a cumulative source (e.g. CPU time)."""
+        with self._lock:
+            self._series(name, "counter", help_text)[tuple(labels.items())] = value
+
+    def observe(self, name, help_text, value, **labels):
+        """Record one observation in a histogram."""
+        key = tuple(labels.items())
+        with self._lock:
+            series = self._series(name, "histogram", help_text)
+            if key not in series:
+                series[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            histogram = series[key]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def remove(self, name, **labels):
+        """Drop one series, e.g. for a process tree that has gone away."""
+        with self._lock:
+            if name in self._metrics:
+                self._metrics[name][2].pop(tuple(labels.items()), None)
+
+    def render(self):
+        """The current values in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, series) in sorted(self._metrics.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in series.items():
+                    if kind != "histogram":
+                        lines.append(f"{name}{_labels(key)} {value:g}")
+                        continue
+                    for bound, count in zip(LATENCY_BUCKETS, value["buckets"]):
+                        lines.append(f"{name}_bucket{_labels(key + (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{_labels(key)} {value['sum']:g}")
+                    lines.append(f"{name}_count{_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _read_proc_stat(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        # The command name may contain spaces; fields resume after ")"
+        return f.read().rsplit(")", 1)[1].split()
+
+
+def _proc_group_pids(pgid):
+    """PIDs of every process in a process group, from /proc."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            # Field 5 of stat (index 2 after the command name) is the group
+            if int(_read_proc_stat(entry)[2]) == pgid:
+                pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return pids
+
+
+def _sample_proc(pid):
+    """(cpu seconds, rss bytes, open files, read bytes, written bytes) from /proc."""
+    fields = _read_proc_stat(pid)
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    try:
+        open_files = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        open_files = 0
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "read_bytes":
+                    read_bytes = int(value)
+                elif key == "write_bytes":
+                    write_bytes = int(value)
+    except OSError:
+        pass
+    return cpu, rss, open_files, read_bytes, write_bytes
+
+
+def _sample_psutil(process):
+    cpu_times = process.cpu_times()
+    try:
+        if sys.platform == "win32":
+            open_files = process.num_handles()
+        else:
+            open_files = process.num_fds()
+    except Exception:
+        open_files = 0
+    try:
+        io = process.io_counters()
+        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+    except Exception:
+        read_bytes = write_bytes = 0
+    return (
+        cpu_times.user + cpu_times.system,
+        process.memory_info().rss,
+        open_files,
+        read_bytes,
+        write_bytes,
+    )
+
+
+def sample_process_tree(pid, own_group=True):
+    """Summed resource use of a process and its descendants, or None.
+
+    Children of the launcher lead their own process group, so without
+    psutil the tree is found by group on Linux.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    totals = [0.0, 0, 0, 0, 0]
+    count = 0
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + (root.children(recursive=True) if own_group else [])
+        except psutil.Error:
+            return None
+        for process in processes:
+            try:
+                sample = _sample_psutil(process)
+            except psutil.Error:
+                continue
+            totals = [a + b for a, b in zip(totals, sample)]
+            count += 1
+    elif sys.platform.startswith("linux"):
+        pids = _proc_group_pids(pid) if own_group else [pid]
+        for member in pids:
+            try:
+                sample = _sample_proc(member)
+            except (OSError, IndexError, ValueError):
+                continue
+            totals = [a + b for a, b in zip(totals, sample)]
+            count += 1
+    else:
+        return None
+    if not count:
+        return None
+    return dict(
+        zip(("cpu_seconds", "rss_bytes", "open_files", "read_bytes", "write_bytes"), totals),
+        processes=count,
+    )
+
+
+class ProcessSampler:
+    """Samples the child process trees into a registry on a timer."""
+
+    def __init__(self, registry, get_processes, interval):
+        self.registry = registry
+        self.get_processes = get_processes
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        processes = dict(self.get_processes())
+        trees = {name: (p.pid, True) for name, p in processes.items() if p is not None}
+        trees["launcher"] = (os.getpid(), False)
+        for service, (pid, own_group) in trees.items():
+            usage = sample_process_tree(pid, own_group)
+            if usage is None:
+                for name in PROCESS_SERIES:
+                    self.registry.remove(name, service=service)
+                continue
+            r = self.registry
+            r.set_counter(
+                "launcher_process_cpu_seconds_total",
+                "User and system CPU time of the process tree.",
+                usage["cpu_seconds"],
+                service=service,
+            )
+            r.set(
+                "launcher_process_resident_memory_bytes",
+                "Resident memory of the process tree.",
+                usage["rss_bytes"],
+                service=service,
+            )
+            r.set(
+                "launcher_process_open_files",
+                "Open file descriptors (handles on Windows) of the process tree.",
+                usage["open_files"],
+                service=service,
+            )
+            r.set_counter(
+                "launcher_process_read_bytes_total",
+                "Bytes read from storage by the process tree.",
+                usage["read_bytes"],
+                service=service,
+            )
+            r.set_counter(
+                "launcher_process_written_bytes_total",
+                "Bytes written to storage by the process tree.",
+                usage["write_bytes"],
+                service=service,
+            )
+            r.set(
+                "launcher_process_count",
+                "Number of processes in the tree.",
+                usage["processes"],
+                service=service,
+            )
+
+    def start(self):
+        def loop():
+            while True:
+                try:
+                    self.sample()
+                except Exception as e:
+                    logging.debug(f"Process sampling failed: {e}")
+                if self._stop.wait(self.interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_metrics_server(registry, sock):
+    """Serve registry at /metrics on an already-bound listening socket."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(sock.getsockname(), MetricsHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,354 @@
+"""
+Bulk import of GGUF files and Ollama blobs into the portable model store.
+
+``main.py --import-models PATH...`` copies each file into
+``.ollama/models/blobs`` in a single pass that hashes while it copies, so
+multi-GB files are read once and written once. GGUF files also get a
+config blob and a manifest (written atomically), after which Ollama lists
+them like any pulled model. Files named ``sha256-<hex>`` are checked
+against their name and imported together with the manifests of the
+Ollama store they come from (``<store>/manifests`` next to ``blobs``);
+Ollama deletes blobs no manifest refers to, so blobs without one are
+refused. Blobs already in the store are not copied again. Several files
+are imported in parallel; hashing and file I/O release the GIL, so
+threads spread across cores.
+
+A GGUF file's chat template (``tokenizer.chat_template``) is a Jinja
+template Ollama cannot use, so a GGUF model gets no prompt template or
+parameters unless one is given with --template; without it, chat
+requests reach the model unformatted.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from model_store import (
+    blob_digest,
+    blob_name,
+    copy_and_hash,
+    gguf_metadata,
+    sha256_file,
+    iter_manifests,
+    manifest_digests,
+    referenced_digests,
+    write_json_atomic,
+)
+
+REGISTRY = "registry.ollama.ai"
+MANIFEST_MEDIA_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+CONFIG_MEDIA_TYPE = "application/vnd.docker.container.image.v1+json"
+MODEL_MEDIA_TYPE = "application/vnd.ollama.image.model"
+TEMPLATE_MEDIA_TYPE = "application/vnd.ollama.image.template"
+
+# general.file_type values as Ollama names them
+GGUF_FILE_TYPES = {
+    0: "F32",
+    1: "F16",
+    2: "Q4_0",
+    3: "Q4_1",
+    7: "Q8_0",
+    8: "Q5_0",
+    9: "Q5_1",
+    10: "Q2_K",
+    11: "Q3_K_S",
+    12: "Q3_K_M",
+    13: "Q3_K_L",
+    14: "Q4_K_S",
+    15: "Q4_K_M",
+    16: "Q5_K_S",
+    17: "Q5_K_M",
+    18: "Q6_K",
+    32: "BF16",
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py --import-models",
+        description="Import GGUF files or Ollama blobs into the portable model store.",
+    )
+    parser.add_argument("paths", nargs="+", help="GGUF files, sha256-* blobs or folders of them")
+    parser.add_argument(
+        "-n", "--name", help="model name[:tag] for a single GGUF file (default: the file name)"
+    )
+    parser.add_argument(
+        "-t",
+        "--template",
+        type=Path,
+        help="file with an Ollama (Go) prompt template for a single GGUF file; GGUF "
+        "imports have none otherwise, as the Jinja chat template in the file cannot be used",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="files imported in parallel (default: up to 4)",
+    )
+    args = parser.parse_intermixed_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+
+def collect_files(paths):
+    """GGUF and blob files named on the command line or inside folders."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and (child.suffix.lower() == ".gguf" or blob_digest(child)):
+                    files.append(child)
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or folder: {path}")
+    return files
+
+
+def model_name(path, name=None):
+    """(name, tag) for a GGUF file, from --name or the file name."""
+    if name:
+        base, _, tag = name.partition(":")
+    else:
+        base, tag = path.stem, ""
+    base = re.sub(r"[^a-z0-9_./-]+", "-", base.lower()).strip("-.") or "model"
+    return base, tag or "latest"
+
+
+def find_manifests(blob_files, blobs_dir):
+    """Manifests that make imported blobs usable, and blobs left without one.
+
+    A blob at <store>/blobs/sha256-<hex> is usable once a manifest from
+    <store>/manifests refers to it and every other blob that manifest needs
+    is imported too or already in blobs_dir; blobs the target store's own
+    manifests already use need nothing more. Returns ({manifest path: path
+    relative to the manifests folder}, [blobs no such manifest refers to]).
+    """
+    available = {blob_digest(f) for f in blob_files}
+    available.update(filter(None, map(blob_digest, blobs_dir.glob("sha256-*"))))
+    manifests = {}
+    covered = referenced_digests(blobs_dir.parent)
+    for store in {f.parent.parent for f in blob_files}:
+        for _, path, manifest in iter_manifests(store):
+            digests = set(manifest_digests(manifest))
+            if digests and digests <= available:
+                manifests[path] = path.relative_to(store / "manifests")
+                covered |= digests
+    orphans = [f for f in blob_files if blob_digest(f) not in covered]
+    return manifests, orphans
+
+
+def import_manifest(models_dir, source, rel):
+    """Copy a manifest once all its blobs are in the store; returns success.
+
+    The bytes are copied unchanged: their hash is the model's digest.
+    """
+    data = source.read_bytes()
+    digests = manifest_digests(json.loads(data))
+    if not all((models_dir / "blobs" / blob_name(d)).exists() for d in digests):
+        return False
+    target = models_dir / "manifests" / rel
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    return True
+
+
+def write_small_blob(blobs_dir, data):
+    """Store a config or template blob; returns its digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = blobs_dir / blob_name(digest)
+    if not path.exists():
+        tmp = path.with_name(f".import-{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return digest
+
+
+def import_blob(source, blobs_dir, expected=None):
+    """Copy one file into blobs_dir unless its digest is already there.
+
+    Returns (digest, copied). A file whose size matches a blob already in
+    the store is hashed first (a read, no write) so duplicates are never
+    copied; anything else is hashed while it is copied.
+    """
+    size = source.stat().st_size
+    if expected:
+        target = blobs_dir / blob_name(expected)
+        if target.exists() and target.stat().st_size == size:
+            return expected, False
+    elif any(p.stat().st_size == size for p in blobs_dir.glob("sha256-*")):
+        digest = sha256_file(source)
+        if (blobs_dir / blob_name(digest)).exists():
+            return digest, False
+
+    # Not named like a blob, so Ollama's pruning leaves it alone meanwhile
+    tmp = blobs_dir / f".import-{uuid.uuid4().hex}.tmp"
+    digest = copy_and_hash(source, tmp)
+    if expected and digest != expected:
+        tmp.unlink(missing_ok=True)
+        raise ValueError(f"{source.name} does not match its digest (got {digest[:12]})")
+    target = blobs_dir / blob_name(digest)
+    if target.exists():
+        tmp.unlink(missing_ok=True)
+        return digest, False
+    os.replace(tmp, target)
+    return digest, True
+
+
+def write_model(models_dir, name, tag, source, digest, size, template=None):
+    """Write the config blob and manifest that make a GGUF blob a model.
+
+    template is the text of an Ollama prompt template to add as a layer.
+    """
+    metadata = gguf_metadata(
+        source, ("general.architecture", "general.file_type", "general.size_label")
+    ) or {}
+    architecture = metadata.get("general.architecture", "")
+    layers = [{"mediaType": MODEL_MEDIA_TYPE, "digest": f"sha256:{digest}", "size": size}]
+    if template is not None:
+        template_bytes = template.encode("utf-8")
+        template_digest = write_small_blob(models_dir / "blobs", template_bytes)
+        layers.append(
+            {
+                "mediaType": TEMPLATE_MEDIA_TYPE,
+                "digest": f"sha256:{template_digest}",
+                "size": len(template_bytes),
+            }
+        )
+    config = {
+        "model_format": "gguf",
+        "model_family": architecture,
+        "model_families": [architecture] if architecture else None,
+        "model_type": metadata.get("general.size_label", ""),
+        "file_type": GGUF_FILE_TYPES.get(metadata.get("general.file_type"), ""),
+        "architecture": "amd64",
+        "os": "linux",
+        "rootfs": {"type": "layers", "diff_ids": [layer["digest"] for layer in layers]},
+    }
+    config_bytes = json.dumps(config).encode("utf-8")
+    config_digest = write_small_blob(models_dir / "blobs", config_bytes)
+
+    manifest = {
+        "schemaVersion": 2,
+        "mediaType": MANIFEST_MEDIA_TYPE,
+        "config": {
+            "mediaType": CONFIG_MEDIA_TYPE,
+            "digest": f"sha256:{config_digest}",
+            "size": len(config_bytes),
+        },
+        "layers": layers,
+    }
+    namespace, _, model = name.rpartition("/")
+    manifest_path = models_dir / "manifests" / REGISTRY / (namespace or "library") / model / tag
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    if manifest_path.exists():
+        logging.info(f"Replacing existing model {name}:{tag}")
+    write_json_atomic(manifest_path, manifest)
+
+
+def format_rate(size, seconds):
+    return f"{size / 1e9:.2f} GB in {seconds:.1f}s ({size / 1e6 / max(seconds, 1e-6):.0f} MB/s)"
+
+
+def import_file(models_dir, source, name=None, template=None):
+    """Import one file; returns a result dict for the report."""
+    started = time.monotonic()
+    size = source.stat().st_size
+    expected = blob_digest(source)
+    if not expected:
+        with open(source, "rb") as f:
+            if f.read(4) != b"GGUF":
+                raise ValueError(f"{source.name} is neither a GGUF file nor a sha256-* blob")
+    digest, copied = import_blob(source, models_dir / "blobs", expected)
+    result = {"source": source, "digest": digest, "size": size, "copied": copied}
+    if not expected:
+        base, tag = model_name(source, name)
+        write_model(models_dir, base, tag, source, digest, size, template)
+        result["model"] = f"{base}:{tag}"
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+def run_import(args, models_dir):
+    """Import every file named in args; returns the number that failed."""
+    models_dir = Path(models_dir)
+    (models_dir / "blobs").mkdir(parents=True, exist_ok=True)
+    files = collect_files(args.paths)
+    if (args.name or args.template) and len([f for f in files if not blob_digest(f)]) != 1:
+        raise ValueError("--name and --template can only be used when importing a single GGUF file")
+    template = args.template.read_text(encoding="utf-8") if args.template else None
+    manifests, orphans = find_manifests([f for f in files if blob_digest(f)], models_dir / "blobs")
+    for orphan in orphans:
+        logging.error(
+            f"Not importing {orphan}: no manifest in {orphan.parent.parent / 'manifests'} "
+            "uses it, and Ollama deletes blobs without one. Import the whole models folder."
+        )
+    importable = [f for f in files if f not in orphans]
+    failures = len(orphans)
+    if not importable:
+        logging.info("Nothing to import")
+        return failures
+
+    total = sum(f.stat().st_size for f in importable)
+    logging.info(
+        f"Importing {len(importable)} file(s), {total / 1e9:.2f} GB, into {models_dir} "
+        f"({args.jobs} at a time)"
+    )
+    started = time.monotonic()
+    copied_bytes = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(import_file, models_dir, f, args.name, template): f for f in importable}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                logging.error(f"Failed to import {source}: {e}")
+                continue
+            target = result.get("model") or f"blob {result['digest'][:12]}"
+            if result["copied"]:
+                copied_bytes += result["size"]
+                logging.info(
+                    f"Imported {source.name} as {target}: "
+                    + format_rate(result["size"], result["seconds"])
+                )
+            else:
+                logging.info(f"{source.name} is already in the store ({target})")
+
+    # Blobs first, so Ollama never sees a manifest whose blobs are missing
+    for source, rel in manifests.items():
+        try:
+            if import_manifest(models_dir, source, rel):
+                logging.info(f"Imported model {rel.as_posix()}")
+            else:
+                failures += 1
+                logging.error(f"Not importing model {rel.as_posix()}: some of its blobs failed")
+        except (OSError, ValueError) as e:
+            failures += 1
+            logging.error(f"Failed to import model {rel.as_posix()}: {e}")
+
+    # Leftovers of an interrupted earlier import
+    for tmp in (models_dir / "blobs").glob(".import-*.tmp"):
+        if time.time() - tmp.stat().st_mtime > 3600:
+            tmp.unlink(missing_ok=True)
+
+    logging.info(
+        f"Import finished: {len(files) + len(manifests) - failures} of "
+        f"{len(files) + len(manifests)} file(s), copied "
+        + format_rate(copied_bytes, time.monotonic() - started)
+    )
+    return failures
@@ -0,0 +1,730 @@
+"""
+Helpers for the Ollama model store kept on the portable drive.
+
+The store follows Ollama's own layout: content-addressed blobs named
+``sha256-<hex>`` under ``blobs/`` and JSON manifests under ``manifests/``
+that reference them. This module also provides the optional host-local
+blob cache used to load models at local-disk speed.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import struct
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+BLOB_PREFIX = "sha256-"
+# Large sequential reads keep USB sticks and spinning disks streaming
+COPY_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def blob_name(digest):
+    """File name of a blob for a digest in either "sha256:<hex>" or hex form."""
+    return BLOB_PREFIX + digest.split(":", 1)[-1]
+
+
+def blob_digest(path):
+    """Hex digest encoded in a blob file name, or None for other files."""
+    name = Path(path).name
+    if not name.startswith(BLOB_PREFIX):
+        return None
+    digest = name[len(BLOB_PREFIX):]
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        return None
+    return digest
+
+
+def iter_manifests(models_dir):
+    """Yield (model name, manifest path, manifest dict) for every manifest."""
+    manifests_dir = Path(models_dir) / "manifests"
+    if not manifests_dir.is_dir():
+        return
+    for path in manifests_dir.rglob("*"):
+        if not path.is_file():
+            continue
+        try:
+            manifest = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        # manifests/<registry>/<namespace>/<model>/<tag>
+        parts = path.relative_to(manifests_dir).parts
+        name = f"{parts[-2]}:{parts[-1]}" if len(parts) >= 2 else path.name
+        if len(parts) >= 3 and parts[-3] != "library":
+            name = f"{parts[-3]}/{name}"
+        yield name, path, manifest
+
+
+def manifest_digests(manifest):
+    """Hex digests of every blob a manifest references."""
+    digests = []
+    for entry in [manifest.get("config")] + list(manifest.get("layers") or []):
+        if isinstance(entry, dict) and isinstance(entry.get("digest"), str):
+            digests.append(entry["digest"].split(":", 1)[-1])
+    return digests
+
+
+def referenced_digests(models_dir):
+    """All blob digests referenced by the manifests in models_dir."""
+    digests = set()
+    for _, _, manifest in iter_manifests(models_dir):
+        digests.update(manifest_digests(manifest))
+    return digests
+
+
+def _advise_sequential(f):
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def sha256_file(path, stop_event=None):
+    """Hash a file with large sequential reads; None if stopped early."""
+    digest = hashlib.sha256()
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        _advise_sequential(f)
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def copy_and_hash(src, dst, stop_event=None):
+    """Copy src to dst in one streaming pass, returning the sha256 hex digest.
+
+    Writes happen on a helper thread, so reading and hashing one chunk
+    overlaps with writing the one before it (both release the GIL for
+    large buffers). Returns None (and leaves no partial dst behind) when
+    stop_event is set.
+    """
+    digest = hashlib.sha256()
+    free = queue.Queue()
+    for _ in range(2):
+        free.put(bytearray(COPY_CHUNK_SIZE))
+    pending = queue.Queue()
+    errors = []
+
+    def write_chunks(fout):
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            buffer, n = item
+            if not errors:
+                try:
+                    fout.write(memoryview(buffer)[:n])
+                except BaseException as e:
+                    errors.append(e)
+            free.put(buffer)
+
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            _advise_sequential(fin)
+            writer = threading.Thread(target=write_chunks, args=(fout,), daemon=True)
+            writer.start()
+            try:
+                while not errors:
+                    if stop_event is not None and stop_event.is_set():
+                        raise InterruptedError
+                    buffer = free.get()
+                    n = fin.readinto(buffer)
+                    if not n:
+                        break
+                    digest.update(memoryview(buffer)[:n])
+                    pending.put((buffer, n))
+            finally:
+                pending.put(None)
+                writer.join()
+            if errors:
+                raise errors[0]
+            fout.flush()
+            os.fsync(fout.fileno())
+    except InterruptedError:
+        Path(dst).unlink(missing_ok=True)
+        return None
+    except BaseException:
+        Path(dst).unlink(missing_ok=True)
+        raise
+    return digest.hexdigest()
+
+
+# GGUF metadata value types: struct format for fixed-size values,
+# 8 for strings and 9 for arrays
+GGUF_SCALARS = {0: "B", 1: "b", 2: "H", 3: "h", 4: "I", 5: "i", 6: "f", 7: "?", 10: "Q", 11: "q", 12: "d"}
+GGUF_STRING = 8
+GGUF_ARRAY = 9
+
+
+def gguf_metadata(path, keys):
+    """Read the requested scalar/string metadata keys from a GGUF header.
+
+    Returns a dict of the keys found, or None when path is not a GGUF
+    file (version 2 or later). Arrays such as the tokenizer vocabulary are
+    skipped without being decoded.
+    """
+    wanted = set(keys)
+    found = {}
+    with open(path, "rb") as f:
+        def read(fmt):
+            data = f.read(struct.calcsize(fmt))
+            if len(data) != struct.calcsize(fmt):
+                raise ValueError("truncated GGUF header")
+            return struct.unpack(fmt, data)[0]
+
+        def read_string():
+            return f.read(read("<Q")).decode("utf-8", "replace")
+
+        def read_value(kind):
+            if kind in GGUF_SCALARS:
+                return read("<" + GGUF_SCALARS[kind])
+            if kind == GGUF_STRING:
+                return read_string()
+            if kind == GGUF_ARRAY:
+                item_kind, count = read("<I"), read("<Q")
+                if item_kind in GGUF_SCALARS:
+                    f.seek(count * struct.calcsize(GGUF_SCALARS[item_kind]), os.SEEK_CUR)
+                else:
+                    for _ in range(count):
+                        read_value(item_kind)
+                return None
+            raise ValueError(f"unknown GGUF value type {kind}")
+
+        if f.read(4) != b"GGUF" or read("<I") < 2:
+            return None
+        read("<Q")  # tensor count
+        for _ in range(read("<Q")):
+            key = read_string()
+            value = read_value(read("<I"))
+            if key in wanted:
+                found[key] = value
+                if len(found) == len(wanted):
+                    break
+    return found
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temporary file and rename so readers never see half."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def default_cache_root():
+    """Host-local cache directory outside the portable drive."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+        return base / "OpenWebUI-Portable" / "blob-cache"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "OpenWebUI-Portable" / "blob-cache"
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "openwebui-portable" / "blob-cache"
+
+
+def get_store_id(models_dir):
+    """Stable identifier for a model store, kept on the drive itself.
+
+    Drive letters and mount points change between hosts, so the store's
+    path cannot be used to tell portable drives apart.
+    """
+    id_file = Path(models_dir).parent / "cache-id"
+    try:
+        return id_file.read_text().strip()
+    except OSError:
+        store_id = uuid.uuid4().hex
+        id_file.write_text(store_id)
+        return store_id
+
+
+class BlobCache:
+    """Host-local, content-addressed mirror of the portable model store.
+
+    Blobs are copied to ``<root>/blobs`` in the background, hashed while
+    they are copied and only marked usable once the hash matches their
+    name. When every blob a drive's manifests reference is cached, a view
+    directory for that drive (copied manifests plus hard links into the
+    cache) is handed to Ollama as OLLAMA_MODELS. Models pulled or removed
+    during the session change the view; those changes, relative to the
+    manifests the view was built from, are written back to the drive, which
+    stays the source of truth. The cache is bounded by size with LRU
+    eviction, which never touches the view Ollama is using.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.blobs_dir = self.root / "blobs"
+        self.index_file = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.index = self._load_index()
+        # View handed to Ollama, and the drive manifests each view was
+        # built from: relative path -> (content hash, referenced digests)
+        self.active_view = None
+        self.snapshots = {}
+
+    def _load_index(self):
+        try:
+            index = json.loads(self.index_file.read_text())
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        with self._lock:
+            data = dict(self.index)
+        write_json_atomic(self.index_file, data)
+
+    def view_dir(self, store_id):
+        return self.root / "views" / store_id
+
+    def is_cached(self, digest, full_check=False):
+        """True when a verified copy of digest is present and unchanged.
+
+        The cheap check compares size and mtime against the index; with
+        full_check the copy is hashed again.
+        """
+        entry = self.index.get(digest)
+        path = self.blobs_dir / blob_name(digest)
+        if not entry or not entry.get("verified"):
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        if stat.st_size != entry.get("size") or stat.st_mtime != entry.get("mtime"):
+            return False
+        if full_check and sha256_file(path) != digest:
+            logging.warning(f"Cached blob {digest[:12]} failed verification; dropping it")
+            self._drop(digest)
+            return False
+        return True
+
+    def _drop(self, digest):
+        (self.blobs_dir / blob_name(digest)).unlink(missing_ok=True)
+        # Views hold hard links, which would otherwise keep the space in use
+        for view_blobs in (self.root / "views").glob("*/blobs"):
+            (view_blobs / blob_name(digest)).unlink(missing_ok=True)
+        with self._lock:
+            self.index.pop(digest, None)
+
+    def _touch(self, digests):
+        now = time.time()
+        with self._lock:
+            for digest in digests:
+                if digest in self.index:
+                    self.index[digest]["last_used"] = now
+
+    def _adopt(self, digest, path):
+        """Record a verified blob file that is already in the cache."""
+        stat = path.stat()
+        with self._lock:
+            self.index[digest] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "verified": True,
+                "last_used": time.time(),
+            }
+
+    def prepare(self, models_dir, full_check=False):
+        """Return the directory Ollama should use as OLLAMA_MODELS.
+
+        That is the cached view when every referenced blob is cached and
+        verified, otherwise the drive's own models directory.
+        """
+        models_dir = Path(models_dir)
+        self.active_view = None
+        needed = referenced_digests(models_dir)
+        missing = [d for d in needed if not self.is_cached(d, full_check)]
+        if missing:
+            logging.info(
+                f"Blob cache has {len(needed) - len(missing)}/{len(needed)} blobs; "
+                "loading models from the portable drive this session"
+            )
+            return models_dir
+
+        view = self.view_dir(get_store_id(models_dir))
+        try:
+            self._build_view(models_dir, view, needed)
+        except OSError as e:
+            logging.warning(f"Could not build cached model view ({e}); using the portable drive")
+            return models_dir
+        self.active_view = view
+        self._touch(needed)
+        self._save_index()
+        logging.info(f"Loading models from host blob cache: {view}")
+        return view
+
+    def _build_view(self, models_dir, view, needed):
+        view_blobs = view / "blobs"
+        view_manifests = view / "manifests"
+        if view_manifests.exists():
+            shutil.rmtree(view_manifests)
+        view_blobs.mkdir(parents=True, exist_ok=True)
+        if (models_dir / "manifests").is_dir():
+            shutil.copytree(models_dir / "manifests", view_manifests)
+        else:
+            view_manifests.mkdir(parents=True)
+        self.snapshots[view] = self._manifest_snapshot(view_manifests)
+
+        for path in view_blobs.iterdir():
+            if blob_digest(path) not in needed:
+                path.unlink()
+        for digest in needed:
+            link = view_blobs / blob_name(digest)
+            target = self.blobs_dir / blob_name(digest)
+            if link.exists() and os.path.samefile(link, target):
+                continue
+            link.unlink(missing_ok=True)
+            os.link(target, link)
+
+    @staticmethod
+    def _manifest_snapshot(manifests_dir):
+        snapshot = {}
+        for path in Path(manifests_dir).rglob("*"):
+            if not path.is_file():
+                continue
+            data = path.read_bytes()
+            try:
+                digests = manifest_digests(json.loads(data))
+            except (ValueError, AttributeError):
+                digests = []
+            snapshot[path.relative_to(manifests_dir)] = (hashlib.sha256(data).hexdigest(), digests)
+        return snapshot
+
+    def _active_digests(self):
+        """Blobs linked into the view Ollama is running on."""
+        if self.active_view is None:
+            return set()
+        return {
+            blob_digest(path)
+            for path in (self.active_view / "blobs").glob(BLOB_PREFIX + "*")
+        }
+
+    def mirror(self, models_dir):
+        """Copy blobs missing from the cache, then evict down to the size limit.
+
+        Nothing is copied when the referenced blobs cannot all fit in the
+        cache: they could never be used from it, and would only be evicted
+        again.
+        """
+        models_dir = Path(models_dir)
+        blobs = sorted(referenced_digests(models_dir))
+        needed_bytes = 0
+        for digest in blobs:
+            try:
+                needed_bytes += (models_dir / "blobs" / blob_name(digest)).stat().st_size
+            except OSError:
+                pass
+        if needed_bytes > self.max_bytes:
+            logging.info(
+                f"Models need {needed_bytes / 1e9:.1f} GB, more than the blob cache's "
+                f"{self.max_bytes / 1e9:.1f} GB; loading them from the portable drive"
+            )
+            return
+        missing = [d for d in blobs if not self.is_cached(d)]
+        copied_bytes = 0
+        started = time.monotonic()
+        for digest in missing:
+            src = models_dir / "blobs" / blob_name(digest)
+            if not src.exists():
+                continue
+            tmp = self.blobs_dir / f".{blob_name(digest)}.partial"
+            actual = copy_and_hash(src, tmp, self.stop_event)
+            if actual is None:
+                logging.info("Blob cache mirroring interrupted by shutdown")
+                break
+            if actual != digest:
+                tmp.unlink(missing_ok=True)
+                logging.warning(
+                    f"Blob {digest[:12]} on the portable drive does not match its name; not caching it"
+                )
+                continue
+            dst = self.blobs_dir / blob_name(digest)
+            os.replace(tmp, dst)
+            self._adopt(digest, dst)
+            copied_bytes += dst.stat().st_size
+            self._save_index()
+
+        if copied_bytes:
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logging.info(
+                f"Cached {copied_bytes / 1e9:.2f} GB of model blobs in {elapsed:.0f}s "
+                f"({copied_bytes / elapsed / 1e6:.0f} MB/s)"
+            )
+        self._touch(blobs)
+        self.evict(keep=set(blobs))
+
+    def evict(self, keep=()):
+        """Remove least recently used blobs until the cache fits max_bytes.
+
+        Blobs in keep are only evicted once nothing else is left; blobs of
+        the view Ollama is running on are never evicted.
+        """
+        active = self._active_digests()
+        with self._lock:
+            entries = sorted(
+                self.index.items(),
+                key=lambda item: (item[0] in keep, item[1].get("last_used", 0)),
+            )
+        total = sum(entry.get("size", 0) for _, entry in entries)
+        for digest, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if digest in active:
+                continue
+            self._drop(digest)
+            total -= entry.get("size", 0)
+            logging.info(f"Evicted blob {digest[:12]} from host cache")
+        self._save_index()
+
+    def write_back(self, view, models_dir):
+        """Copy models pulled or removed during a cached session to the drive.
+
+        Manifests are compared with the snapshot taken when the view was
+        built, so models added to the drive during the session survive.
+        """
+        view = Path(view)
+        models_dir = Path(models_dir)
+        if view == models_dir:
+            return
+        view_manifests = view / "manifests"
+        drive_manifests = models_dir / "manifests"
+
+        # New blobs first, so a manifest never points at a missing blob
+        for path in (view / "blobs").iterdir():
+            digest = blob_digest(path)
+            if digest is None:
+                continue
+            drive_blob = models_dir / "blobs" / path.name
+            if not drive_blob.exists():
+                tmp = drive_blob.with_name(f".{path.name}.partial")
+                if copy_and_hash(path, tmp) != digest:
+                    tmp.unlink(missing_ok=True)
+                    logging.warning(f"Skipping write-back of corrupt blob {digest[:12]}")
+                    continue
+                os.replace(tmp, drive_blob)
+                logging.info(f"Wrote new blob {digest[:12]} back to the portable drive")
+            cached = self.blobs_dir / path.name
+            if not cached.exists():
+                try:
+                    os.link(path, cached)
+                    self._adopt(digest, cached)
+                except OSError:
+                    pass
+
+        # Only what changed in the view since it was built is copied back;
+        # manifests written to the drive meanwhile (imports, another tool)
+        # are left alone
+        snapshot = self.snapshots.get(view, {})
+        current = self._manifest_snapshot(view_manifests)
+        for rel, (content_hash, _) in current.items():
+            if rel in snapshot and snapshot[rel][0] == content_hash:
+                continue
+            target = drive_manifests / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.tmp")
+            shutil.copyfile(view_manifests / rel, tmp)
+            os.replace(tmp, target)
+
+        removed_digests = set()
+        for rel, (content_hash, digests) in snapshot.items():
+            if rel in current:
+                continue
+            target = drive_manifests / rel
+            try:
+                unchanged = hashlib.sha256(target.read_bytes()).hexdigest() == content_hash
+            except OSError:
+                continue
+            # Replaced on the drive during the session: the drive's copy wins
+            if unchanged:
+                target.unlink()
+                removed_digests.update(digests)
+                logging.info(f"Removed manifest {rel} from the portable drive")
+
+        # Blobs of removed models that nothing references any more are gone
+        # for good; blobs added to the drive meanwhile are never candidates
+        if removed_digests:
+            still_needed = referenced_digests(models_dir) | {
+                d for _, digests in current.values() for d in digests
+            }
+            for digest in removed_digests - still_needed:
+                (models_dir / "blobs" / blob_name(digest)).unlink(missing_ok=True)
+        self.snapshots[view] = current
+        self._save_index()
+
+
+def _lower_priority():
+    """Pool initializer: keep background hashing behind interactive work."""
+    try:
+        if hasattr(os, "nice"):
+            os.nice(10)
+    except OSError:
+        pass
+
+
+def _verify_blob(item):
+    """Hash one blob in a worker process; returns (digest, size, mtime, ok, error)."""
+    digest, path = item
+    try:
+        before = os.stat(path)
+        actual = sha256_file(path)
+        after = os.stat(path)
+    except OSError as e:
+        return digest, None, None, False, str(e)
+    if (before.st_size, before.st_mtime) != (after.st_size, after.st_mtime):
+        # Still being written; check again next time
+        return digest, None, None, None, "changed while hashing"
+    return digest, after.st_size, after.st_mtime, actual == digest, None
+
+
+class IntegrityIndex:
+    """Verification state of the blobs in a portable model store.
+
+    integrity.json (next to the models directory) records each blob's
+    size, mtime and when it was last hashed. A quick check at startup
+    only compares those, and the manifest sizes, against the files; blobs
+    that are new or changed are hashed in worker processes in the
+    background and the result is saved as each one finishes, so an
+    interrupted verification picks up where it left off.
+    """
+
+    def __init__(self, models_dir):
+        self.models_dir = Path(models_dir)
+        self.blobs_dir = self.models_dir / "blobs"
+        self.index_file = self.models_dir.parent / "integrity.json"
+        # digest -> reason the blob is unusable
+        self.failed = {}
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pool = None
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            index = json.loads(self.index_file.read_text())
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        with self._lock:
+            data = dict(self.index)
+        write_json_atomic(self.index_file, data)
+
+    def expected_sizes(self):
+        """Digest -> size listed in the manifests (None when not listed)."""
+        sizes = {}
+        for _, _, manifest in iter_manifests(self.models_dir):
+            for entry in [manifest.get("config")] + list(manifest.get("layers") or []):
+                if isinstance(entry, dict) and isinstance(entry.get("digest"), str):
+                    size = entry.get("size")
+                    sizes[entry["digest"].split(":", 1)[-1]] = size if isinstance(size, int) else None
+        return sizes
+
+    def quick_check(self):
+        """Check every referenced blob by stat alone; return digests to hash.
+
+        Missing blobs, blobs whose size differs from the manifest and
+        unchanged blobs that failed verification before are recorded in
+        self.failed straight away.
+        """
+        pending = []
+        sizes = self.expected_sizes()
+        with self._lock:
+            for digest in list(self.index):
+                if digest not in sizes:
+                    del self.index[digest]
+        for digest, size in sizes.items():
+            path = self.blobs_dir / blob_name(digest)
+            try:
+                stat = path.stat()
+            except OSError:
+                self.failed[digest] = "missing"
+                continue
+            if size is not None and stat.st_size != size:
+                self.failed[digest] = f"incomplete ({stat.st_size} of {size} bytes)"
+                continue
+            entry = self.index.get(digest)
+            if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+                if not entry.get("ok"):
+                    self.failed[digest] = "contents do not match the digest"
+                continue
+            pending.append(digest)
+        return pending
+
+    def verify(self, digests, workers, on_failure=None):
+        """Hash digests in a pool of worker processes, saving each result.
+
+        Returns the number of blobs verified; stop() ends it early.
+        """
+        import multiprocessing
+
+        items = [(d, str(self.blobs_dir / blob_name(d))) for d in digests]
+        if not items:
+            return 0
+        done = 0
+        self._pool = multiprocessing.Pool(min(workers, len(items)), initializer=_lower_priority)
+        results = self._pool.imap_unordered(_verify_blob, items)
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    digest, size, mtime, ok, error = results.next(timeout=1)
+                except multiprocessing.TimeoutError:
+                    continue
+                except StopIteration:
+                    break
+                if ok is None:
+                    continue
+                if error:
+                    self.failed[digest] = error
+                else:
+                    with self._lock:
+                        self.index[digest] = {"size": size, "mtime": mtime, "ok": ok, "verified": time.time()}
+                    if not ok:
+                        self.failed[digest] = "contents do not match the digest"
+                    self._save_index()
+                    done += 1
+                if not ok and on_failure is not None:
+                    on_failure(digest)
+        finally:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        return done
+
+    def stop(self):
+        """Abandon a running verification (hashed results are already saved)."""
+        self.stop_event.set()
+        pool = self._pool
+        if pool is not None:
+            pool.terminate()
+
+    def damaged_models(self):
+        """Model name -> list of problems, for models with failed blobs."""
+        damaged = {}
+        failed = dict(self.failed)
+        for name, _, manifest in iter_manifests(self.models_dir):
+            problems = [
+                f"blob {d[:12]} {failed[d]}" for d in manifest_digests(manifest) if d in failed
+            ]
+            if problems:
+                damaged[name] = problems
+        return damaged
@@ -0,0 +1,841 @@
+"""
+Pool of Ollama servers behind a local reverse proxy.
+
+With LAUNCHER_OLLAMA_POOL=N the launcher starts this module as a child
+(main.py --ollama-pool) instead of a single ``ollama serve``. It starts N
+Ollama servers on private ports, all sharing the same OLLAMA_MODELS store,
+and answers on the launcher's Ollama port with a small asyncio HTTP/1.1
+reverse proxy. The WebUI keeps a single OLLAMA_API_BASE.
+
+Requests naming a model go to the backend that already serves that model
+(so it stays loaded there) unless that backend is busier than the least
+loaded one by LAUNCHER_OLLAMA_POOL_SPILL requests; everything else goes to
+the backend with the fewest requests in flight. Responses are relayed
+chunk by chunk as they arrive, and upstream connections are kept alive
+and reused.
+
+The same child also provides on-demand Ollama (LAUNCHER_OLLAMA_ON_DEMAND):
+the servers are only started by the first request that needs one, which
+is held until a server is ready. Until then the proxy answers the
+WebUI's and the launcher's background requests (model list, loaded
+models, health) itself, reading the model list from the manifests on
+disk. After LAUNCHER_OLLAMA_IDLE_TIMEOUT seconds without such requests
+the servers are stopped again, or only asked to unload their models.
+
+With LAUNCHER_OLLAMA_CACHE the proxy also answers repeated embedding and
+deterministic generation requests from a cache (see response_cache.py),
+without starting or waking an Ollama server.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from response_cache import CACHE_HEADER, open_cache
+
+# Request paths whose JSON body names the model to route by
+MODEL_PATHS = {
+    "/api/generate",
+    "/api/chat",
+    "/api/embed",
+    "/api/embeddings",
+    "/api/show",
+    "/v1/chat/completions",
+    "/v1/completions",
+    "/v1/embeddings",
+}
+# Request bodies up to this size are read for routing (and can be retried);
+# larger ones, such as blob uploads, are streamed straight through.
+ROUTING_BODY_LIMIT = 1024 * 1024
+COPY_CHUNK_SIZE = 64 * 1024
+MAX_IDLE_CONNECTIONS = 8
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "expect"}
+# Polling requests that neither start stopped servers nor keep them awake
+BACKGROUND_PATHS = {"/", "/api/tags", "/api/ps", "/api/version"}
+
+
+def log(message):
+    # stdout is a pipe into the launcher's ollama.log
+    print(f"[Ollama Pool] {message}", flush=True)
+
+
+class ProxyError(Exception):
+    """The request could not be forwarded to any backend."""
+
+
+class BackendUnavailable(Exception):
+    """A backend could not be reached before any response was relayed."""
+
+
+async def read_head(reader):
+    """Read a request or status line and headers; None on a clean EOF."""
+    try:
+        data = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise
+    lines = data.decode("latin-1").split("\r\n")
+    headers = []
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def get_header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def build_head(start_line, headers):
+    lines = [start_line] + [f"{k}: {v}" for k, v in headers] + ["", ""]
+    return "\r\n".join(lines).encode("latin-1")
+
+
+async def copy_length(src, dst, length, sink=None):
+    while length > 0:
+        chunk = await src.read(min(length, COPY_CHUNK_SIZE))
+        if not chunk:
+            raise ConnectionError("connection closed mid-body")
+        if sink is not None:
+            sink += chunk
+        dst.write(chunk)
+        await dst.drain()
+        length -= len(chunk)
+
+
+async def copy_chunked(src, dst, sink=None):
+    """Relay a chunked body as is, flushing each chunk as it arrives.
+
+    The decoded body is also appended to sink when one is given.
+    """
+    while True:
+        size_line = await src.readline()
+        if not size_line:
+            raise ConnectionError("connection closed mid-body")
+        dst.write(size_line)
+        size = int(size_line.split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            while True:
+                trailer = await src.readline()
+                dst.write(trailer)
+                if trailer in (b"\r\n", b"\n", b""):
+                    break
+            await dst.drain()
+            return
+        data = await src.readexactly(size + 2)
+        if sink is not None:
+            sink += data[:-2]
+        dst.write(data)
+        await dst.drain()
+
+
+async def copy_until_eof(src, dst, sink=None):
+    while True:
+        chunk = await src.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            return
+        if sink is not None:
+            sink += chunk
+        dst.write(chunk)
+        await dst.drain()
+
+
+def body_framing(headers):
+    """("chunked", None), ("length", n) or ("eof", None) for a message."""
+    transfer_encoding = get_header(headers, "transfer-encoding")
+    if transfer_encoding and "chunked" in transfer_encoding.lower():
+        return "chunked", None
+    length = get_header(headers, "content-length")
+    if length is not None:
+        return "length", int(length)
+    return "eof", None
+
+
+class Backend:
+    """One Ollama server of the pool and its idle upstream connections."""
+
+    def __init__(self, name, port=None):
+        self.name = name
+        self.port = port
+        self.process = None
+        self.ready = False
+        self.inflight = 0
+        self.idle = []
+        self.crashes = []
+
+    async def connect(self):
+        """Return (reader, writer, pooled), reusing an idle connection if any."""
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        return reader, writer, False
+
+    def release(self, reader, writer, reusable):
+        if reusable and self.ready and len(self.idle) < MAX_IDLE_CONNECTIONS:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def drop_connections(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+async def fetch_json(backend, path, timeout=5, payload=None):
+    """GET (or POST payload to) path on a backend over a fresh connection.
+
+    Returns the decoded JSON response.
+    """
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection("127.0.0.1", backend.port), timeout
+    )
+    try:
+        method, body = "GET", b""
+        if payload is not None:
+            method, body = "POST", json.dumps(payload).encode("utf-8")
+        writer.write(
+            build_head(
+                f"{method} {path} HTTP/1.0",
+                [("Host", f"127.0.0.1:{backend.port}"), ("Content-Length", str(len(body)))],
+            )
+            + body
+        )
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    if status != 200:
+        raise ProxyError(f"{backend.name} answered {path} with HTTP {status}")
+    return json.loads(body)
+
+
+class OllamaProxy:
+    """Reverse proxy routing requests over the ready backends."""
+
+    def __init__(self, backends, spill=2, ready_timeout=120):
+        self.backends = backends
+        self.spill = spill
+        self.ready_timeout = ready_timeout
+        self.affinity = {}
+        self.any_ready = asyncio.Event()
+        # Set by OllamaPool: starts stopped servers and answers for them
+        self.pool = None
+        # response_cache.ResponseCache when LAUNCHER_OLLAMA_CACHE is on
+        self.cache = None
+        self.last_activity = time.monotonic()
+
+    def backend_ready(self, backend, ready):
+        backend.ready = ready
+        if not ready:
+            backend.drop_connections()
+        if any(b.ready for b in self.backends):
+            self.any_ready.set()
+        else:
+            self.any_ready.clear()
+
+    async def pick(self, model):
+        """Choose a backend by model affinity, then by least requests in flight."""
+        if not self.any_ready.is_set():
+            try:
+                await asyncio.wait_for(self.any_ready.wait(), self.ready_timeout)
+            except asyncio.TimeoutError:
+                raise ProxyError("no Ollama backend is ready")
+        ready = [b for b in self.backends if b.ready]
+        least = min(ready, key=lambda b: b.inflight)
+        if not model:
+            return least
+        owner = self.affinity.get(model)
+        if owner is None or not owner.ready:
+            # Spread models over the backends so each keeps its own loaded
+            assigned = list(self.affinity.values())
+            owner = min(ready, key=lambda b: (b.inflight, assigned.count(b)))
+            self.affinity[model] = owner
+            return owner
+        if owner.inflight - least.inflight >= self.spill:
+            return least
+        return owner
+
+    def request_model(self, method, path, body):
+        if method != "POST" or path not in MODEL_PATHS or not body:
+            return None
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        return payload.get("model") or payload.get("name")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while await self.handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except asyncio.CancelledError:
+            # Open connections are cancelled when the pool stops
+            pass
+        except Exception as e:
+            log(f"Proxy error: {e!r}")
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader, writer):
+        """Proxy one request; returns whether the client connection stays open."""
+        head = await read_head(reader)
+        if head is None:
+            return False
+        start_line, headers = head
+        method, target, version = start_line.split(" ", 2)
+        path = target.split("?", 1)[0]
+        keep_alive = version == "HTTP/1.1" and (
+            (get_header(headers, "connection") or "").lower() != "close"
+        )
+
+        if (get_header(headers, "expect") or "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+
+        framing, length = body_framing(headers)
+        body = b""
+        streamed_body = None
+        if framing == "chunked" or (framing == "length" and length > ROUTING_BODY_LIMIT):
+            streamed_body = (framing, length)
+        elif framing == "length":
+            body = await reader.readexactly(length)
+
+        background = method in ("GET", "HEAD") and path in BACKGROUND_PATHS
+        if not background:
+            self.last_activity = time.monotonic()
+
+        cache_key = capture = None
+        if self.cache is not None and method == "POST" and streamed_body is None:
+            if (get_header(headers, CACHE_HEADER) or "").lower() == "bypass":
+                self.cache.bypassed += 1
+            else:
+                cache_key = self.cache.key(path, body)
+            if cache_key is not None:
+                entry = await asyncio.to_thread(self.cache.get, cache_key)
+                if entry is not None:
+                    return await self.respond_cached(writer, entry, keep_alive)
+                capture = {"body": bytearray()}
+
+        if self.pool is not None and not self.pool.running:
+            # The version is only known once a server has answered it
+            if background and (path != "/api/version" or self.pool.version is not None):
+                return await self.respond_stopped(writer, method, path, keep_alive)
+            self.pool.start()
+
+        if method == "GET" and path == "/api/ps":
+            return await self.respond_ps(writer, keep_alive)
+
+        model = self.request_model(method, path, body) if streamed_body is None else None
+        upstream_headers = [
+            (k, v)
+            for k, v in headers
+            if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() not in ("host", CACHE_HEADER)
+        ]
+        try:
+            keep_alive = await self.forward(
+                reader,
+                writer,
+                method,
+                target,
+                upstream_headers,
+                body,
+                streamed_body,
+                model,
+                keep_alive,
+                background,
+                capture,
+            )
+        except ProxyError as e:
+            await self.respond_error(writer, 502, str(e))
+            return False
+        if capture is not None and capture.get("complete") and capture["status"] == 200:
+            try:
+                await asyncio.to_thread(
+                    self.cache.put, cache_key, capture["content_type"], capture["body"]
+                )
+            except sqlite3.Error as e:
+                log(f"Could not store response in the cache: {e}")
+        return keep_alive
+
+    async def forward(
+        self,
+        reader,
+        writer,
+        method,
+        target,
+        headers,
+        body,
+        streamed_body,
+        model,
+        keep_alive,
+        background,
+        capture=None,
+    ):
+        tried = set()
+        while True:
+            backend = await self.pick(model)
+            if backend in tried:
+                raise ProxyError("all Ollama backends refused the request")
+            tried.add(backend)
+            backend.inflight += 1
+            try:
+                result = await self.exchange(
+                    backend,
+                    reader,
+                    writer,
+                    method,
+                    target,
+                    headers,
+                    body,
+                    streamed_body,
+                    keep_alive,
+                    capture,
+                )
+            except BackendUnavailable as e:
+                # Nothing reached the client yet; a buffered request can go elsewhere
+                log(f"{backend.name} unreachable: {e}")
+                self.backend_ready(backend, False)
+                if streamed_body is not None:
+                    raise ProxyError(f"{backend.name} unreachable")
+                continue
+            finally:
+                backend.inflight -= 1
+                if not background:
+                    self.last_activity = time.monotonic()
+            return result
+
+    async def exchange(
+        self,
+        backend,
+        reader,
+        writer,
+        method,
+        target,
+        headers,
+        body,
+        streamed_body,
+        keep_alive,
+        capture=None,
+    ):
+        """Relay one request to backend and its response to the client.
+
+        capture, when given, receives the status, content type and decoded
+        body of the response, and "complete" once all of it was relayed.
+        """
+        request_head = build_head(
+            f"{method} {target} HTTP/1.1", [("Host", f"127.0.0.1:{backend.port}")] + headers
+        )
+        for attempt in range(2):
+            try:
+                up_reader, up_writer, pooled = await backend.connect()
+            except OSError as e:
+                raise BackendUnavailable(str(e))
+            try:
+                up_writer.write(request_head + body)
+                if streamed_body is not None:
+                    framing, length = streamed_body
+                    if framing == "chunked":
+                        await copy_chunked(reader, up_writer)
+                    else:
+                        await copy_length(reader, up_writer, length)
+                await up_writer.drain()
+                response = await read_head(up_reader)
+                if response is None:
+                    raise ConnectionResetError("upstream closed the connection")
+                break
+            except (OSError, asyncio.IncompleteReadError) as e:
+                up_writer.close()
+                # An idle pooled connection may have been closed by Ollama
+                if pooled and streamed_body is None and attempt == 0:
+                    continue
+                raise BackendUnavailable(str(e) or type(e).__name__)
+
+        status_line, response_headers = response
+        status = int(status_line.split(" ", 2)[1])
+        upstream_reusable = (get_header(response_headers, "connection") or "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            framing, length = "length", 0
+        else:
+            framing, length = body_framing(response_headers)
+        if framing == "eof":
+            upstream_reusable = keep_alive = False
+
+        client_headers = [
+            (k, v) for k, v in response_headers if k.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        if not keep_alive:
+            client_headers.append(("Connection", "close"))
+        sink = None
+        if capture is not None:
+            capture["status"] = status
+            capture["content_type"] = get_header(response_headers, "content-type")
+            sink = capture["body"]
+        completed = False
+        try:
+            writer.write(build_head(status_line, client_headers))
+            await writer.drain()
+            if framing == "chunked":
+                await copy_chunked(up_reader, writer, sink)
+            elif framing == "length":
+                await copy_length(up_reader, writer, length, sink)
+            else:
+                await copy_until_eof(up_reader, writer, sink)
+            completed = True
+            if capture is not None:
+                capture["complete"] = True
+        finally:
+            # A half-relayed response leaves the upstream connection unusable;
+            # closing it also makes Ollama stop generating for a gone client.
+            backend.release(up_reader, up_writer, completed and upstream_reusable)
+        return keep_alive
+
+    async def respond_cached(self, writer, entry, keep_alive):
+        """Answer a request from a cached (content type, body) entry."""
+        content_type, body = entry
+        headers = [
+            ("Content-Type", content_type or "application/json"),
+            ("Content-Length", str(len(body))),
+            (CACHE_HEADER, "hit"),
+        ]
+        if not keep_alive:
+            headers.append(("Connection", "close"))
+        writer.write(build_head("HTTP/1.1 200 OK", headers) + body)
+        await writer.drain()
+        return keep_alive
+
+    async def respond_ps(self, writer, keep_alive):
+        """Answer /api/ps with the models loaded on every backend."""
+        models = []
+        for backend in self.backends:
+            if backend.ready:
+                try:
+                    models.extend((await fetch_json(backend, "/api/ps")).get("models", []))
+                except (OSError, ValueError, asyncio.TimeoutError, ProxyError) as e:
+                    log(f"Could not list models on {backend.name}: {e}")
+        await self.respond_json(writer, 200, {"models": models}, keep_alive)
+        return keep_alive
+
+    async def respond_stopped(self, writer, method, path, keep_alive):
+        """Answer a background request while no Ollama server runs."""
+        if path == "/":
+            body = b"Ollama is running"
+            headers = [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(body))),
+            ]
+            if not keep_alive:
+                headers.append(("Connection", "close"))
+            writer.write(build_head("HTTP/1.1 200 OK", headers) + (body if method == "GET" else b""))
+            await writer.drain()
+        elif path == "/api/ps":
+            await self.respond_json(writer, 200, {"models": []}, keep_alive)
+        elif path == "/api/version":
+            await self.respond_json(writer, 200, self.pool.version, keep_alive)
+        else:
+            await self.respond_json(writer, 200, self.pool.model_list(), keep_alive)
+        return keep_alive
+
+    async def respond_json(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 502: "Bad Gateway", 503: "Service Unavailable"}.get(status, "")
+        headers = [("Content-Type", "application/json"), ("Content-Length", str(len(body)))]
+        if not keep_alive:
+            headers.append(("Connection", "close"))
+        writer.write(build_head(f"HTTP/1.1 {status} {reason}", headers) + body)
+        await writer.drain()
+
+    async def respond_error(self, writer, status, message):
+        try:
+            await self.respond_json(writer, status, {"error": message}, False)
+        except OSError:
+            pass
+
+
+def local_model_list(models_dir):
+    """/api/tags response built from the manifests in models_dir.
+
+    Used while no Ollama server runs; mirrors what Ollama reports, with
+    the model details taken from each model's config blob.
+    """
+    from model_store import blob_name, iter_manifests
+
+    models = []
+    for name, path, manifest in iter_manifests(models_dir):
+        entries = [manifest.get("config") or {}] + list(manifest.get("layers") or [])
+        details = {}
+        config_digest = (manifest.get("config") or {}).get("digest", "")
+        try:
+            config = json.loads(
+                (Path(models_dir) / "blobs" / blob_name(config_digest.split(":", 1)[-1])).read_text()
+            )
+            details = {
+                "parent_model": "",
+                "format": config.get("model_format", ""),
+                "family": config.get("model_family", ""),
+                "families": config.get("model_families"),
+                "parameter_size": config.get("model_type", ""),
+                "quantization_level": config.get("file_type", ""),
+            }
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            stat = path.stat()
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            continue
+        models.append(
+            {
+                "name": name,
+                "model": name,
+                "modified_at": datetime.datetime.fromtimestamp(stat.st_mtime)
+                .astimezone()
+                .isoformat(),
+                "size": sum(e.get("size", 0) for e in entries if isinstance(e, dict)),
+                "digest": digest,
+                "details": details,
+            }
+        )
+    models.sort(key=lambda m: m["modified_at"], reverse=True)
+    return {"models": models}
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class OllamaPool:
+    """Starts, watches and restarts the Ollama servers behind the proxy."""
+
+    def __init__(
+        self,
+        binary,
+        count,
+        env,
+        cwd=None,
+        on_demand=False,
+        idle_timeout=0,
+        idle_action="stop",
+        cache=None,
+    ):
+        self.binary = binary
+        self.env = env
+        self.cwd = cwd
+        self.on_demand = on_demand
+        self.idle_timeout = idle_timeout
+        self.idle_action = idle_action
+        self.running = False
+        self.backends = [Backend(f"ollama-{i + 1}") for i in range(count)]
+        self.proxy = OllamaProxy(
+            self.backends,
+            spill=int(env.get("LAUNCHER_OLLAMA_POOL_SPILL", "2")),
+        )
+        self.proxy.pool = self
+        self.proxy.cache = cache
+        self._idle_handled_at = None
+        self._model_list = None
+        # /api/version of the last server that answered, for stopped periods
+        self.version = None
+        self.stopping = asyncio.Event()
+
+    def start(self):
+        """Start every server; requests wait in the proxy until one is ready."""
+        if self.running:
+            return
+        if self.on_demand:
+            log("Starting Ollama for the first request that needs it")
+        for backend in self.backends:
+            self.spawn(backend)
+        self.running = True
+        self._model_list = None
+
+    async def suspend(self):
+        """Stop every server after the idle timeout; the next request restarts them."""
+        self.running = False
+        for backend in self.backends:
+            self.proxy.backend_ready(backend, False)
+        # A request arriving while these exit calls start(), which replaces
+        # backend.process; only the processes seen here are waited for
+        stopping = [(b, b.process) for b in self.backends if b.process is not None]
+        for _, process in stopping:
+            if process.poll() is None:
+                process.terminate()
+        for backend, process in stopping:
+            for _ in range(100):
+                if process.poll() is not None:
+                    break
+                await asyncio.sleep(0.05)
+            else:
+                process.kill()
+            if backend.process is process:
+                backend.process = None
+
+    async def unload_models(self):
+        """Ask every server to unload its models but keep running."""
+        for backend in self.backends:
+            if not backend.ready:
+                continue
+            try:
+                loaded = (await fetch_json(backend, "/api/ps")).get("models", [])
+                for model in loaded:
+                    await fetch_json(
+                        backend,
+                        "/api/generate",
+                        timeout=30,
+                        payload={"model": model["name"], "keep_alive": 0},
+                    )
+            except (OSError, ValueError, KeyError, asyncio.TimeoutError, ProxyError) as e:
+                log(f"Could not unload models on {backend.name}: {e}")
+
+    async def check_idle(self):
+        if not self.idle_timeout or not self.running:
+            return
+        if any(b.inflight for b in self.backends):
+            return
+        last_activity = self.proxy.last_activity
+        if last_activity == self._idle_handled_at:
+            return
+        if time.monotonic() - last_activity < self.idle_timeout:
+            return
+        self._idle_handled_at = last_activity
+        if self.idle_action == "unload":
+            log(f"Idle for {self.idle_timeout:g}s; unloading models")
+            await self.unload_models()
+        else:
+            log(f"Idle for {self.idle_timeout:g}s; stopping Ollama until the next request")
+            await self.suspend()
+
+    def model_list(self):
+        """Model list served while stopped, cached until Ollama runs again."""
+        if self._model_list is None:
+            self._model_list = local_model_list(self.env["OLLAMA_MODELS"])
+        return self._model_list
+
+    def spawn(self, backend):
+        backend.port = free_port()
+        env = dict(self.env, OLLAMA_HOST=f"127.0.0.1:{backend.port}")
+        # Backends share this process's group/job so the launcher stops
+        # them together with the pool, and write to its stdout.
+        backend.process = subprocess.Popen([self.binary, "serve"], env=env, cwd=self.cwd)
+        log(f"Started {backend.name} on port {backend.port} (PID: {backend.process.pid})")
+
+    async def watch(self, interval=0.25):
+        """Mark backends ready once they answer and restart crashed ones.
+
+        A backend that crashes three times within a minute ends the pool so
+        the launcher's supervisor restarts it as a whole.
+        """
+        while not self.stopping.is_set():
+            for backend in self.backends:
+                if backend.process is None or not self.running:
+                    continue
+                code = backend.process.poll()
+                if code is not None:
+                    self.proxy.backend_ready(backend, False)
+                    now = time.monotonic()
+                    backend.crashes = [t for t in backend.crashes if now - t < 60] + [now]
+                    if len(backend.crashes) >= 3:
+                        raise RuntimeError(f"{backend.name} keeps crashing (exit code {code})")
+                    log(f"{backend.name} exited with code {code}; restarting")
+                    self.spawn(backend)
+                elif not backend.ready:
+                    try:
+                        self.version = await fetch_json(backend, "/api/version", timeout=1)
+                    except (OSError, ValueError, asyncio.TimeoutError, ProxyError):
+                        continue
+                    self.proxy.backend_ready(backend, True)
+                    log(f"{backend.name} is ready")
+            await self.check_idle()
+            self.log_cache_stats()
+            await asyncio.sleep(interval)
+
+    def log_cache_stats(self, force=False):
+        if self.proxy.cache is not None:
+            line = self.proxy.cache.stats_line(force)
+            if line:
+                log(line)
+
+    async def serve(self, sock):
+        server = await asyncio.start_server(
+            self.proxy.handle_client, sock=sock, limit=ROUTING_BODY_LIMIT
+        )
+        if self.on_demand:
+            log(f"Listening on {sock.getsockname()}; Ollama starts on the first request")
+        else:
+            self.start()
+            log(f"Proxying {sock.getsockname()} to {len(self.backends)} Ollama servers")
+        if sys.platform != "win32":
+            # The launcher stops the pool with SIGTERM; return so the servers
+            # are stopped and the cache is closed
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.stopping.set)
+        try:
+            await self.watch()
+        finally:
+            # Not waiting for kept-alive client connections to close
+            server.close()
+
+    def stop(self):
+        for backend in self.backends:
+            if backend.process is not None and backend.process.poll() is None:
+                backend.process.terminate()
+        if self.proxy.cache is not None:
+            self.log_cache_stats(force=True)
+            self.proxy.cache.close()
+
+
+def run_pool():
+    """Entry point of the pool child, configured by the launcher's environment."""
+    env = os.environ.copy()
+    binary = env.pop("LAUNCHER_OLLAMA_BINARY")
+    count = max(1, int(env.get("LAUNCHER_OLLAMA_POOL", "1")))
+    inherited_fd = env.pop("LAUNCHER_OLLAMA_FD", None)
+    if inherited_fd:
+        sock = socket.socket(fileno=int(inherited_fd))
+    else:
+        host, _, port = env["OLLAMA_HOST"].rpartition(":")
+        sock = socket.create_server((host or "127.0.0.1", int(port)))
+    sock.setblocking(False)
+
+    pool = OllamaPool(
+        binary,
+        count,
+        env,
+        cwd=os.getcwd(),
+        on_demand=env.get("LAUNCHER_OLLAMA_ON_DEMAND") == "1",
+        idle_timeout=float(env.get("LAUNCHER_OLLAMA_IDLE_TIMEOUT", "0")),
+        idle_action=env.get("LAUNCHER_OLLAMA_IDLE_ACTION", "stop"),
+        cache=open_cache(env),
+    )
+    try:
+        asyncio.run(pool.serve(sock))
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        log(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        pool.stop()
@@ -0,0 +1,330 @@
+"""
+Hardware-aware Ollama settings.
+
+The portable drive moves between very different machines, so instead of
+running Ollama with stock settings everywhere the launcher looks at the
+host (physical cores, RAM, GPU memory) and picks a tuning profile for
+Ollama's server-wide environment variables. Detection only uses what the
+OS and GPU driver already provide; psutil is used when it is installed.
+"""
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+
+GIB = 1024**3
+TUNING_FILE = "ollama-tuning.json"
+
+# Profiles from smallest to largest; the first whose limits the host stays
+# under is used. "memory" is the memory models are loaded into (free VRAM
+# on a discrete GPU, otherwise total RAM), in GiB. Without a discrete GPU
+# the RAM available at start also caps the profile.
+PROFILES = [
+    {
+        "name": "small",
+        "max_memory": 12,
+        "max_cores": 6,
+        "env": {
+            "OLLAMA_NUM_PARALLEL": 1,
+            "OLLAMA_MAX_LOADED_MODELS": 1,
+            "OLLAMA_KEEP_ALIVE": "5m",
+            "OLLAMA_MAX_QUEUE": 64,
+        },
+    },
+    {
+        "name": "medium",
+        "max_memory": 32,
+        "max_cores": 16,
+        "env": {
+            "OLLAMA_NUM_PARALLEL": 2,
+            "OLLAMA_MAX_LOADED_MODELS": 2,
+            "OLLAMA_KEEP_ALIVE": "15m",
+            "OLLAMA_MAX_QUEUE": 128,
+        },
+    },
+    {
+        "name": "large",
+        "max_memory": 96,
+        "max_cores": 48,
+        "env": {
+            "OLLAMA_NUM_PARALLEL": 4,
+            "OLLAMA_MAX_LOADED_MODELS": 3,
+            "OLLAMA_KEEP_ALIVE": "30m",
+            "OLLAMA_MAX_QUEUE": 256,
+        },
+    },
+    {
+        "name": "workstation",
+        "max_memory": None,
+        "max_cores": None,
+        "env": {
+            "OLLAMA_NUM_PARALLEL": 8,
+            "OLLAMA_MAX_LOADED_MODELS": 4,
+            "OLLAMA_KEEP_ALIVE": "1h",
+            "OLLAMA_MAX_QUEUE": 512,
+        },
+    },
+]
+
+
+def _run(cmd, timeout=3):
+    """Output of a short detection command, or None if it is unavailable."""
+    if shutil.which(cmd[0]) is None:
+        return None
+    try:
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=timeout, **kwargs
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def physical_cores():
+    """Number of physical CPU cores, falling back to logical CPUs."""
+    try:
+        import psutil
+
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        try:
+            cores = set()
+            physical_id = core_id = None
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    key = key.strip()
+                    if key == "physical id":
+                        physical_id = value.strip()
+                    elif key == "core id":
+                        core_id = value.strip()
+                    elif not key and core_id is not None:
+                        cores.add((physical_id, core_id))
+                        physical_id = core_id = None
+            if core_id is not None:
+                cores.add((physical_id, core_id))
+            if cores:
+                return len(cores)
+        except OSError:
+            pass
+    elif sys.platform == "darwin":
+        output = _run(["sysctl", "-n", "hw.physicalcpu"])
+        if output and output.strip().isdigit():
+            return int(output)
+
+    return os.cpu_count() or 1
+
+
+def system_memory():
+    """(total, available) RAM in bytes; available may be None."""
+    try:
+        import psutil
+
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available
+    except ImportError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        try:
+            info = {}
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    info[key] = int(value.split()[0]) * 1024
+            return info["MemTotal"], info.get("MemAvailable")
+        except (OSError, KeyError, ValueError, IndexError):
+            pass
+    elif sys.platform == "darwin":
+        output = _run(["sysctl", "-n", "hw.memsize"])
+        if output and output.strip().isdigit():
+            return int(output), None
+    elif sys.platform == "win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys, status.ullAvailPhys
+
+    return None, None
+
+
+def gpu_memory():
+    """Detected GPU as a dict (kind, total, free in bytes), or None.
+
+    NVIDIA memory is read with nvidia-smi, which ships with the driver.
+    Apple Silicon GPUs share system memory, so only their presence is
+    reported.
+    """
+    output = _run(
+        [
+            "nvidia-smi",
+            "--query-gpu=memory.total,memory.free",
+            "--format=csv,noheader,nounits",
+        ]
+    )
+    if output:
+        total = free = 0
+        for line in output.strip().splitlines():
+            try:
+                gpu_total, gpu_free = (int(v.strip()) for v in line.split(","))
+            except ValueError:
+                continue
+            total += gpu_total * 1024 * 1024
+            free += gpu_free * 1024 * 1024
+        if total:
+            return {"kind": "nvidia", "total": total, "free": free}
+
+    if sys.platform == "darwin" and platform.machine() == "arm64":
+        return {"kind": "apple", "total": None, "free": None}
+    return None
+
+
+def detect_hardware():
+    """Snapshot of the host resources relevant to Ollama."""
+    total, available = system_memory()
+    return {
+        "cores": physical_cores(),
+        "memory_total": total,
+        "memory_available": available,
+        "gpu": gpu_memory(),
+    }
+
+
+def model_memory(hardware):
+    """Bytes available for loaded models on this host, or None if unknown."""
+    gpu = hardware["gpu"]
+    if gpu and gpu["kind"] == "nvidia":
+        return gpu["free"]
+    return hardware["memory_total"]
+
+
+def select_profile(hardware):
+    """Pick the tuning profile for the detected hardware.
+
+    When models are loaded into RAM, a host whose memory is mostly in use
+    gets no larger a profile than its available memory supports.
+    """
+    memory = model_memory(hardware)
+    memory_gib = memory / GIB if memory else 0
+    selected = PROFILES[-1]
+    for profile in PROFILES:
+        fits_memory = profile["max_memory"] is None or memory_gib < profile["max_memory"]
+        fits_cores = profile["max_cores"] is None or hardware["cores"] < profile["max_cores"]
+        # A host is only as large as its smallest resource allows
+        if fits_memory or fits_cores:
+            selected = profile
+            break
+
+    gpu = hardware["gpu"]
+    available = hardware["memory_available"]
+    if available and not (gpu and gpu["kind"] == "nvidia"):
+        for profile in PROFILES[: PROFILES.index(selected)]:
+            if available / GIB < profile["max_memory"]:
+                logging.info(
+                    f"Only {_format_bytes(available)} RAM available; using profile "
+                    f"'{profile['name']}' instead of '{selected['name']}'"
+                )
+                return profile
+    return selected
+
+
+def load_overrides(path, hostname):
+    """Settings from the tuning file for this host.
+
+    The file maps "*" (every host) and host names to objects of Ollama
+    environment variables, e.g. {"*": {...}, "my-laptop": {...}}; the
+    host-specific entry wins.
+    """
+    try:
+        config = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable {path.name}: {e}")
+        return {}
+    if not isinstance(config, dict):
+        logging.warning(f"Ignoring {path.name}: expected a JSON object")
+        return {}
+    overrides = {}
+    for key in ("*", hostname, hostname.lower()):
+        if isinstance(config.get(key), dict):
+            overrides.update(config[key])
+    return overrides
+
+
+def _format_bytes(value):
+    return f"{value / GIB:.1f} GiB" if value else "unknown"
+
+
+def tuning_env(config_dir, base_env):
+    """Ollama environment variables for this host.
+
+    Variables already set in base_env (by the user) are left alone, then
+    per-host overrides from the tuning file in config_dir are applied on top
+    of the detected profile.
+    """
+    hardware = detect_hardware()
+    profile = select_profile(hardware)
+    settings = dict(profile["env"])
+    gpu = hardware["gpu"]
+    # Flash attention saves memory on GPUs but is not used on CPU-only hosts
+    settings["OLLAMA_FLASH_ATTENTION"] = 1 if gpu else 0
+
+    hostname = socket.gethostname()
+    overrides = load_overrides(config_dir / TUNING_FILE, hostname)
+    settings.update(overrides)
+
+    env = {}
+    kept = []
+    for key, value in settings.items():
+        if key in base_env:
+            kept.append(key)
+            continue
+        env[key] = str(value)
+
+    gpu_text = "none detected"
+    if gpu and gpu["kind"] == "nvidia":
+        gpu_text = f"NVIDIA, {_format_bytes(gpu['free'])} free of {_format_bytes(gpu['total'])}"
+    elif gpu:
+        gpu_text = "Apple Silicon (unified memory)"
+    logging.info(
+        f"Host {hostname}: {hardware['cores']} physical cores, "
+        f"{_format_bytes(hardware['memory_total'])} RAM "
+        f"({_format_bytes(hardware['memory_available'])} available), GPU: {gpu_text}"
+    )
+    logging.info(
+        f"Ollama tuning profile '{profile['name']}': "
+        + ", ".join(f"{k}={v}" for k, v in sorted(env.items()))
+    )
+    if overrides:
+        logging.info(f"Applied {TUNING_FILE} overrides: {', '.join(sorted(overrides))}")
+    if kept:
+        logging.info(f"Kept from environment: {', '.join(sorted(kept))}")
+    return env, hardware, profile["name"]
@@ -0,0 +1,199 @@
+"""
+Persistent cache of deterministic Ollama responses.
+
+Used by the Ollama proxy (ollama_pool.py) with LAUNCHER_OLLAMA_CACHE=1.
+Embeddings, and generations with temperature 0 or a fixed seed, give the
+same answer for the same model and request, so re-indexing documents the
+WebUI has embedded before need not run the model again.
+
+Entries are keyed by the model's manifest digest (what Ollama reports as
+the model digest, so re-pulling a model invalidates its entries) plus a
+hash of the request body. They are stored zlib-compressed in a SQLite
+file under DATA_DIR. Once the file grows past LAUNCHER_OLLAMA_CACHE_MB the
+least recently used entries are removed.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+CACHE_FILE = "ollama-cache.db"
+# Request header: "bypass" neither reads nor writes the cache. Hits are
+# answered with "hit" in the same header.
+CACHE_HEADER = "x-launcher-cache"
+EMBEDDING_PATHS = {"/api/embed", "/api/embeddings", "/v1/embeddings"}
+GENERATION_PATHS = {"/api/generate", "/api/chat", "/v1/chat/completions", "/v1/completions"}
+# Request fields that do not change the response
+IGNORED_FIELDS = ("model", "keep_alive")
+# Responses larger than this are not stored
+MAX_ENTRY_BYTES = 8 * 1024 * 1024
+# Eviction shrinks the cache to this fraction of its limit
+EVICT_TO = 0.9
+STATS_INTERVAL = 300
+
+
+def is_cacheable(path, payload):
+    """True for requests whose response only depends on model and request."""
+    if path in EMBEDDING_PATHS:
+        return True
+    if path not in GENERATION_PATHS:
+        return False
+    # A bare {"model": ...} loads or unloads the model and must reach Ollama
+    if not (payload.get("prompt") or payload.get("messages")):
+        return False
+    options = payload.get("options")
+    if not isinstance(options, dict):
+        options = {}
+    temperature = options.get("temperature", payload.get("temperature"))
+    seed = options.get("seed", payload.get("seed"))
+    return temperature == 0 or seed is not None
+
+
+def manifest_path(models_dir, model):
+    """Manifest file for a model name such as "ns/model:tag"."""
+    name, _, tag = model.rpartition(":")
+    if not name or "/" in tag:
+        name, tag = model, "latest"
+    parts = name.split("/")
+    if len(parts) == 1:
+        parts = ["library"] + parts
+    if len(parts) == 2:
+        parts = ["registry.ollama.ai"] + parts
+    return Path(models_dir) / "manifests" / Path(*parts) / tag
+
+
+class ResponseCache:
+    """Size-bounded LRU store of Ollama responses in SQLite."""
+
+    def __init__(self, data_dir, models_dir, max_bytes):
+        self.path = Path(data_dir) / CACHE_FILE
+        self.models_dir = models_dir
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.stores = self.evictions = self.bypassed = 0
+        self._reported = (0, 0, 0, 0, 0)
+        self._reported_at = time.monotonic()
+        self._digests = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        # Only takes effect on a new file, before the table exists
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, content_type TEXT, "
+            "body BLOB, size INTEGER, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.total = self._db.execute("SELECT coalesce(sum(size), 0) FROM entries").fetchone()[0]
+
+    def model_digest(self, model):
+        """Digest of the model's manifest, or None when it is not installed."""
+        path = manifest_path(self.models_dir, model)
+        try:
+            stat = path.stat()
+        except (OSError, ValueError):
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != signature:
+            try:
+                cached = (signature, hashlib.sha256(path.read_bytes()).hexdigest())
+            except OSError:
+                return None
+            self._digests[path] = cached
+        return cached[1]
+
+    def key(self, path, body):
+        """Cache key for a request, or None when it must not be cached."""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or not isinstance(payload.get("model"), str):
+            return None
+        if not is_cacheable(path, payload):
+            return None
+        digest = self.model_digest(payload["model"])
+        if digest is None:
+            return None
+        request = {k: v for k, v in payload.items() if k not in IGNORED_FIELDS}
+        canonical = json.dumps([digest, path, request], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """(content type, body) for a key, or None; counts the hit or miss."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_type, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return row[0], zlib.decompress(row[1])
+
+    def put(self, key, content_type, body):
+        if len(body) > MAX_ENTRY_BYTES:
+            return
+        compressed = zlib.compress(bytes(body), 6)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, content_type, compressed, len(compressed), time.time()),
+            )
+            self.total += len(compressed) - (old[0] if old else 0)
+            self.stores += 1
+            if self.total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        target = self.max_bytes * EVICT_TO
+        removed = []
+        # Read the candidates to the end before changing the table
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if self.total <= target:
+                break
+            removed.append((key,))
+            self.total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", removed)
+        self.evictions += len(removed)
+        # Each step of the pragma frees one page; executescript runs it to
+        # the end. In autocommit mode it has no transaction to commit first.
+        self._db.executescript("PRAGMA incremental_vacuum")
+
+    def stats_line(self, force=False):
+        """Counter summary when it changed since the last one, else None."""
+        counters = (self.hits, self.misses, self.stores, self.evictions, self.bypassed)
+        if counters == self._reported:
+            return None
+        if not force and time.monotonic() - self._reported_at < STATS_INTERVAL:
+            return None
+        self._reported = counters
+        self._reported_at = time.monotonic()
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "n/a"
+        return (
+            f"Response cache: {self.hits} hits, {self.misses} misses ({rate} hit rate), "
+            f"{self.stores} stored, {self.evictions} evicted, {self.bypassed} bypassed, "
+            f"{self.total / 1e6:.1f} of {self.max_bytes / 1e6:.0f} MB"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_cache(env):
+    """ResponseCache configured from the pool's environment, or None."""
+    data_dir = env.get("LAUNCHER_OLLAMA_CACHE_DIR")
+    if env.get("LAUNCHER_OLLAMA_CACHE") != "1" or not data_dir:
+        return None
+    max_bytes = float(env.get("LAUNCHER_OLLAMA_CACHE_MB", "512")) * 1024 * 1024
+    return ResponseCache(data_dir, env["OLLAMA_MODELS"], max_bytes)
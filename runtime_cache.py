@@ -0,0 +1,145 @@
+"""
+Persistent cache of the bundle contents the launcher runs from disk.
+
+A onefile build is unpacked by the PyInstaller bootloader into a fresh
+temporary directory (sys._MEIPASS) on every launch, and that directory is
+removed again on exit. With LAUNCHER_RUNTIME_CACHE the parts the launcher
+starts or serves as plain files (the Ollama binary and the WebUI frontend)
+are copied once to a directory named after the bundle's hash, either on
+the host or next to the app. Later launches check the copy against its
+file list and use it, and versions of the bundle that are no longer run
+are removed.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# Bundle entries used from disk rather than imported
+CACHED_ENTRIES = ("ollama", "ollama.exe", "build")
+# The PyInstaller archive's table of contents lives at the end of the file
+KEY_TAIL_BYTES = 4 * 1024 * 1024
+COMPLETE_FILE = ".complete"
+
+
+def is_onefile():
+    """True when running from a bootloader-extracted onefile bundle."""
+    meipass = getattr(sys, "_MEIPASS", None)
+    # The bootloader always names its extraction directory _MEI<random>;
+    # onedir bundles point _MEIPASS at their own folder
+    return bool(
+        getattr(sys, "frozen", False) and meipass and Path(meipass).name.startswith("_MEI")
+    )
+
+
+def bundle_key(executable):
+    """Short hash identifying a bundle without reading all of it.
+
+    The archive's table of contents lists every entry with its size and
+    offset, so hashing it with the file size tells bundles apart.
+    """
+    digest = hashlib.sha256()
+    with open(executable, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - KEY_TAIL_BYTES))
+        digest.update(str(size).encode())
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_root(mode, app_dir):
+    """Directory holding the cached versions for LAUNCHER_RUNTIME_CACHE=mode."""
+    if mode == "app":
+        return Path(app_dir) / ".runtime"
+    from model_store import default_cache_root
+
+    return default_cache_root().parent / "runtime"
+
+
+def _file_list(directory):
+    return {
+        str(path.relative_to(directory)): path.stat().st_size
+        for path in sorted(Path(directory).rglob("*"))
+        if path.is_file() and path.name != COMPLETE_FILE
+    }
+
+
+def is_complete(version_dir):
+    """True when every file recorded for a cached version is present."""
+    try:
+        files = json.loads((version_dir / COMPLETE_FILE).read_text())
+        return all(
+            (version_dir / name).stat().st_size == size for name, size in files.items()
+        )
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def populate(bundle_dir, version_dir):
+    """Copy the cached entries from bundle_dir and mark the copy complete."""
+    tmp = version_dir.with_name(f".{version_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        for name in CACHED_ENTRIES:
+            source = Path(bundle_dir) / name
+            if source.is_dir():
+                shutil.copytree(source, tmp / name)
+            elif source.is_file():
+                shutil.copy2(source, tmp / name)
+        (tmp / COMPLETE_FILE).write_text(json.dumps(_file_list(tmp)))
+        if version_dir.exists():
+            # An incomplete earlier copy
+            shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp, version_dir)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        # Another launcher may have finished the same version first
+        if not is_complete(version_dir):
+            raise
+
+
+def evict(root, current, keep):
+    """Remove cached versions other than current beyond the keep newest."""
+    versions = []
+    for path in root.iterdir():
+        if path == current or not path.is_dir():
+            continue
+        if path.name.startswith("."):
+            # Leftover of an interrupted copy
+            if time.time() - path.stat().st_mtime > 3600:
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        try:
+            versions.append(((path / COMPLETE_FILE).stat().st_mtime, path))
+        except OSError:
+            versions.append((0, path))
+    versions.sort(reverse=True)
+    for _, path in versions[max(0, keep - 1):]:
+        # Files of a version still running elsewhere may refuse to go on
+        # Windows; they are retried next time
+        shutil.rmtree(path, ignore_errors=True)
+        if not path.exists():
+            logging.info(f"Removed old runtime cache {path.name}")
+
+
+def prepare(mode, app_dir, keep=2):
+    """Return the cached runtime directory for this bundle, creating it once."""
+    root = cache_root(mode, app_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    version_dir = root / bundle_key(sys.executable)
+    if is_complete(version_dir):
+        (version_dir / COMPLETE_FILE).touch()
+        logging.info(f"Using runtime cache {version_dir}")
+    else:
+        populate(sys._MEIPASS, version_dir)
+        logging.info(
+            f"Populated runtime cache {version_dir} in {time.monotonic() - started:.1f}s"
+        )
+    evict(root, version_dir, keep)
+    return version_dir
@@ -0,0 +1,263 @@
+"""
+SQLite profile and maintenance for the WebUI database (DATA_DIR/webui.db).
+
+SQLite's defaults suit small embedded use: a rollback journal with a full
+fsync per transaction, a 2 MB page cache and no memory mapping. On a
+portable drive with months of chat history that makes every page of the
+chat list a trip to the drive. The launcher therefore:
+
+- switches the database to WAL with incremental auto-vacuum before the
+  WebUI starts, after a quick integrity check;
+- has the WebUI child apply a connection profile (synchronous, cache_size,
+  mmap_size, temp_store) to every connection it opens, through a
+  SQLAlchemy connect listener;
+- runs ANALYZE / PRAGMA optimize, an incremental vacuum and a WAL
+  checkpoint while the database is idle, logging representative query
+  timings before and after.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_NAME = "webui.db"
+
+# Queries timed before and after maintenance; ones whose tables do not
+# exist in this Open WebUI version are skipped
+BENCHMARK_QUERIES = (
+    (
+        "chat list",
+        "SELECT id, title, updated_at FROM chat WHERE user_id = "
+        "(SELECT user_id FROM chat LIMIT 1) ORDER BY updated_at DESC LIMIT 50",
+    ),
+    ("chat title search", "SELECT id FROM chat WHERE title LIKE '%the%' LIMIT 50"),
+    ("chat count", "SELECT count(*) FROM chat"),
+    ("file count", "SELECT count(*) FROM file"),
+)
+
+# Seconds without writes to the database before maintenance may run
+IDLE_SECONDS = 120
+# Free pages left in place by an incremental vacuum
+VACUUM_KEEP_PAGES = 256
+
+
+def _env(name, default):
+    return os.environ.get(name, str(default)).strip()
+
+
+def enabled():
+    return _env("LAUNCHER_SQLITE_TUNING", "1").lower() not in ("0", "off", "false", "no")
+
+
+def connection_profile():
+    """(pragma, value) pairs applied to every WebUI connection."""
+    return [
+        ("synchronous", _env("LAUNCHER_SQLITE_SYNCHRONOUS", "NORMAL")),
+        ("cache_size", -int(float(_env("LAUNCHER_SQLITE_CACHE_MB", 64)) * 1024)),
+        ("mmap_size", int(float(_env("LAUNCHER_SQLITE_MMAP_MB", 256)) * 1024 * 1024)),
+        ("temp_store", "MEMORY"),
+        ("busy_timeout", 5000),
+    ]
+
+
+def apply_profile(connection):
+    """Apply the connection profile to a DB-API connection."""
+    cursor = connection.cursor()
+    try:
+        for name, value in connection_profile():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _is_webui_db(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("PRAGMA database_list")
+        return any(row[1] == "main" and Path(row[2] or "").name == DB_NAME for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def install_profile():
+    """Apply the profile to each SQLite connection the WebUI opens to webui.db.
+
+    Runs in the WebUI child before Open WebUI is imported; the listener is
+    registered on the Engine class, so it covers engines created later.
+    """
+    if not enabled():
+        return
+    try:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+    except ImportError:
+        return
+
+    @event.listens_for(Engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        if "sqlite" not in type(dbapi_connection).__module__:
+            return
+        try:
+            if _is_webui_db(dbapi_connection):
+                apply_profile(dbapi_connection)
+        except Exception as e:
+            print(f"[WebUI Init] Could not apply the SQLite profile: {e}")
+
+
+def time_queries(connection, repeat=3):
+    """Best-of-repeat milliseconds for each benchmark query that runs here."""
+    timings = {}
+    for name, query in BENCHMARK_QUERIES:
+        best = None
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(query).fetchall()
+                elapsed = (time.perf_counter() - started) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+        except sqlite3.Error:
+            continue
+        timings[name] = best
+    return timings
+
+
+def format_timings(before, after):
+    return ", ".join(
+        f"{name} {before[name]:.1f}ms -> {after[name]:.1f}ms" for name in before if name in after
+    )
+
+
+def open_database(path):
+    connection = sqlite3.connect(str(path), timeout=10, isolation_level=None)
+    connection.execute("PRAGMA busy_timeout=10000")
+    return connection
+
+
+def prepare_database(data_dir, vacuum_max_bytes):
+    """Check and configure webui.db before the WebUI starts.
+
+    Returns False when the integrity check found problems. Databases up to
+    vacuum_max_bytes are converted to incremental auto-vacuum with a
+    one-time VACUUM; larger ones keep their mode to avoid a long start.
+    """
+    path = Path(data_dir) / DB_NAME
+    if not path.exists():
+        return True
+    connection = open_database(path)
+    try:
+        started = time.monotonic()
+        problems = [row[0] for row in connection.execute("PRAGMA quick_check").fetchall()]
+        healthy = problems == ["ok"]
+        logging.info(
+            f"WebUI database check took {time.monotonic() - started:.2f}s "
+            f"({path.stat().st_size / 1e6:.0f} MB)"
+        )
+        if not healthy:
+            logging.error(
+                f"WebUI database {path} is damaged: {'; '.join(problems[:5])}. "
+                "Restore data/ from a backup if chats are missing or the WebUI fails."
+            )
+            return False
+
+        if connection.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            connection.execute("PRAGMA journal_mode=WAL")
+            logging.info("WebUI database switched to WAL journaling")
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if path.stat().st_size <= vacuum_max_bytes:
+                started = time.monotonic()
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("VACUUM")
+                logging.info(
+                    f"WebUI database converted to incremental vacuum in "
+                    f"{time.monotonic() - started:.1f}s"
+                )
+
+        before = time_queries(connection)
+        apply_profile(connection)
+        after = time_queries(connection)
+        if before:
+            logging.info(f"WebUI database query timings, defaults vs profile: {format_timings(before, after)}")
+        return True
+    finally:
+        connection.close()
+
+
+class DatabaseMaintenance:
+    """Runs ANALYZE/optimize, incremental vacuum and checkpoints when idle.
+
+    Every interval seconds the database is checked; maintenance only runs
+    once neither it nor its WAL has been written for IDLE_SECONDS.
+    """
+
+    def __init__(self, data_dir, interval):
+        self.path = Path(data_dir) / DB_NAME
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_idle(self):
+        now = time.time()
+        for candidate in (self.path, self.path.with_name(DB_NAME + "-wal")):
+            try:
+                if now - candidate.stat().st_mtime < IDLE_SECONDS:
+                    return False
+            except OSError:
+                continue
+        return True
+
+    def run_once(self):
+        """Maintain the database now and log what it did."""
+        connection = open_database(self.path)
+        try:
+            apply_profile(connection)
+            before = time_queries(connection)
+            started = time.monotonic()
+            analyzed = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+            if analyzed:
+                connection.execute("PRAGMA optimize")
+            else:
+                connection.execute("ANALYZE")
+            freed = 0
+            free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages > VACUUM_KEEP_PAGES and connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # Each step of the pragma frees one page; execute() stops
+                # after the first step, executescript() runs it to the end
+                connection.executescript(
+                    f"PRAGMA incremental_vacuum({free_pages - VACUUM_KEEP_PAGES})"
+                )
+                freed = free_pages - connection.execute("PRAGMA freelist_count").fetchone()[0]
+            connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            elapsed = time.monotonic() - started
+            after = time_queries(connection)
+        finally:
+            connection.close()
+        message = (
+            f"WebUI database maintenance took {elapsed:.2f}s "
+            f"({'optimize' if analyzed else 'ANALYZE'}, {freed} pages freed)"
+        )
+        if before:
+            message += f"; query timings {format_timings(before, after)}"
+        logging.info(message)
+
+    def start(self):
+        def loop():
+            while not self._stop.wait(self.interval):
+                if not self.path.exists() or not self.is_idle():
+                    continue
+                try:
+                    self.run_once()
+                except sqlite3.Error as e:
+                    logging.warning(f"WebUI database maintenance failed: {e}")
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop scheduling; waits for a maintenance run in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
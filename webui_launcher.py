@@ -5,9 +5,23 @@ This script is bundled with PyInstaller to enable open-webui execution.
 """
 import sys
 import os
+import time
 from pathlib import Path
 from typing import Any
 
+# Startup phases reported back to the launcher with the ready signal
+startup_phases = []
+_module_import_start = time.time()
+
+
+def record_phase(name, start, **details):
+    """Record a startup phase that began at start and ends now."""
+    entry = {"name": name, "start": start, "end": time.time()}
+    if details:
+        entry["details"] = details
+    startup_phases.append(entry)
+
+
 # Set frontend build directory for bundled app
 if sys.platform == "darwin":
     # macOS .app bundle: executable in Contents/MacOS, build in Contents/build
@@ -15,82 +29,488 @@ if sys.platform == "darwin":
 else:
     # Windows/Linux: executable and build in same directory
     frontend_dir = os.path.join(os.path.dirname(__file__), "build")
+# Onefile builds may serve the frontend from the launcher's runtime cache
+runtime_dir = os.environ.get("LAUNCHER_RUNTIME_DIR")
+if runtime_dir and os.path.isdir(os.path.join(runtime_dir, "build")):
+    frontend_dir = os.path.join(runtime_dir, "build")
 os.environ["FROM_INIT_PY"] = "True"
 os.environ["FRONTEND_BUILD_DIR"] = frontend_dir
 
 main_func = None
 
-# Open WebUI is typically run via its CLI entry point defined in pyproject.toml
-# Try to find and use the proper entry point
-try:
-    # Try the main entry point - open-webui uses a CLI via main.py
-    from open_webui.main import app
 
-    print("[WebUI Init] Successfully imported open_webui.main.app")
+def notify_parent_ready():
+    """Tell the launcher that uvicorn has bound its port.
+
+    The parent passes a loopback port and token through the environment;
+    without them (e.g. when run by hand) this is a no-op.
+    """
+    import json
+    import socket
+
+    port = os.environ.get("LAUNCHER_READY_PORT")
+    if not port:
+        return
+    message = {
+        "token": os.environ.get("LAUNCHER_READY_TOKEN", ""),
+        "event": "ready",
+        "pid": os.getpid(),
+        "phases": startup_phases,
+    }
+    try:
+        with socket.create_connection(("127.0.0.1", int(port)), timeout=2) as s:
+            s.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except (OSError, ValueError) as e:
+        # The parent falls back to probing the port, so this is not fatal
+        print(f"[WebUI Init] Could not notify launcher: {e}")
+
+
+def wait_for_serve_command():
+    """Standby mode: report that the app is imported, then wait to be needed.
+
+    The launcher holds the connection open and sends a "serve" command when
+    the active WebUI child has gone; closing it releases this standby.
+    """
+    import json
+    import socket
+
+    token = os.environ.get("LAUNCHER_READY_TOKEN", "")
+    message = {"token": token, "event": "standby", "pid": os.getpid()}
+    with socket.create_connection(
+        ("127.0.0.1", int(os.environ["LAUNCHER_READY_PORT"])), timeout=5
+    ) as s:
+        s.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        print("[WebUI Init] Standing by until the launcher needs this WebUI")
+        sys.stdout.flush()
+        s.settimeout(None)
+        line = s.makefile("rb").readline()
+    try:
+        command = json.loads(line) if line else {}
+    except ValueError:
+        command = {}
+    if command.get("token") != token or command.get("command") != "serve":
+        print("[WebUI Init] Standby released by the launcher")
+        sys.exit(0)
+    os.environ.update(command.get("env") or {})
+    print("[WebUI Init] Taking over from the previous WebUI")
+
+
+def serve_app(app, **kwargs):
+    """Run app under uvicorn and notify the launcher once it is listening."""
+    import uvicorn
+
+    port = int(os.environ.get("OPENWEBUI_PORT", "3000"))
+    host = os.environ.get("OPENWEBUI_HOST", "127.0.0.1")
+
+    class NotifyingServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            bind_start = time.time()
+            await super().startup(sockets=sockets)
+            record_phase("uvicorn bind", bind_start, started=self.started)
+            if self.started:
+                notify_parent_ready()
+
+    # Let in-flight streaming responses finish within the launcher's drain window
+    kwargs.setdefault(
+        "timeout_graceful_shutdown",
+        float(os.environ.get("LAUNCHER_SHUTDOWN_DRAIN", "5")),
+    )
+    # The launcher may hand over an already-listening socket so the port is
+    # never released between reservation and bind.
+    inherited_fd = os.environ.get("LAUNCHER_WEBUI_FD")
+
+    if kwargs.get("workers", 1) > 1:
+        # Workers import the app themselves and share the listening socket;
+        # the launcher detects readiness by probing it instead of a signal.
+        # uvicorn.run is the public entry point for this, and takes the
+        # inherited socket as fd.
+        print(f"[WebUI Init] Starting {kwargs['workers']} uvicorn workers on {host}:{port}")
+        uvicorn.run(
+            app,
+            host=host,
+            port=port,
+            fd=int(inherited_fd) if inherited_fd else None,
+            log_level="info",
+            **kwargs,
+        )
+        return
 
-    def run_uvicorn_server():
-        """Run the FastAPI app using uvicorn"""
-        import uvicorn
+    config = uvicorn.Config(app, host=host, port=port, log_level="info", **kwargs)
+    sock = None
+    if inherited_fd:
+        import socket
 
-        port = int(os.environ.get("OPENWEBUI_PORT", "3000"))
-        host = os.environ.get("OPENWEBUI_HOST", "127.0.0.1")
+        sock = socket.socket(fileno=int(inherited_fd))
+        print(f"[WebUI Init] Serving inherited socket {sock.getsockname()}")
 
+    if sock is not None:
+        NotifyingServer(config).run(sockets=[sock])
+    else:
         print(f"[WebUI Init] Starting uvicorn server on {host}:{port}")
-        uvicorn.run(app, host=host, port=port, log_level="info", access_log=True)
+        NotifyingServer(config).run()
 
-    main_func = run_uvicorn_server
 
-except ImportError as e:
-    print(f"[WebUI Init] Could not import open_webui.main.app: {e}")
-    if getattr(e, "name", "") == "numpy" or "numpy" in str(e):
-        print(
-            "[WebUI Init] Missing dependency detected: numpy. Add it to requirements and rebuild the portable bundle."
-        )
+# Open WebUI entry points, tried in order. Nothing is imported until
+# run_webui_server() runs, and the entry point that worked is remembered in
+# the launcher state directory so later starts import it directly.
+APP_ENTRY_POINTS = [
+    ("open_webui.main", "app"),
+    ("open_webui.apps.webui.main", "app"),
+    # Autre chemin possible dans certaines versions
+    ("open_webui.backend.main", "app"),
+]
+ENTRY_POINT_CACHE_FILE = "webui-entry-point.json"
+
+
+def get_state_dir():
+    """Directory where the launcher keeps state between runs."""
+    state_dir = os.environ.get("LAUNCHER_STATE_DIR")
+    if state_dir:
+        return Path(state_dir)
+    return Path(os.environ.get("DATA_DIR", "./data"))
+
+
+def load_cached_entry_point():
+    """Return the (module, attribute) pair that worked last time, if any."""
+    import json
+
+    try:
+        cached = json.loads((get_state_dir() / ENTRY_POINT_CACHE_FILE).read_text())
+        return (cached["module"], cached["attr"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_entry_point(module_name, attr):
+    """Remember the working entry point for the next start."""
+    import json
 
-    # Fallback: try to import the app from other common locations
     try:
-        from open_webui.apps.webui.main import app
+        state_dir = get_state_dir()
+        state_dir.mkdir(parents=True, exist_ok=True)
+        (state_dir / ENTRY_POINT_CACHE_FILE).write_text(
+            json.dumps({"module": module_name, "attr": attr})
+        )
+    except OSError as e:
+        print(f"[WebUI Init] Could not remember entry point: {e}")
+
+
+class ImportProfiler:
+    """Meta path hook that times module execution, like -X importtime.
+
+    Each import found by the regular finders gets a loader wrapper that
+    measures exec_module(); nested imports are subtracted to get self time.
+    The original loader is put back on the module before it executes, so
+    nothing downstream sees the wrapper.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        return False
+
+    def report(self, top=25):
+        """Print the slowest modules by self time."""
+        total = sum(r[1] for r in self.records)
+        print(
+            f"[WebUI Init] Import profile: {len(self.records)} modules, "
+            f"{total * 1000:.0f} ms total; slowest {top} by self time:"
+        )
+        print("[WebUI Init]   self [ms] | cumulative [ms] | module")
+        for name, self_time, cumulative in sorted(
+            self.records, key=lambda r: r[1], reverse=True
+        )[:top]:
+            print(
+                f"[WebUI Init] {self_time * 1000:>10.1f} | {cumulative * 1000:>15.1f} | {name}"
+            )
 
-        print("[WebUI Init] Successfully imported open_webui.apps.webui.main.app")
 
-        def run_uvicorn_server():
-            import uvicorn
+class _TimedLoader:
+    def __init__(self, loader, profiler, fullname):
+        self._loader = loader
+        self._profiler = profiler
+        self._fullname = fullname
 
-            port = int(os.environ.get("OPENWEBUI_PORT", "3000"))
-            host = os.environ.get("OPENWEBUI_HOST", "127.0.0.1")
-            uvicorn.run(app, host=host, port=port, log_level="info")
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
 
-        main_func = run_uvicorn_server
-    except ImportError as e2:
-        print(f"[WebUI Init] Could not import from apps.webui.main: {e2}")
-        print("[WebUI Init] ERROR: Unable to locate open-webui application")
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
 
-        # Fallback ultime : assume open-webui est installé globalement ou via sys.path
-        import sys
+    def exec_module(self, module):
+        spec = getattr(module, "__spec__", None)
+        if spec is not None:
+            spec.loader = self._loader
+        module.__loader__ = self._loader
 
-        sys.path.insert(
-            0, str(Path(__file__).parent / "open_webui")
-        )  # Si bundle a un sous-dossier open_webui
+        stack = self._profiler._stack
+        stack.append(0.0)
+        start = time.perf_counter()
         try:
-            from open_webui.backend.main import (
-                app,
-            )  # Autre chemin possible dans certaines versions
+            self._loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            self._profiler.records.append(
+                (self._fullname, cumulative - nested, cumulative)
+            )
+
+
+def import_app():
+    """Import the Open WebUI ASGI app, trying the known entry points.
 
-            print("[WebUI Init] Successfully imported open_webui.backend.main.app")
+    An entry point whose module exists but fails to import is missing a
+    dependency; the other entry points import the same heavy packages, so
+    probing them would only pay that cost again. Fallbacks are therefore
+    only tried when the module itself cannot be found.
+    """
+    import importlib
+    import importlib.util
 
-            def run_uvicorn_server():
-                import uvicorn
+    cached = load_cached_entry_point()
+    candidates = list(APP_ENTRY_POINTS)
+    if cached in candidates:
+        candidates.remove(cached)
+        candidates.insert(0, cached)
 
-                port = int(os.environ.get("OPENWEBUI_PORT", "3000"))
-                host = os.environ.get("OPENWEBUI_HOST", "127.0.0.1")
-                uvicorn.run(app, host=host, port=port, log_level="info")
+    for module_name, attr in candidates:
+        if module_name == "open_webui.backend.main":
+            # Fallback ultime : assume open-webui est installé globalement ou via sys.path
+            sys.path.insert(
+                0, str(Path(__file__).parent / "open_webui")
+            )  # Si bundle a un sous-dossier open_webui
 
-            main_func = run_uvicorn_server
-        except ImportError as e3:
-            print(f"[WebUI Init] All import attempts failed: {e3}")
+        branch_start = time.time()
+        try:
+            found = importlib.util.find_spec(module_name) is not None
+        except ImportError:
+            found = False
+        if not found:
+            record_phase(f"import {module_name}", branch_start, ok=False, found=False)
+            print(f"[WebUI Init] No module {module_name}, trying next entry point")
+            continue
+
+        try:
+            app = getattr(importlib.import_module(module_name), attr)
+        except (ImportError, AttributeError) as e:
+            record_phase(f"import {module_name}", branch_start, ok=False, found=True)
+            print(f"[WebUI Init] Could not import {module_name}.{attr}: {e}")
+            if getattr(e, "name", "") == "numpy" or "numpy" in str(e):
+                print(
+                    "[WebUI Init] Missing dependency detected: numpy. Add it to requirements and rebuild the portable bundle."
+                )
             print(
                 "[WebUI Init] Check if 'pip install open-webui' is needed in the bundle env."
             )
+            raise RuntimeError(f"Failed to import {module_name}.{attr}: {e}") from e
+
+        record_phase(f"import {module_name}", branch_start, ok=True)
+        print(f"[WebUI Init] Successfully imported {module_name}.{attr}")
+        if (module_name, attr) != cached:
+            save_entry_point(module_name, attr)
+        return app
+
+    print("[WebUI Init] ERROR: Unable to locate open-webui application")
+    raise RuntimeError("No webui entry point found")
+
+
+def load_app():
+    """Import the app, with an import-time report when profiling is enabled.
+
+    Set LAUNCHER_IMPORT_PROFILE=1 to log the slowest modules and
+    LAUNCHER_IMPORT_PROFILE_TOP to change how many are listed (default 25).
+    """
+    # Engines are created while Open WebUI is imported; the SQLite profile
+    # listener has to be in place before that
+    from webui_db import install_profile
+
+    install_profile()
+
+    if os.environ.get("LAUNCHER_IMPORT_PROFILE", "").lower() not in ("1", "true", "yes", "on"):
+        return import_app()
+
+    profiler = ImportProfiler()
+    try:
+        with profiler:
+            return import_app()
+    finally:
+        try:
+            top = int(os.environ.get("LAUNCHER_IMPORT_PROFILE_TOP", "25"))
+        except ValueError:
+            top = 25
+        profiler.report(top)
+
+
+class AccessLogSampler:
+    """logging filter keeping a fraction of access log lines plus every error."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._credit = 0.0
+
+    def filter(self, record):
+        args = record.args
+        status = args[-1] if isinstance(args, tuple) and args else 0
+        if isinstance(status, int) and status >= 400:
+            return True
+        # Deterministic sampling: keep one line every 1/rate requests
+        self._credit += self.rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
+
+
+def access_log_setting():
+    """Parse LAUNCHER_ACCESS_LOG: on (default), off, or a fraction to sample.
+
+    Returns (enabled, sample_rate).
+    """
+    value = os.environ.get("LAUNCHER_ACCESS_LOG", "on").strip().lower()
+    if value in ("0", "off", "false", "no"):
+        return False, 1.0
+    if value in ("1", "on", "true", "yes", ""):
+        return True, 1.0
+    try:
+        rate = float(value)
+    except ValueError:
+        print(f"[WebUI Init] Ignoring invalid LAUNCHER_ACCESS_LOG={value!r}")
+        return True, 1.0
+    return rate > 0, min(rate, 1.0)
+
+
+def install_access_log_sampler():
+    """Apply LAUNCHER_ACCESS_LOG sampling to this process's access log."""
+    import logging
+
+    access_log, sample_rate = access_log_setting()
+    if access_log and sample_rate < 1.0:
+        logging.getLogger("uvicorn.access").addFilter(AccessLogSampler(sample_rate))
+
+
+def _resolve_implementation(option, requested, fast, fallback):
+    """Pick a uvicorn loop/HTTP implementation, falling back when missing.
+
+    "auto" prefers the fast C implementation when it is installed (it never
+    is for uvloop on Windows); asking for it explicitly when it is missing
+    falls back with a warning instead of failing at startup.
+    """
+    import importlib.util
+
+    if requested not in ("auto", fast):
+        return requested
+    if importlib.util.find_spec(fast) is not None:
+        return fast
+    if requested == fast:
+        print(f"[WebUI Init] {option}={fast} requested but {fast} is not installed; using {fallback}")
+    return fallback
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"[WebUI Init] Ignoring invalid {name}={os.environ[name]!r}")
+        return default
+
+
+def server_profile():
+    """uvicorn settings for this machine and the LAUNCHER_WEBUI_* options.
+
+    LAUNCHER_WEBUI_WORKERS is a number or "auto" (one per two CPUs, at most
+    4); LAUNCHER_WEBUI_LOOP and LAUNCHER_WEBUI_HTTP choose the event loop
+    and HTTP parser; LAUNCHER_WEBUI_KEEP_ALIVE is the idle keep-alive in
+    seconds and LAUNCHER_WEBUI_MAX_CONNECTIONS caps concurrent connections
+    (answered with 503 beyond that).
+    """
+    workers = os.environ.get("LAUNCHER_WEBUI_WORKERS", "1").strip().lower()
+    if workers == "auto":
+        workers = max(1, min((os.cpu_count() or 2) // 2, 4))
+    else:
+        workers = max(1, _env_int("LAUNCHER_WEBUI_WORKERS", 1))
+
+    access_log, sample_rate = access_log_setting()
+    profile = {
+        "workers": workers,
+        "loop": _resolve_implementation(
+            "LAUNCHER_WEBUI_LOOP",
+            os.environ.get("LAUNCHER_WEBUI_LOOP", "auto").strip().lower(),
+            "uvloop",
+            "asyncio",
+        ),
+        "http": _resolve_implementation(
+            "LAUNCHER_WEBUI_HTTP",
+            os.environ.get("LAUNCHER_WEBUI_HTTP", "auto").strip().lower(),
+            "httptools",
+            "h11",
+        ),
+        "timeout_keep_alive": _env_int("LAUNCHER_WEBUI_KEEP_ALIVE", 5),
+        "limit_concurrency": _env_int("LAUNCHER_WEBUI_MAX_CONNECTIONS", 0) or None,
+        "access_log": access_log,
+    }
+    return profile, sample_rate
+
+
+def run_uvicorn_server():
+    """Run the FastAPI app using uvicorn"""
+    profile, sample_rate = server_profile()
+    print(
+        f"[WebUI Init] Server profile: workers={profile['workers']}, loop={profile['loop']}, "
+        f"http={profile['http']}, keep-alive={profile['timeout_keep_alive']}s, "
+        f"max connections={profile['limit_concurrency'] or 'unlimited'}, "
+        f"access log={'off' if not profile['access_log'] else f'{sample_rate:.0%}'}"
+    )
+    standby = os.environ.get("LAUNCHER_STANDBY_CHILD") == "1"
+    if profile["workers"] > 1:
+        # Each worker process imports the app through the module __getattr__
+        # below, so the supervising process never loads Open WebUI itself.
+        if standby:
+            wait_for_serve_command()
+        serve_app("webui_launcher:app", **profile)
+    else:
+        install_access_log_sampler()
+        app = load_app()
+        if standby:
+            wait_for_serve_command()
+        serve_app(app, **profile)
+
+
+def __getattr__(name):
+    # "webui_launcher:app" is how uvicorn workers import the Open WebUI app
+    if name == "app":
+        global app
+        install_access_log_sampler()
+        app = load_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+main_func = run_uvicorn_server
+
+record_phase("webui_launcher import", _module_import_start)
 
 
 def run_webui_server():